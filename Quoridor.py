@@ -12,49 +12,165 @@
 #
 #   In this implementation, players use the 'move_pawn' or 'place_fence' methods to perform the respective actions.
 #   Player 1 starts on the top row, while Player 2 starts on the bottom row.
+#
+#   By default the fences are also mirrored into a bitboard (see 'QuoridorBitboard'), which answers the movement
+#   queries made by 'valid_tiles'. The list-based fence lookups remain available by passing 'use_bitboard=False'.
+#
+#   A game only stores what can change: the pawns, the player-placed fences, and the bitboard's masks. The board of
+#   tile tuples and the border fences follow from the grid size, so they are built the first time a game of that size
+#   needs them and shared by every game of that size.
+
+import random
+import struct
+import QuoridorBitboard
+
+#  The number of times a position may occur before the game is declared a stalemate by repetition.
+REPETITION_LIMIT = 3
+
+#  The board and border fences of each grid size, shared by every game of that size.
+_BOARDS = {}
+
+#  Random 64-bit keys for the Zobrist hash of a position, generated from a description of what each key represents so
+#  that every process computes the same hash for the same position.
+_ZOBRIST_KEYS = {}
+
+
+def _get_board(grid_size):
+    """This function returns the board of the given grid size, a list of lists of tile tuples indexed by column and then
+    row, followed by the lists of vertical and horizontal border fences, as a tuple. The board has one more column and
+    row than the grid, for the border fences. They are built once per grid size and must not be changed."""
+    if grid_size not in _BOARDS:
+        board = []
+        for i in range(0, grid_size + 1):
+            column_list = []
+            for j in range(0, grid_size + 1):
+                column_list.append((i, j))
+            board.append(column_list)
+
+        #  Vertical fences are on the left of the associated tile, and horizontal fences are above it.
+        vertical_fences = []
+        for i in board[0]:
+            vertical_fences.append(i)
+        for i in board[grid_size]:
+            vertical_fences.append(i)
+
+        horizontal_fences = []
+        for i in board:
+            horizontal_fences.append(i[0])
+            horizontal_fences.append(i[grid_size])
+        _BOARDS[grid_size] = (board, vertical_fences, horizontal_fences)
+    return _BOARDS[grid_size]
+
+
+def zobrist_key(*parts):
+    """This function returns the Zobrist key for the given description, such as ('pawn', 1, (4, 0)),
+    ('fence', 'v', (2, 3)), ('fences', 2, 7), or ('turn', 2)."""
+    if parts not in _ZOBRIST_KEYS:
+        _ZOBRIST_KEYS[parts] = random.Random(repr(parts)).getrandbits(64)
+    return _ZOBRIST_KEYS[parts]
+
+
+#  The fixed-size header of an encoded position: the grid size, flags, both pawns (column and row), both fence counts,
+#  the turn, and the game state. It is followed by two bitplanes of the placed vertical and horizontal fences, with bit
+#  'row * grid_size + column' set for each fence.
+_POSITION_HEADER = struct.Struct("<BBBBBBHHBB")
+_FLAG_BITBOARD = 1
+
+#  The game states, in the order of their codes in an encoded position.
+_GAME_STATES = ("ONGOING", "STALEMATE", "PLAYER_1_WIN", "PLAYER_2_WIN")
+
+
+def position_size(grid_size):
+    """This function returns the number of bytes in the encoding of a position on a board of the given size, as
+    returned by 'QuoridorGame.to_bytes'."""
+    return _POSITION_HEADER.size + 2 * ((grid_size * grid_size + 7) // 8)
+
+
+def encode_position(grid_size, pawn_1, pawn_2, fence_count_1, fence_count_2, turn, game_state, ver_mask, hor_mask,
+                    use_bitboard=None):
+    """This function returns the encoding read by 'game_from_bytes' of the position with the given pawns, remaining
+    fence counts, turn, and game state ('ONGOING', 'STALEMATE', 'PLAYER_1_WIN', or 'PLAYER_2_WIN'), and with the
+    player-placed vertical and horizontal fences given as masks, with bit 'row * grid_size + column' set for each
+    fence. The bitboard is used by the decoded game unless 'use_bitboard' is False."""
+    if use_bitboard is None:
+        use_bitboard = True
+
+    flags = 0
+    if use_bitboard:
+        flags |= _FLAG_BITBOARD
+    header = _POSITION_HEADER.pack(grid_size, flags, pawn_1[0], pawn_1[1], pawn_2[0], pawn_2[1], fence_count_1,
+                                   fence_count_2, turn, _GAME_STATES.index(game_state))
+    plane_size = (grid_size * grid_size + 7) // 8
+    return header + ver_mask.to_bytes(plane_size, "little") + hor_mask.to_bytes(plane_size, "little")
+
+
+def game_from_bytes(data, offset=None, history=None):
+    """This function takes a position encoded by 'QuoridorGame.to_bytes', starting at the given offset of any
+    bytes-like object (such as bytes, a bytearray, a memoryview, or an mmap), and returns a new game in that position.
+    The buffer is read in place, without copying. The game's position history holds that position along with the
+    Zobrist hashes of any earlier positions given as 'history', which count towards a draw by repetition."""
+    if offset is None:
+        offset = 0
+
+    grid_size, flags, pawn_1_column, pawn_1_row, pawn_2_column, pawn_2_row, fence_count_1, fence_count_2, turn, \
+        state_code = _POSITION_HEADER.unpack_from(data, offset)
+    plane_size = (grid_size * grid_size + 7) // 8
+    view = memoryview(data)
+    plane_offset = offset + _POSITION_HEADER.size
+    ver_mask = int.from_bytes(view[plane_offset:plane_offset + plane_size], "little")
+    hor_mask = int.from_bytes(view[plane_offset + plane_size:plane_offset + 2 * plane_size], "little")
+
+    game = QuoridorGame(grid_size, max(fence_count_1, fence_count_2), bool(flags & _FLAG_BITBOARD))
+    for i in range(fence_count_1, max(fence_count_1, fence_count_2)):
+        game.decrement_fence_count(1)
+    for i in range(fence_count_2, max(fence_count_1, fence_count_2)):
+        game.decrement_fence_count(2)
+    game.set_player_pawn(1, (pawn_1_column, pawn_1_row))
+    game.set_player_pawn(2, (pawn_2_column, pawn_2_row))
+    for i in range(0, grid_size * grid_size):
+        if ver_mask >> i & 1:
+            game.add_fence("vertical", (i % grid_size, i // grid_size))
+        if hor_mask >> i & 1:
+            game.add_fence("horizontal", (i % grid_size, i // grid_size))
+    if turn != game.get_turn():
+        game.advance_turn()
+    game._position_counts = {}
+    if history is not None:
+        for key in history:
+            game._position_counts[key] = game._position_counts.get(key, 0) + 1
+    game.record_position()
+    if _GAME_STATES[state_code] != "ONGOING":
+        game.set_victory(state_code - 1)
+    return game
+
 
 class QuoridorGame:
     """This class represents the Quoridor game, managing the game's current board state, player actions, and their
     validity."""
 
-    def __init__(self, grid_size, fence_count):
+    def __init__(self, grid_size, fence_count, use_bitboard=None):
         """Initializes the Quoridor game. Sets up the board, player starting positions, turn, and each players'
-        number of fences."""
+        number of fences. The bitboard move engine is used unless 'use_bitboard' is False."""
+        if use_bitboard is None:
+            use_bitboard = True
+
         #  Initialize the number of columns and rows.
         self._grid_size = grid_size
 
-        #  Initialize the representation of the game board.
-        self._game_board = {"board": [], "pawns": {"player_1": (), "player_2": ()}, "fences": {"player_vertical": [],
-                            "player_horizontal": [], "border_vertical": [], "border_horizontal": []}}
-
-        #  Initialize board, which is a list of lists. Tiles are represented as tuples of the respective
-        #  coordinates in '(column, row)' format. The column and row tile length are increased by 1 to account for the
-        #  border fences, but are otherwise unused during gameplay.
-        board = self._game_board["board"]
-        for i in range(0, self._grid_size + 1):
-            board.append(list())
-            column_list = board[i]
-            for j in range(0, self._grid_size + 1):
-                tile_to_add = (i, j)
-                column_list.append(tile_to_add)
+        #  Initialize the representation of the game board. The board of tiles and the border fences are shared
+        #  between games of the same size (see '_get_board'), so only the pawns and player-placed fences are stored.
+        self._game_board = {"pawns": {"player_1": (), "player_2": ()},
+                            "fences": {"player_vertical": [], "player_horizontal": []}}
 
         #  Initialize pawn locations.
         self._game_board["pawns"]["player_1"] = (self._grid_size // 2, 0)
         self._game_board["pawns"]["player_2"] = (self._grid_size // 2, self._grid_size - 1)
 
-        #  Initialize the fences around the borders of the playable area.
-        #  Vertical fences are on the left of the associated tile.
-        #  Horizontal fences are above the associated tile.
-        vertical_fences = self._game_board["fences"]["border_vertical"]
-        for i in board[0]:
-            vertical_fences.append(i)
-        for i in board[self._grid_size]:
-            vertical_fences.append(i)
-
-        horizontal_fences = self._game_board["fences"]["border_horizontal"]
-        for i in board:
-            horizontal_fences.append(i[0])
-            horizontal_fences.append(i[self._grid_size])
+        #  Initialize the bitboard mirror of the fences, which already contains the border fences.
+        if use_bitboard:
+            self._bitboard = QuoridorBitboard.Bitboard(self._grid_size)
+        else:
+            self._bitboard = None
 
         #  Initialize the players' available fences.
         self._player_1_fence_count = fence_count
@@ -66,13 +182,52 @@ class QuoridorGame:
         #  Initialize the current game state ("ONGOING", "PLAYER_1_WIN", or "PLAYER_2_WIN").
         self._game_state = "ONGOING"
 
+        #  Initialize the masks of the open fence slots, with bit 'row * grid_size + column' set for each coordinate a
+        #  fence could be placed on. Vertical fences cannot be placed on the left border, nor horizontal fences on the
+        #  top border.
+        self._open_fences = {"v": 0, "h": 0}
+        for i in range(0, self._grid_size):
+            for j in range(1, self._grid_size):
+                self._open_fences["v"] |= 1 << (i * self._grid_size + j)
+                self._open_fences["h"] |= 1 << (j * self._grid_size + i)
+
+        #  Initialize the fences that would cut each player off from their winning tiles. Each player's entry is
+        #  computed when first needed, and discarded whenever it may have changed.
+        self._fence_cuts = {1: None, 2: None}
+
+        #  Initialize the stack of moves applied by 'push_move', which 'pop_move' reverts.
+        self._move_stack = []
+
+        #  Initialize the log of every move made, as (coord, alignment) tuples in the order they were made. Pawn moves
+        #  have no alignment.
+        self._move_log = []
+
+        #  Initialize the Zobrist hash of the position, which covers the pawns, placed fences, fence counts, and the
+        #  player to move, and is updated as each of them changes.
+        self._zobrist_key = zobrist_key("pawn", 1, self.get_player_pawn(1)) ^ zobrist_key("fences", 1, fence_count)
+        self._zobrist_key ^= zobrist_key("pawn", 2, self.get_player_pawn(2)) ^ zobrist_key("fences", 2, fence_count)
+
+        #  Initialize the position history, which counts how many times each position has occurred.
+        self._position_counts = {}
+        self.record_position()
+
+        #  Initialize the cache of each player's legal moves, which holds the moves along with the Zobrist hash and game
+        #  state of the position they were found in. Any change to the position changes one or the other.
+        self._legal_moves = {1: None, 2: None}
+
     def get_grid_size(self):
         """This method returns the size of the grid specified in '__init__'."""
         return self._grid_size
 
     def get_board(self):
-        """This method returns the board, a list of lists of tuples."""
-        return self._game_board["board"]
+        """This method returns the board, a list of lists of tuples indexed by column and then row, with an extra
+        column and row for the border fences. The board is shared by every game of the same size, and must not be
+        changed."""
+        return _get_board(self._grid_size)[0]
+
+    def get_bitboard(self):
+        """This method returns the bitboard mirror of the fences, or None if the game was created without one."""
+        return self._bitboard
 
     def check_in_bounds(self, coord):
         """This method returns True if the given coordinates are within the bounds of the playable area, and False
@@ -100,10 +255,14 @@ class QuoridorGame:
     def set_player_pawn(self, player_num, coord):
         """This method takes a player number and moves that player's pawn to the specified tuple coordinates. Note this
         movement bypasses the rules of the game."""
+        pawns = self._game_board["pawns"]
         if player_num == 1:
-            self._game_board["pawns"]["player_1"] = coord
+            self._zobrist_key ^= zobrist_key("pawn", 1, pawns["player_1"]) ^ zobrist_key("pawn", 1, coord)
+            pawns["player_1"] = coord
         if player_num == 2:
-            self._game_board["pawns"]["player_2"] = coord
+            self._zobrist_key ^= zobrist_key("pawn", 2, pawns["player_2"]) ^ zobrist_key("pawn", 2, coord)
+            pawns["player_2"] = coord
+        self._fence_cuts[player_num] = None
 
     def get_opposing_pawn(self, player_num):
         """This method takes a player number and returns the coordinates of the opposing player's pawn."""
@@ -114,12 +273,12 @@ class QuoridorGame:
 
     def get_vertical_fences(self):
         """This method returns a list of the coordinates of all vertical fences (left of the tile)."""
-        ver_fences = self._game_board["fences"]["border_vertical"] + self._game_board["fences"]["player_vertical"]
+        ver_fences = _get_board(self._grid_size)[1] + self._game_board["fences"]["player_vertical"]
         return ver_fences
 
     def get_horizontal_fences(self):
         """This method returns a list of the coordinates of all horizontal fences (above the tile)."""
-        hor_fences = self._game_board["fences"]["border_horizontal"] + self._game_board["fences"]["player_horizontal"]
+        hor_fences = _get_board(self._grid_size)[2] + self._game_board["fences"]["player_horizontal"]
         return hor_fences
 
     def get_player_vertical_fences(self):
@@ -132,6 +291,12 @@ class QuoridorGame:
         player_hor_fences = self._game_board["fences"]["player_horizontal"]
         return player_hor_fences
 
+    def get_wall_key(self):
+        """This method returns a hashable key of the board's size and player-placed fences, which is equal for two
+        games exactly when their fences block the same moves."""
+        return (self._grid_size, frozenset(self.get_player_vertical_fences()),
+                frozenset(self.get_player_horizontal_fences()))
+
     def get_turn(self):
         """This method returns which player's turn it is: 'player_1' or 'player_2'."""
         return self._current_game_turn
@@ -151,14 +316,57 @@ class QuoridorGame:
             self._current_game_turn = 2
         elif self._current_game_turn == 2:
             self._current_game_turn = 1
+        self._zobrist_key ^= zobrist_key("turn", 2)
 
     def add_fence(self, alignment, coord):
         """This method adds a fence of the given alignment ('vertical' or 'horizontal') to the specified coordinate."""
         fences = self._game_board["fences"]
         if alignment == "vertical":
-            fences["player_vertical"].append(coord)
-        if alignment == "horizontal":
-            fences["player_horizontal"].append(coord)
+            fence_list = fences["player_vertical"]
+            short_alignment = "v"
+        elif alignment == "horizontal":
+            fence_list = fences["player_horizontal"]
+            short_alignment = "h"
+        else:
+            return
+
+        #  A second fence on the same coordinate changes nothing, so it does not change the hash either
+        if coord not in fence_list:
+            self._zobrist_key ^= zobrist_key("fence", short_alignment, coord)
+        fence_list.append(coord)
+        if self._bitboard is not None:
+            self._bitboard.add_fence(short_alignment, coord)
+        self.update_fence_cuts(short_alignment, coord)
+
+    def remove_fence(self, alignment, coord):
+        """This method removes the most recently added fence of the given alignment ('vertical' or 'horizontal') from
+        the specified coordinate. Returns True if a fence was removed, and False otherwise."""
+        fences = self._game_board["fences"]
+        if alignment == "vertical":
+            fence_list = fences["player_vertical"]
+            short_alignment = "v"
+        elif alignment == "horizontal":
+            fence_list = fences["player_horizontal"]
+            short_alignment = "h"
+        else:
+            return False
+
+        if coord not in fence_list:
+            return False
+        for i in range(len(fence_list) - 1, -1, -1):
+            if fence_list[i] == coord:
+                del fence_list[i]
+                break
+
+        #  The slot only opens again if no other fence was placed on the same coordinate
+        if coord not in fence_list:
+            self._zobrist_key ^= zobrist_key("fence", short_alignment, coord)
+            if self._bitboard is not None:
+                self._bitboard.remove_fence(short_alignment, coord)
+            if self.is_fence_slot(short_alignment, coord):
+                self._open_fences[short_alignment] |= 1 << (coord[1] * self._grid_size + coord[0])
+            self._fence_cuts = {1: None, 2: None}
+        return True
 
     def get_remaining_fences(self, player_num):
         """This method takes a player number and returns that player's number of remaining fences."""
@@ -170,9 +378,13 @@ class QuoridorGame:
     def decrement_fence_count(self, player_num):
         """This method takes a player number and decrements the number of that player's remaining fences by 1."""
         if player_num == 1:
+            self._zobrist_key ^= zobrist_key("fences", 1, self._player_1_fence_count)
             self._player_1_fence_count -= 1
+            self._zobrist_key ^= zobrist_key("fences", 1, self._player_1_fence_count)
         if player_num == 2:
+            self._zobrist_key ^= zobrist_key("fences", 2, self._player_2_fence_count)
             self._player_2_fence_count -= 1
+            self._zobrist_key ^= zobrist_key("fences", 2, self._player_2_fence_count)
 
     def get_game_state(self):
         """This method returns the current game state: 'ONGOING','PLAYER_1_WIN', or 'PLAYER_2_WIN'."""
@@ -193,6 +405,39 @@ class QuoridorGame:
         if player_num == 2:
             self._game_state = "PLAYER_2_WIN"
 
+    def get_move_log(self):
+        """This method returns a list of the moves made since the game was created, including those applied by
+        'push_move', as (coord, alignment) tuples in the order they were made. Pawn moves have an alignment of None."""
+        return list(self._move_log)
+
+    def get_zobrist_key(self):
+        """This method returns the 64-bit Zobrist hash of the current position, which covers the pawns, placed fences,
+        fence counts, and the player to move."""
+        return self._zobrist_key
+
+    def get_position_count(self, key=None):
+        """This method returns the number of times the position with the given Zobrist hash (by default, the current
+        position) has occurred in this game."""
+        if key is None:
+            key = self._zobrist_key
+        return self._position_counts.get(key, 0)
+
+    def record_position(self):
+        """This method records an occurrence of the current position in the position history. If the position has now
+        occurred 'REPETITION_LIMIT' times during an ongoing game, the game is declared a stalemate."""
+        key = self._zobrist_key
+        self._position_counts[key] = self._position_counts.get(key, 0) + 1
+        if self._position_counts[key] >= REPETITION_LIMIT and self.is_ongoing():
+            self.set_victory(0)
+
+    def unrecord_position(self):
+        """This method removes an occurrence of the current position from the position history."""
+        key = self._zobrist_key
+        if key in self._position_counts:
+            self._position_counts[key] -= 1
+            if self._position_counts[key] == 0:
+                del self._position_counts[key]
+
     def is_winner(self, player_num):
         """This method takes the players' number and returns True if that player has won, and False if that player
         has not won."""
@@ -323,6 +568,15 @@ class QuoridorGame:
         if account_pawn is None:
             account_pawn = True
 
+        #  Use the bitboard masks when available, which avoids rebuilding and scanning the fence lists
+        if self._bitboard is not None:
+            if player_num == 1:
+                opposing_pawn = self._game_board["pawns"]["player_2"]
+            else:
+                opposing_pawn = self._game_board["pawns"]["player_1"]
+            return self._bitboard.valid_tiles(player_num, coord, opposing_pawn, prop_fence_align, prop_fence_coord,
+                                              account_pawn)
+
         #  Get the positions of the fences
         ver_fences = list(self.get_vertical_fences())
         hor_fences = list(self.get_horizontal_fences())
@@ -347,15 +601,75 @@ class QuoridorGame:
         valid_tiles = tiles_above + tiles_right + tiles_below + tiles_left
         return valid_tiles
 
+    def legal_moves(self, player_num):
+        """This method is a generator that yields every legal move of the given player in the current position as a
+        tuple (coord, alignment): first the pawn moves, with an alignment of None, in the order of 'valid_tiles', and
+        then the legal fences, with an alignment of 'v' or 'h', by column, then row, then alignment. No moves are
+        yielded once the game is over. The turn is not considered.
+
+        The moves are found once per position and cached, so enumerating them again before the position changes is
+        cheap, and the game may be changed while the moves are being iterated."""
+        key = (self._zobrist_key, self._game_state)
+        cached = self._legal_moves[player_num]
+        if cached is None or cached[0] != key:
+            cached = (key, self.find_legal_moves(player_num))
+            self._legal_moves[player_num] = cached
+        for i in cached[1]:
+            yield i
+
+    def find_legal_moves(self, player_num):
+        """This method returns a tuple of every legal move of the given player, as yielded by 'legal_moves', without
+        using the cache."""
+        if not self.is_ongoing():
+            return ()
+
+        moves = []
+        for i in self.valid_tiles(player_num, self.get_player_pawn(player_num)):
+            moves.append((i, None))
+
+        if self.get_remaining_fences(player_num) > 0:
+            legal_v = self.get_legal_fence_mask("v")
+            legal_h = self.get_legal_fence_mask("h")
+            for column in range(0, self._grid_size):
+                for row in range(0, self._grid_size):
+                    bit = 1 << (row * self._grid_size + column)
+                    if legal_v & bit:
+                        moves.append(((column, row), "v"))
+                    if legal_h & bit:
+                        moves.append(((column, row), "h"))
+        return tuple(moves)
+
+    def perft(self, depth):
+        """This method returns the number of move sequences of the given length that can be played from the current
+        position, with each player moving in turn. Games that end before the sequence does are not counted. Used to
+        check move generation against known counts."""
+        if depth == 0:
+            return 1
+
+        player_num = self.get_turn()
+        count = 0
+        for coord, alignment in self.legal_moves(player_num):
+            if depth == 1:
+                count += 1
+                continue
+            self.push_move(player_num, coord, alignment)
+            count += self.perft(depth - 1)
+            self.pop_move()
+        return count
+
     def has_valid_moves(self, player_num):
         """This method returns True if the given player has any valid moves to make, either moving their pawn or
-        placing a fence. Returns False otherwise."""
+        placing a fence. Returns False otherwise. A player left without a valid move after their opponent's move has
+        drawn by stalemate, so the player to move in an ongoing game always has a legal move."""
         valid_tiles = self.valid_tiles(player_num, self.get_player_pawn(player_num))
 
-        if len(valid_tiles) == 0 and self.get_remaining_fences(player_num) < 1:
+        if len(valid_tiles) > 0:
+            return True
+        if self.get_remaining_fences(player_num) < 1:
             return False
 
-        return True
+        #  A player with fences left may still have nowhere to place them
+        return self.get_legal_fence_mask("v") != 0 or self.get_legal_fence_mask("h") != 0
 
     def move_pawn(self, player_num, coord):
         """This method moves the specified player's pawn (1 or 2) to the specified coordinates (as
@@ -380,45 +694,221 @@ class QuoridorGame:
             if not self.has_valid_moves(self.get_opposing_num(player_num)):
                 self.set_victory(0)
             self.advance_turn()
+            self.record_position()
+            self._move_log.append((coord, None))
             return True
 
         return False
 
     def fair_play_checker(self, player_num, prop_fence_align, prop_fence_coord, accessible_tiles=None, init_call=None):
         """This method returns True if there is a path that allows the given player's pawn to reach the end
-         of the board and win. Returns False otherwise."""
+         of the board and win. Returns False otherwise. Any tiles in 'accessible_tiles' are searched from as well as
+         the player's current position (which is skipped if 'init_call' is False)."""
         if init_call is None:
             init_call = True
 
-        #  Track the tiles that are accessible by the given player
-        if accessible_tiles is None:
-            accessible_tiles = []
-
-        #  Add the player's current position to the list of accessible tiles
+        #  Track the tiles that the search starts from
+        start_tiles = []
+        if accessible_tiles is not None:
+            start_tiles.extend(accessible_tiles)
         if init_call:
-            accessible_tiles.append(self.get_player_pawn(player_num))
-
-        #  Check the valid tiles for each of the already tracked tiles
-        valid_tile_count = 0
-        for i in range(0, len(accessible_tiles)):
-            valid_tiles = self.valid_tiles(player_num, accessible_tiles[i], prop_fence_align, prop_fence_coord, False)
-            for j in valid_tiles:
-                if j not in accessible_tiles:
-                    accessible_tiles.append(j)
-                    valid_tile_count += 1
-
-        #print(accessible_tiles)
-
-        if valid_tile_count == 0:
-            for i in range(0, len(accessible_tiles)):
-                if accessible_tiles[i][1] == 0 and player_num == 2:
+            start_tiles.append(self.get_player_pawn(player_num))
+
+        #  Flood the whole frontier at once using the bitboard masks when available
+        if self._bitboard is not None:
+            start_mask = self._bitboard.tiles_to_mask(start_tiles)
+            return self._bitboard.path_exists(player_num, start_mask, prop_fence_align, prop_fence_coord)
+
+        #  Otherwise, search breadth-first one frontier at a time, stopping as soon as a winning tile is seen
+        visited = set(start_tiles)
+        frontier = start_tiles
+        while len(frontier) > 0:
+            next_frontier = []
+            for i in frontier:
+                if self.is_winning_tile(player_num, i):
                     return True
-                if accessible_tiles[i][1] == (self.get_grid_size() - 1) and player_num == 1:
-                    return True
-                if i == (len(accessible_tiles) - 1):
-                    return False
-        else:
-            return self.fair_play_checker(player_num, prop_fence_align, prop_fence_coord, accessible_tiles, False)
+                for j in self.valid_tiles(player_num, i, prop_fence_align, prop_fence_coord, False):
+                    if j not in visited:
+                        visited.add(j)
+                        next_frontier.append(j)
+            frontier = next_frontier
+        return False
+
+    def is_fence_slot(self, alignment, coord):
+        """This method takes a fence alignment ('v' or 'h') and coordinate, and returns True if a fence could be
+        placed there on an empty board, and False if it is outside the playable area or on its border."""
+        if not self.check_in_bounds(coord):
+            return False
+        if alignment == "v" and coord[0] != 0:
+            return True
+        if alignment == "h" and coord[1] != 0:
+            return True
+        return False
+
+    def fence_tiles(self, alignment, coord):
+        """This method takes a fence alignment ('v' or 'h') and coordinate, and returns the two tiles the fence is
+        between as a tuple."""
+        if alignment == "v":
+            return (coord[0] - 1, coord[1]), coord
+        return (coord[0], coord[1] - 1), coord
+
+    def fence_between(self, tile_1, tile_2):
+        """This method takes two orthogonally adjacent tiles and returns the fence that would block movement between
+        them as a tuple (alignment, coord), with alignment 'v' or 'h'."""
+        if tile_1[1] == tile_2[1]:
+            return "v", (max(tile_1[0], tile_2[0]), tile_1[1])
+        return "h", (tile_1[0], max(tile_1[1], tile_2[1]))
+
+    def update_fence_cuts(self, alignment, coord):
+        """This method updates the fence legality information after a fence of the given alignment ('v' or 'h') is
+        added. The fence slot is closed, and a player's cut fences are only discarded if the new fence touches the
+        region of the board that player's pawn can reach."""
+        if not self.is_fence_slot(alignment, coord):
+            return
+
+        self._open_fences[alignment] &= ~(1 << (coord[1] * self._grid_size + coord[0]))
+
+        fence_tiles = self.fence_tiles(alignment, coord)
+        for player_num in (1, 2):
+            fence_cuts = self._fence_cuts[player_num]
+            if fence_cuts is not None:
+                if fence_tiles[0] in fence_cuts["region"] or fence_tiles[1] in fence_cuts["region"]:
+                    self._fence_cuts[player_num] = None
+
+    def get_fence_cuts(self, player_num):
+        """This method returns a dictionary describing the fences that would cut the given player off from their
+        winning tiles: 'region' is the set of tiles the player's pawn can reach, 'reaches_goal' is True if that region
+        contains a winning tile, and 'v' and 'h' are masks of the open fence slots that would break the fair play rule
+        for the player.
+
+        Only a fence on the path found to a winning tile can cut the player off, so only the fences along that path
+        are checked with 'fair_play_checker'."""
+        if self._fence_cuts[player_num] is not None:
+            return self._fence_cuts[player_num]
+
+        #  Find every tile the player can reach, remembering how each tile was first reached
+        pawn = self.get_player_pawn(player_num)
+        parents = {pawn: None}
+        goal = None
+        frontier = [pawn]
+        while len(frontier) > 0:
+            next_frontier = []
+            for i in frontier:
+                if goal is None and self.is_winning_tile(player_num, i):
+                    goal = i
+                for j in self.valid_tiles(player_num, i, account_pawn=False):
+                    if j not in parents:
+                        parents[j] = i
+                        next_frontier.append(j)
+            frontier = next_frontier
+
+        fence_cuts = {"region": frozenset(parents), "reaches_goal": goal is not None, "v": 0, "h": 0}
+
+        #  Without a path, every open slot breaks the fair play rule
+        if goal is None:
+            fence_cuts["v"] = self._open_fences["v"]
+            fence_cuts["h"] = self._open_fences["h"]
+
+        #  Otherwise, check each open fence slot crossed by the path back from the winning tile
+        tile = goal
+        while tile is not None and parents[tile] is not None:
+            prev_tile = parents[tile]
+            alignment, coord = self.fence_between(prev_tile, tile)
+            bit = 1 << (coord[1] * self._grid_size + coord[0])
+            if self._open_fences[alignment] & bit and not self.fair_play_checker(player_num, alignment, coord):
+                fence_cuts[alignment] |= bit
+            tile = prev_tile
+
+        self._fence_cuts[player_num] = fence_cuts
+        return fence_cuts
+
+    def get_legal_fence_mask(self, alignment):
+        """This method takes a fence alignment ('v' or 'h') and returns a mask of the fence slots where a fence may
+        currently be placed without breaking the fair play rule, with bit 'row * grid_size + column' set for each
+        legal coordinate. The remaining fence counts and turn are not considered."""
+        cuts = self.get_fence_cuts(1)[alignment] | self.get_fence_cuts(2)[alignment]
+        return self._open_fences[alignment] & ~cuts
+
+    def get_legal_fences(self, alignment):
+        """This method takes a fence alignment ('v' or 'h') and returns a list of the coordinates where a fence may
+        currently be placed."""
+        legal_fence_mask = self.get_legal_fence_mask(alignment)
+        legal_fences = []
+        for i in range(0, self._grid_size * self._grid_size):
+            if legal_fence_mask >> i & 1:
+                legal_fences.append((i % self._grid_size, i // self._grid_size))
+        return legal_fences
+
+    def is_legal_fence(self, alignment, coord):
+        """This method takes a fence alignment ('v' or 'h') and coordinate, and returns True if a fence may currently
+        be placed there, and False otherwise. The remaining fence counts and turn are not considered."""
+        if not self.is_fence_slot(alignment, coord):
+            return False
+        return bool(self.get_legal_fence_mask(alignment) >> (coord[1] * self._grid_size + coord[0]) & 1)
+
+    def fence_allows_fair_play(self, alignment, coord):
+        """This method takes a fence alignment ('v' or 'h') and coordinate, and returns the same answer as checking
+        'fair_play_checker' for both players with that proposed fence. A fence that is already placed or outside the
+        open slots changes nothing, so it allows fair play if both players can currently reach a winning tile."""
+        if self.is_fence_slot(alignment, coord):
+            bit = 1 << (coord[1] * self._grid_size + coord[0])
+            if self._open_fences[alignment] & bit:
+                return not (self.get_fence_cuts(1)[alignment] | self.get_fence_cuts(2)[alignment]) & bit
+        return self.get_fence_cuts(1)["reaches_goal"] and self.get_fence_cuts(2)["reaches_goal"]
+
+    def goal_distance(self, player_num, prop_fence_align=None, prop_fence_coord=None, start_tile=None):
+        """This method returns the length of the shortest path from the given player's pawn (or the start tile, if
+        given) to one of their winning tiles, ignoring the opposing pawn. This is the same distance as
+        'Bot.find_min_moves' with 'account_pawn' False. Returns None if no winning tile can be reached."""
+        if start_tile is None:
+            start_tile = self.get_player_pawn(player_num)
+
+        if self._bitboard is not None:
+            start_mask = self._bitboard.tiles_to_mask([start_tile])
+            return self._bitboard.goal_distance(player_num, start_mask, prop_fence_align, prop_fence_coord)
+
+        distance = 0
+        visited = {start_tile}
+        frontier = [start_tile]
+        while len(frontier) > 0:
+            next_frontier = []
+            for i in frontier:
+                if self.is_winning_tile(player_num, i):
+                    return distance
+                for j in self.valid_tiles(player_num, i, prop_fence_align, prop_fence_coord, False):
+                    if j not in visited:
+                        visited.add(j)
+                        next_frontier.append(j)
+            frontier = next_frontier
+            distance += 1
+        return None
+
+    def batch_goal_distances(self, candidates):
+        """This method takes a list of hypothetical fences as (alignment, coord) tuples and returns, for each fence, a
+        tuple of Player 1's and Player 2's 'goal_distance' with that fence placed (None if unreachable). All of the
+        fences are evaluated together with NumPy (see 'QuoridorWavefront'), which is imported when this method is
+        first called."""
+        import QuoridorWavefront
+
+        if len(candidates) == 0:
+            return []
+
+        row_edges, column_edges = QuoridorWavefront.open_edges(self._grid_size, self.get_player_vertical_fences(),
+                                                               self.get_player_horizontal_fences(), candidates)
+        distances_1 = QuoridorWavefront.goal_distances(row_edges, column_edges, self._grid_size - 1,
+                                                       self.get_player_pawn(1)).tolist()
+        distances_2 = QuoridorWavefront.goal_distances(row_edges, column_edges, 0, self.get_player_pawn(2)).tolist()
+
+        distances = []
+        for i in range(0, len(candidates)):
+            distance_1 = distances_1[i]
+            distance_2 = distances_2[i]
+            if distance_1 < 0:
+                distance_1 = None
+            if distance_2 < 0:
+                distance_2 = None
+            distances.append((distance_1, distance_2))
+        return distances
 
     def place_fence(self, player_num, alignment, coord):
         """This method takes a player's number (1 or 2) and attempts to place one of their fences on the specified
@@ -437,35 +927,96 @@ class QuoridorGame:
         if not self.check_in_bounds(coord):
             return False
 
-        if alignment == "v":
-            if coord not in self.get_vertical_fences():
-                if not self.fair_play_checker(self.get_opposing_num(player_num), alignment, coord):
-                    return False
-                elif not self.fair_play_checker(player_num, alignment, coord):
-                    return False
-                else:
-                    self.add_fence("vertical", coord)
-                    self.decrement_fence_count(player_num)
-                    if not self.has_valid_moves(self.get_opposing_num(player_num)):
-                        self.set_victory(0)
-                    self.advance_turn()
-                    return True
+        #  The legal fence masks account for placed fences, the border, and the fair play rule for both players
+        if not self.is_legal_fence(alignment, coord):
+            return False
 
+        if alignment == "v":
+            self.add_fence("vertical", coord)
         if alignment == "h":
-            if coord not in self.get_horizontal_fences():
-                if not self.fair_play_checker(self.get_opposing_num(player_num), alignment, coord):
-                    return False
-                elif not self.fair_play_checker(player_num, alignment, coord):
-                    return False
-                else:
-                    self.add_fence("horizontal", coord)
-                    self.decrement_fence_count(player_num)
-                    if not self.has_valid_moves(self.get_opposing_num(player_num)):
-                        self.set_victory(0)
-                    self.advance_turn()
-                return True
+            self.add_fence("horizontal", coord)
+        self.decrement_fence_count(player_num)
+        if not self.has_valid_moves(self.get_opposing_num(player_num)):
+            self.set_victory(0)
+        self.advance_turn()
+        self.record_position()
+        self._move_log.append((coord, alignment))
+        return True
 
-        return False
+    def push_move(self, player_num, coord, alignment=None):
+        """This method applies a move for the given player without checking that it is legal, so that it can later be
+        reverted with 'pop_move'. With no alignment the player's pawn is moved to the given coordinate, and with an
+        alignment ('v' or 'h') one of the player's fences is placed there. Victory, stalemate, the turn, and the
+        position history are updated as in 'move_pawn' and 'place_fence'. Intended for searches, which only push
+        moves they generated as legal."""
+        undo = (player_num, coord, alignment, self.get_player_pawn(player_num), self._current_game_turn,
+                self._game_state, dict(self._open_fences), dict(self._fence_cuts), self._zobrist_key)
+        self._move_stack.append(undo)
+
+        if alignment is None:
+            self.set_player_pawn(player_num, coord)
+            if self.is_winning_tile(player_num, coord):
+                self.set_victory(player_num)
+        else:
+            if alignment == "v":
+                self.add_fence("vertical", coord)
+            if alignment == "h":
+                self.add_fence("horizontal", coord)
+            self.decrement_fence_count(player_num)
+
+        if not self.has_valid_moves(self.get_opposing_num(player_num)):
+            self.set_victory(0)
+        self.advance_turn()
+        self.record_position()
+        self._move_log.append((coord, alignment))
+
+    def pop_move(self):
+        """This method reverts the most recent move applied by 'push_move', restoring the pawns, fences, fence counts,
+        turn, and game state exactly. Returns the reverted move as a tuple (player_num, coord, alignment), or None if
+        there are no moves to revert."""
+        if len(self._move_stack) == 0:
+            return None
+
+        player_num, coord, alignment, prev_pawn, prev_turn, prev_state, open_fences, fence_cuts, zobrist_key = \
+            self._move_stack.pop()
+        self.unrecord_position()
+        self._move_log.pop()
+
+        if alignment is None:
+            self.set_player_pawn(player_num, prev_pawn)
+        else:
+            if alignment == "v":
+                self.remove_fence("vertical", coord)
+            if alignment == "h":
+                self.remove_fence("horizontal", coord)
+            if player_num == 1:
+                self._player_1_fence_count += 1
+            if player_num == 2:
+                self._player_2_fence_count += 1
+
+        self._current_game_turn = prev_turn
+        self._game_state = prev_state
+        self._open_fences = open_fences
+        self._fence_cuts = fence_cuts
+        self._zobrist_key = zobrist_key
+        return player_num, coord, alignment
+
+    def to_bytes(self):
+        """This method returns the current position encoded into 'position_size(grid_size)' bytes: both pawns, both
+        fence counts, the turn, the game state, and the placed fences as two bitplanes. The board grid and border
+        fences are not stored, as they follow from the grid size, and neither are the position history, the move
+        log, or the 'push_move' stack. Only fences within the playable area are stored, and a fence placed twice on
+        the same coordinate is stored once. The game can be rebuilt with 'game_from_bytes'."""
+        masks = []
+        for fences in (self.get_player_vertical_fences(), self.get_player_horizontal_fences()):
+            mask = 0
+            for i in fences:
+                if self.check_in_bounds(i):
+                    mask |= 1 << (i[1] * self._grid_size + i[0])
+            masks.append(mask)
+        return encode_position(self._grid_size, self.get_player_pawn(1), self.get_player_pawn(2),
+                               self._player_1_fence_count, self._player_2_fence_count, self._current_game_turn,
+                               self._game_state, masks[0], masks[1], self._bitboard is not None)
 
     def dir_move_pawn(self, player_num, direction):
         """This method moves the specified player's pawn in the specified direction: 'up', 'down', 'left', or
@@ -501,7 +1052,7 @@ class QuoridorGame:
         p1_valid = self.valid_tiles(1, self.get_player_pawn(1))
         p2_valid = self.valid_tiles(2, self.get_player_pawn(2))
 
-        board = self._game_board["board"]
+        board = self.get_board()
         display_row_list = []
         for i in range(0, self._grid_size):
             count = 0
@@ -530,8 +1081,8 @@ class QuoridorGame:
         print("Horizontal Fences:", self._game_board["fences"]["player_horizontal"])
         print("Player 1 Remaining Fences:", self.get_remaining_fences(1))
         print("Player 2 Remaining Fences:", self.get_remaining_fences(2))
-        #print("Border Vertical Fences:", self._game_board["fences"]["border_vertical"])
-        #print("Border Horizontal Fences:", self._game_board["fences"]["border_horizontal"])
+        #print("Border Vertical Fences:", _get_board(self._grid_size)[1])
+        #print("Border Horizontal Fences:", _get_board(self._grid_size)[2])
 
 
 if __name__ == '__main__':
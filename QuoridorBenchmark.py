@@ -0,0 +1,290 @@
+# Description: This program times the key operations of the Quoridor engine and bot over seeded random positions, so
+#   that the speed of successive engine changes can be compared. For each board size and number of placed fences, a
+#   set of random positions is generated from the seed, and each operation is timed over every position: 'valid_tiles',
+#   'fair_play_checker', 'place_fence', 'Bot.find_min_moves', 'Bot.find_optimal_path',
+#   'Bot.get_optimal_fence_placement', and a full 'Bot.make_move_v2'.
+#
+#   The engine and the bots cache what they find: each game its legal fences and the moves from each tile, and every
+#   bot in the process its distance fields (see 'QuoridorDistance'). So that an operation is not timed on the answers
+#   of an earlier round, every round rebuilds each position from its encoding and empties the distance field cache,
+#   and the times are those of a cold start.
+#
+#   The results are written as JSON, with the mean time per call of each operation in microseconds. Given the JSON of
+#   an earlier run as a baseline, every operation that has become slower by more than the threshold is reported as a
+#   regression, and the program exits with status 1.
+#
+#   Example: python QuoridorBenchmark.py --output after.json --baseline before.json
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import Quoridor
+import QuoridorBot
+import QuoridorDistance
+
+#  Default benchmark settings.
+DEFAULT_GRID_SIZES = (5, 9, 13, 17, 21)
+DEFAULT_PLACED_FENCES = (0, 5, 10, 20)
+DEFAULT_POSITIONS = 5
+DEFAULT_ROUNDS = 3
+DEFAULT_SEED = 0
+DEFAULT_THRESHOLD = 0.2
+
+#  The largest number of candidate fences timed per position by 'fair_play_checker' and 'place_fence'.
+FENCE_SAMPLE_SIZE = 20
+
+#  The operations timed, in the order they are reported.
+OPERATIONS = ("valid_tiles", "fair_play_checker", "place_fence", "find_min_moves", "find_optimal_path",
+              "get_optimal_fence_placement", "make_move_v2")
+
+
+def random_position(grid_size, placed_fences, rng):
+    """This function returns a game in a random position drawn from the given random number generator: both pawns
+    are moved a few random steps, and up to 'placed_fences' random legal fences are added. Each player is left with
+    'placed_fences' fences to place (at least one, so that fence placement can be timed)."""
+    q = Quoridor.QuoridorGame(grid_size, max(1, placed_fences))
+    for i in range(0, rng.randint(0, grid_size)):
+        player_num = rng.choice((1, 2))
+        tiles = q.valid_tiles(player_num, q.get_player_pawn(player_num))
+        tiles = [j for j in tiles if not q.is_winning_tile(player_num, j)]
+        if len(tiles) > 0:
+            q.set_player_pawn(player_num, rng.choice(tiles))
+
+    for i in range(0, placed_fences):
+        fences = [(alignment, coord) for alignment in ("v", "h") for coord in q.get_legal_fences(alignment)]
+        if len(fences) == 0:
+            break
+        alignment, coord = rng.choice(fences)
+        if alignment == "v":
+            q.add_fence("vertical", coord)
+        else:
+            q.add_fence("horizontal", coord)
+    return q
+
+
+def fence_sample(q, rng):
+    """This function returns up to 'FENCE_SAMPLE_SIZE' random fence slots of the game, legal or not, as
+    (alignment, coord) tuples."""
+    fences = []
+    for alignment in ("v", "h"):
+        for column in range(0, q.get_grid_size()):
+            for row in range(0, q.get_grid_size()):
+                if q.is_fence_slot(alignment, (column, row)):
+                    fences.append((alignment, (column, row)))
+    rng.shuffle(fences)
+    return fences[:FENCE_SAMPLE_SIZE]
+
+
+def time_operation(operation, q, fences, seed=None):
+    """This function performs the named operation on the game, and returns the time it took in seconds along with
+    the number of calls made. Operations that change the game are performed on a copy. The bot making a move draws
+    its random choices from a generator seeded with 'seed' (by default, 'DEFAULT_SEED')."""
+    if seed is None:
+        seed = DEFAULT_SEED
+    bot = QuoridorBot.Bot(q, q.get_turn())
+    calls = 0
+    elapsed = 0.0
+
+    if operation == "valid_tiles":
+        tiles = [(column, row) for column in range(0, q.get_grid_size()) for row in range(0, q.get_grid_size())]
+        start = time.perf_counter()
+        for player_num in (1, 2):
+            for tile in tiles:
+                q.valid_tiles(player_num, tile)
+        elapsed = time.perf_counter() - start
+        calls = 2 * len(tiles)
+
+    elif operation == "fair_play_checker":
+        start = time.perf_counter()
+        for alignment, coord in fences:
+            q.fair_play_checker(1, alignment, coord)
+            q.fair_play_checker(2, alignment, coord)
+        elapsed = time.perf_counter() - start
+        calls = 2 * len(fences)
+
+    elif operation == "place_fence":
+        position = q.to_bytes()
+        for alignment, coord in fences:
+            game = Quoridor.game_from_bytes(position)
+            start = time.perf_counter()
+            game.place_fence(game.get_turn(), alignment, coord)
+            elapsed += time.perf_counter() - start
+        calls = len(fences)
+
+    elif operation == "find_min_moves":
+        start = time.perf_counter()
+        for player_num in (1, 2):
+            bot.find_min_moves(player_num, True)
+            bot.find_min_moves(player_num, False)
+        elapsed = time.perf_counter() - start
+        calls = 4
+
+    elif operation == "find_optimal_path":
+        start = time.perf_counter()
+        for player_num in (1, 2):
+            bot.find_optimal_path(player_num, True)
+        elapsed = time.perf_counter() - start
+        calls = 2
+
+    elif operation == "get_optimal_fence_placement":
+        start = time.perf_counter()
+        bot.get_optimal_fence_placement(q.get_turn(), False)
+        elapsed = time.perf_counter() - start
+        calls = 1
+
+    elif operation == "make_move_v2":
+        game = Quoridor.game_from_bytes(q.to_bytes())
+        bot = QuoridorBot.Bot(game, game.get_turn(), rng=random.Random(seed))
+        start = time.perf_counter()
+        bot.make_move_v2(game.get_turn())
+        elapsed = time.perf_counter() - start
+        calls = 1
+
+    return elapsed, calls
+
+
+def run_benchmarks(grid_sizes=None, placed_fences=None, positions=None, rounds=None, seed=None, operations=None):
+    """This function times each operation over 'positions' random positions for every combination of grid size and
+    number of placed fences, and returns the results as a dictionary that can be written as JSON. Each operation is
+    timed 'rounds' times and the fastest round is kept, which reduces the effect of other activity on the machine.
+    Every round starts cold, on positions rebuilt from their encodings and with the distance field cache emptied."""
+    if grid_sizes is None:
+        grid_sizes = DEFAULT_GRID_SIZES
+    if placed_fences is None:
+        placed_fences = DEFAULT_PLACED_FENCES
+    if positions is None:
+        positions = DEFAULT_POSITIONS
+    if rounds is None:
+        rounds = DEFAULT_ROUNDS
+    if seed is None:
+        seed = DEFAULT_SEED
+    if operations is None:
+        operations = OPERATIONS
+
+    #  Perform every operation once before timing, so that lazy imports are not timed
+    rng = random.Random(seed)
+    q = random_position(5, 1, rng)
+    for operation in operations:
+        time_operation(operation, q, fence_sample(q, rng))
+
+    results = {}
+    for grid_size in grid_sizes:
+        for fence_count in placed_fences:
+            #  Every configuration has its own seed, so its positions do not depend on which others are run
+            rng = random.Random(repr((seed, grid_size, fence_count)))
+            games = []
+            for i in range(0, positions):
+                q = random_position(grid_size, fence_count, rng)
+                games.append((q.to_bytes(), fence_sample(q, rng)))
+
+            config_results = {}
+            for operation in operations:
+                best_elapsed = None
+                calls = 0
+                for i in range(0, rounds):
+                    round_elapsed = 0.0
+                    calls = 0
+                    for position, fences in games:
+                        q = Quoridor.game_from_bytes(position)
+                        QuoridorDistance.clear_cache()
+                        #  'make_move_v2' picks among equally good moves at random, so every round is seeded alike
+                        elapsed, call_count = time_operation(operation, q, fences, seed)
+                        round_elapsed += elapsed
+                        calls += call_count
+                    if best_elapsed is None or round_elapsed < best_elapsed:
+                        best_elapsed = round_elapsed
+                config_results[operation] = {"calls": calls, "total_s": best_elapsed,
+                                             "mean_us": 1000000 * best_elapsed / max(1, calls)}
+            results["grid=%d,fences=%d" % (grid_size, fence_count)] = config_results
+
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(), "seed": seed,
+                     "positions": positions, "rounds": rounds, "grid_sizes": list(grid_sizes),
+                     "placed_fences": list(placed_fences)},
+            "results": results}
+
+
+def find_regressions(report, baseline, threshold=None):
+    """This function compares a report from 'run_benchmarks' with an earlier one, and returns a list of
+    (configuration, operation, baseline_us, current_us) tuples for every operation whose mean time per call grew by
+    more than the threshold (a fraction, such as 0.2 for 20%)."""
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLD
+
+    regressions = []
+    for config, operations in report["results"].items():
+        baseline_operations = baseline["results"].get(config, {})
+        for operation, result in operations.items():
+            if operation not in baseline_operations:
+                continue
+            baseline_us = baseline_operations[operation]["mean_us"]
+            if result["mean_us"] > baseline_us * (1 + threshold):
+                regressions.append((config, operation, baseline_us, result["mean_us"]))
+    return regressions
+
+
+def print_report(report, baseline=None):
+    """This function prints the mean time per call of each operation in a report, and its change from the baseline
+    if one is given."""
+    for config, operations in report["results"].items():
+        print(config)
+        for operation, result in operations.items():
+            line = "  %-28s %12.1f us" % (operation, result["mean_us"])
+            if baseline is not None and operation in baseline["results"].get(config, {}):
+                baseline_us = baseline["results"][config][operation]["mean_us"]
+                if baseline_us > 0:
+                    line += "  (%+.0f%%)" % (100 * (result["mean_us"] / baseline_us - 1))
+            print(line)
+
+
+def parse_int_list(text):
+    """This function takes a comma-separated list of integers, such as '5,9,13', and returns it as a tuple."""
+    return tuple(int(i) for i in text.split(","))
+
+
+def main():
+    """This function runs the benchmarks from the command line arguments."""
+    parser = argparse.ArgumentParser(description="Time the Quoridor engine and bot over seeded random positions.")
+    parser.add_argument("--grid-sizes", type=parse_int_list, default=DEFAULT_GRID_SIZES,
+                        help="comma-separated board sizes")
+    parser.add_argument("--fences", type=parse_int_list, default=DEFAULT_PLACED_FENCES,
+                        help="comma-separated numbers of placed fences")
+    parser.add_argument("--positions", type=int, default=DEFAULT_POSITIONS, help="positions per configuration")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="timing rounds, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the random positions")
+    parser.add_argument("--operations", type=lambda text: tuple(text.split(",")), default=OPERATIONS,
+                        help="comma-separated operations to time (default: all)")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown, as a fraction, reported as a regression")
+    args = parser.parse_args()
+
+    for operation in args.operations:
+        if operation not in OPERATIONS:
+            parser.error("Unknown operation '" + operation + "'; expected one of: " + ", ".join(OPERATIONS))
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    report = run_benchmarks(args.grid_sizes, args.fences, args.positions, args.rounds, args.seed, args.operations)
+    print_report(report, baseline)
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if baseline is not None:
+        regressions = find_regressions(report, baseline, args.threshold)
+        for config, operation, baseline_us, current_us in regressions:
+            print("REGRESSION: %s %s %.1f us -> %.1f us" % (config, operation, baseline_us, current_us))
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
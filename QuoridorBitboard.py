@@ -0,0 +1,283 @@
+# Description: This module provides a bitboard representation of the walls of a Quoridor board. Each tile is given
+#   the index 'row * grid_size + column', and a set of tiles is stored as the bits of a single Python integer. Fences
+#   are kept as four 'blocked' masks, one per direction of movement, so the neighbours of a tile (or of a whole set of
+#   tiles) are found with a shift and a mask instead of scanning lists of fence coordinates.
+#
+#   The border of the playable area is stored in the same masks, which means no neighbour generated by a shift can
+#   ever wrap around to the other side of the board.
+
+#  Static tables shared by every bitboard of the same grid size.
+_TABLES = {}
+
+
+def _get_tables(grid_size):
+    """This function returns the static tables for the given grid size: the tile tuple of each index, the mask of
+    every tile, and the border masks for each direction. The tables are built once per grid size."""
+    if grid_size not in _TABLES:
+        tiles = []
+        for i in range(0, grid_size * grid_size):
+            tiles.append((i % grid_size, i // grid_size))
+
+        row_mask = (1 << grid_size) - 1
+        column_mask = 0
+        for i in range(0, grid_size):
+            column_mask |= 1 << (i * grid_size)
+
+        all_tiles = (1 << (grid_size * grid_size)) - 1
+        border_up = row_mask
+        border_down = row_mask << (grid_size * (grid_size - 1))
+        border_left = column_mask
+        border_right = column_mask << (grid_size - 1)
+
+        #  The neighbourhood of a tile is the tile itself and its orthogonal neighbours, which are the only tiles
+        #  whose fences are consulted when finding the moves from that tile.
+        neighbourhoods = []
+        for i in range(0, grid_size * grid_size):
+            neighbourhood = ((1 << i) | (1 << i >> grid_size) | (1 << i << grid_size)) & all_tiles
+            if i % grid_size != 0:
+                neighbourhood |= 1 << (i - 1)
+            if i % grid_size != grid_size - 1:
+                neighbourhood |= 1 << (i + 1)
+            neighbourhoods.append(neighbourhood)
+
+        _TABLES[grid_size] = (tiles, all_tiles, (border_up, border_down, border_left, border_right), neighbourhoods,
+                              {})
+    return _TABLES[grid_size]
+
+
+class Bitboard:
+    """This class stores the walls of a Quoridor board as integer bitmasks and generates the tiles a pawn may move to
+    from them. A set bit in a 'blocked' mask means a pawn on that tile may not move in that direction."""
+
+    def __init__(self, grid_size):
+        """Initializes an empty bitboard of the given grid size, with only the border fences in place."""
+        self._grid_size = grid_size
+        self._tiles, self._all_tiles, self._borders, self._neighbourhoods, self._fence_cache = _get_tables(grid_size)
+        self._block_up, self._block_down, self._block_left, self._block_right = self._borders
+
+        #  Cache of the moves from each tile under the current fences. Each player (negated when the opposing pawn is
+        #  ignored) maps to the opposing pawn the table was filled for and a dictionary of moves by tile index, which
+        #  only holds the tiles asked about, so that games on large boards stay small.
+        self._valid_cache = {}
+
+    def get_grid_size(self):
+        """This method returns the size of the grid the bitboard was created with."""
+        return self._grid_size
+
+    def index(self, coord):
+        """This method takes a tile coordinate as a tuple (column, row) and returns its bit index."""
+        return coord[1] * self._grid_size + coord[0]
+
+    def tile(self, index):
+        """This method takes a bit index and returns the tile coordinate as a tuple (column, row)."""
+        return self._tiles[index]
+
+    def tiles_to_mask(self, coords):
+        """This method takes a list of tile coordinates and returns the mask with the bit of each tile set."""
+        n = self._grid_size
+        mask = 0
+        for coord in coords:
+            mask |= 1 << (coord[1] * n + coord[0])
+        return mask
+
+    def goal_mask(self, player_num):
+        """This method returns the mask of the tiles the given player wins on: the bottom row for Player 1, and the
+        top row for Player 2."""
+        if player_num == 1:
+            return self._borders[1]
+        if player_num == 2:
+            return self._borders[0]
+        return 0
+
+    def fence_masks(self, alignment, coord):
+        """This method takes a fence alignment ('v' or 'h') and coordinate, and returns the bits the fence adds to the
+        up, down, left, and right blocked masks, followed by their union, as a tuple. Fences on or outside the border
+        add no bits."""
+        key = (alignment, coord)
+        if key not in self._fence_cache:
+            self._fence_cache[key] = self._build_fence_masks(alignment, coord)
+        return self._fence_cache[key]
+
+    def _build_fence_masks(self, alignment, coord):
+        """This method computes the blocked mask bits of a fence for 'fence_masks'."""
+        n = self._grid_size
+        column = coord[0]
+        row = coord[1]
+        up = down = left = right = 0
+
+        #  Vertical fences are on the left of the associated tile.
+        if alignment == "v" and 0 <= row < n:
+            if 0 <= column < n:
+                left = 1 << (row * n + column)
+            if 0 < column <= n:
+                right = 1 << (row * n + column - 1)
+
+        #  Horizontal fences are above the associated tile.
+        if alignment == "h" and 0 <= column < n:
+            if 0 <= row < n:
+                up = 1 << (row * n + column)
+            if 0 < row <= n:
+                down = 1 << ((row - 1) * n + column)
+
+        return up, down, left, right, up | down | left | right
+
+    def add_fence(self, alignment, coord):
+        """This method adds a fence of the given alignment ('v' or 'h') to the specified coordinate."""
+        up, down, left, right, union = self.fence_masks(alignment, coord)
+        self._block_up |= up
+        self._block_down |= down
+        self._block_left |= left
+        self._block_right |= right
+        self._valid_cache.clear()
+
+    def remove_fence(self, alignment, coord):
+        """This method removes a fence of the given alignment ('v' or 'h') from the specified coordinate. The border
+        fences are never removed."""
+        up, down, left, right, union = self.fence_masks(alignment, coord)
+        border_up, border_down, border_left, border_right = self._borders
+        self._block_up = (self._block_up & ~up) | border_up
+        self._block_down = (self._block_down & ~down) | border_down
+        self._block_left = (self._block_left & ~left) | border_left
+        self._block_right = (self._block_right & ~right) | border_right
+        self._valid_cache.clear()
+
+    def get_blocked_masks(self, prop_fence_align=None, prop_fence_coord=None):
+        """This method returns the up, down, left, and right blocked masks as a tuple, including a proposed fence if
+        one is given."""
+        if prop_fence_align is None:
+            return self._block_up, self._block_down, self._block_left, self._block_right
+        up, down, left, right, union = self.fence_masks(prop_fence_align, prop_fence_coord)
+        return self._block_up | up, self._block_down | down, self._block_left | left, self._block_right | right
+
+    def expand(self, tiles_mask, blocked_masks):
+        """This method takes a mask of tiles and a tuple of blocked masks, and returns the mask of the tiles that can
+        be reached in one orthogonal step from any of them, ignoring pawns."""
+        block_up, block_down, block_left, block_right = blocked_masks
+        n = self._grid_size
+        return (((tiles_mask & ~block_up) >> n) | ((tiles_mask & ~block_down) << n) |
+                ((tiles_mask & ~block_left) >> 1) | ((tiles_mask & ~block_right) << 1))
+
+    def path_exists(self, player_num, start_mask, prop_fence_align=None, prop_fence_coord=None):
+        """This method returns True if any of the tiles in the start mask is connected to one of the given player's
+        winning tiles, ignoring pawns, and False otherwise. The whole frontier is expanded at once, and the search
+        stops as soon as a winning tile is reached."""
+        blocked_masks = self.get_blocked_masks(prop_fence_align, prop_fence_coord)
+        goal_mask = self.goal_mask(player_num)
+        reached = start_mask
+        frontier = start_mask
+        while frontier:
+            if frontier & goal_mask:
+                return True
+            frontier = self.expand(frontier, blocked_masks) & ~reached
+            reached |= frontier
+        return False
+
+    def goal_distance(self, player_num, start_mask, prop_fence_align=None, prop_fence_coord=None):
+        """This method returns the fewest orthogonal steps needed to reach one of the given player's winning tiles from
+        any of the tiles in the start mask, ignoring pawns, or None if no winning tile can be reached."""
+        blocked_masks = self.get_blocked_masks(prop_fence_align, prop_fence_coord)
+        goal_mask = self.goal_mask(player_num)
+        distance = 0
+        reached = start_mask
+        frontier = start_mask
+        while frontier:
+            if frontier & goal_mask:
+                return distance
+            frontier = self.expand(frontier, blocked_masks) & ~reached
+            reached |= frontier
+            distance += 1
+        return None
+
+    def valid_tiles(self, player_num, coord, opposing_coord, prop_fence_align=None, prop_fence_coord=None,
+                    account_pawn=True):
+        """This method returns a list of the tiles a pawn of the given player on the given coordinate may move to,
+        in the same order as 'QuoridorGame.valid_tiles': above (including a jump for Player 2), right, below
+        (including a jump for Player 1), and left."""
+        index = coord[1] * self._grid_size + coord[0]
+
+        #  A proposed fence only matters if it borders the tile or one of its neighbours.
+        if prop_fence_align is not None:
+            prop_masks = self._fence_cache.get((prop_fence_align, prop_fence_coord))
+            if prop_masks is None:
+                prop_masks = self.fence_masks(prop_fence_align, prop_fence_coord)
+            if prop_masks[4] & self._neighbourhoods[index]:
+                if not account_pawn:
+                    opposing_coord = None
+                return self._find_valid_tiles(player_num, coord, opposing_coord, prop_fence_align, prop_fence_coord)
+
+        #  Look the moves up in the table for this player and opposing pawn, starting a new table if the opposing pawn
+        #  has moved since it was filled.
+        if account_pawn:
+            cache_key = player_num
+        else:
+            cache_key = -player_num
+            opposing_coord = None
+        cache = self._valid_cache.get(cache_key)
+        if cache is None or cache[0] != opposing_coord:
+            cache = [opposing_coord, {}]
+            self._valid_cache[cache_key] = cache
+        valid_tiles = cache[1].get(index)
+        if valid_tiles is None:
+            valid_tiles = self._find_valid_tiles(player_num, coord, opposing_coord)
+            cache[1][index] = valid_tiles
+        return list(valid_tiles)
+
+    def _find_valid_tiles(self, player_num, coord, opposing_coord, prop_fence_align=None, prop_fence_coord=None):
+        """This method computes the result of 'valid_tiles' from the blocked masks. An opposing coordinate of None
+        ignores the opposing pawn."""
+        n = self._grid_size
+        tiles = self._tiles
+        block_up, block_down, block_left, block_right = self.get_blocked_masks(prop_fence_align, prop_fence_coord)
+
+        index = coord[1] * n + coord[0]
+        bit = 1 << index
+        if opposing_coord is not None:
+            opposing_index = opposing_coord[1] * n + opposing_coord[0]
+        else:
+            opposing_index = -1
+
+        valid_tiles = []
+
+        #  Check the tile orthogonally above, jumping over a facing pawn for Player 2
+        if not block_up & bit:
+            target = index - n
+            if target != opposing_index:
+                valid_tiles.append(tiles[target])
+            elif player_num == 2:
+                target_bit = 1 << target
+                if not block_up & target_bit:
+                    valid_tiles.append(tiles[target - n])
+                else:
+                    if not block_left & target_bit:
+                        valid_tiles.append(tiles[target - 1])
+                    if not block_right & target_bit:
+                        valid_tiles.append(tiles[target + 1])
+
+        #  Check the tile orthogonally right
+        if not block_right & bit:
+            target = index + 1
+            if target != opposing_index:
+                valid_tiles.append(tiles[target])
+
+        #  Check the tile orthogonally below, jumping over a facing pawn for Player 1
+        if not block_down & bit:
+            target = index + n
+            if target != opposing_index:
+                valid_tiles.append(tiles[target])
+            elif player_num == 1:
+                target_bit = 1 << target
+                if not block_down & target_bit:
+                    valid_tiles.append(tiles[target + n])
+                else:
+                    if not block_left & target_bit:
+                        valid_tiles.append(tiles[target - 1])
+                    if not block_right & target_bit:
+                        valid_tiles.append(tiles[target + 1])
+
+        #  Check the tile orthogonally left
+        if not block_left & bit:
+            target = index - 1
+            if target != opposing_index:
+                valid_tiles.append(tiles[target])
+
+        return valid_tiles
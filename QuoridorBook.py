@@ -0,0 +1,225 @@
+# Description: This module contains the opening book of the Quoridor bots: the best move of positions early in the
+#   game, found ahead of time by a deep search so that the bots can play them without thinking. The book is built by
+#   searching the starting position with 'SearchBot', then the positions after its best move and its few most
+#   promising alternatives, and so on for a number of plies.
+#
+#   A book file is a short header followed by one entry per position, sorted by the position's Zobrist hash: the hash
+#   (8 bytes) and the best move packed by 'QuoridorTransposition.encode_move' (4 bytes). A book is read through a
+#   memory map and searched in place, so looking up a move takes microseconds without reading the whole file, and
+#   every process using the same book shares one copy of it in the operating system's page cache.
+#
+#   Example: python QuoridorBook.py opening_book.bin --plies 4 --workers 8
+
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+import Quoridor
+import QuoridorSearch
+import QuoridorTransposition
+
+#  The header of a book file: the magic bytes, the format version, the grid size and starting fence count of the games
+#  it was built for, and the number of entries.
+BOOK_MAGIC = b"QBK1"
+BOOK_VERSION = 1
+_BOOK_HEADER = struct.Struct("<4sBBHI")
+
+#  One entry of a book file: a Zobrist hash and its encoded best move.
+_BOOK_ENTRY = struct.Struct("<QI")
+
+#  Default book building settings.
+DEFAULT_PLIES = 4
+DEFAULT_WIDTH = 3
+DEFAULT_DEPTH = 3
+DEFAULT_TIME_LIMIT = 60.0
+
+#  The books opened by this process, by file path, so that bots using the same book share one memory map.
+_open_books = {}
+
+
+class OpeningBook:
+    """This class represents a book file of the best moves of known positions, read through a memory map."""
+    def __init__(self, path):
+        """Initializes the book from the book file at the given path. Raises ValueError if the file is not a book."""
+        with open(path, "rb") as book_file:
+            try:
+                self._data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("'" + path + "' is empty")
+
+        if len(self._data) < _BOOK_HEADER.size:
+            raise ValueError("'" + path + "' is not an opening book")
+        magic, version, self._grid_size, self._fence_count, self._entry_count = \
+            _BOOK_HEADER.unpack_from(self._data, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError("'" + path + "' is not an opening book")
+        if len(self._data) != _BOOK_HEADER.size + self._entry_count * _BOOK_ENTRY.size:
+            raise ValueError("'" + path + "' is truncated")
+
+    def get_grid_size(self):
+        """This method returns the grid size of the games the book was built for."""
+        return self._grid_size
+
+    def get_fence_count(self):
+        """This method returns the starting number of fences per player of the games the book was built for."""
+        return self._fence_count
+
+    def get_entry_count(self):
+        """This method returns the number of positions in the book."""
+        return self._entry_count
+
+    def probe(self, key):
+        """This method takes a Zobrist hash and returns the book move of that position as a (coord, alignment) tuple,
+        or None if the position is not in the book."""
+        low = 0
+        high = self._entry_count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, move_value = _BOOK_ENTRY.unpack_from(self._data, _BOOK_HEADER.size + middle * _BOOK_ENTRY.size)
+            if entry_key == key:
+                return QuoridorTransposition.decode_move(move_value)
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def find_move(self, quoridor):
+        """This method returns the book move of the game's current position as a (coord, alignment) tuple, or None if
+        the position is not in the book or the game is played on another size of board. The move is not checked to be
+        legal."""
+        if quoridor.get_grid_size() != self._grid_size or not quoridor.is_ongoing():
+            return None
+        return self.probe(quoridor.get_zobrist_key())
+
+    def close(self):
+        """This method closes the book's memory map."""
+        self._data.close()
+
+
+def open_book(path):
+    """This function returns the opening book at the given path, opening it the first time it is asked for and sharing
+    it with every later caller in this process."""
+    path = os.path.abspath(path)
+    if path not in _open_books:
+        _open_books[path] = OpeningBook(path)
+    return _open_books[path]
+
+
+def write_book(path, grid_size, fence_count, entries):
+    """This function writes a book file of the given entries, a dictionary with each position's Zobrist hash as the
+    key and its best move as the value. The file is written under a temporary name and then renamed, so that
+    processes already reading an older book at the same path are not disturbed."""
+    data = bytearray(_BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, grid_size, fence_count, len(entries)))
+    for key in sorted(entries):
+        data += _BOOK_ENTRY.pack(key, QuoridorTransposition.encode_move(entries[key]))
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as book_file:
+        book_file.write(data)
+    os.replace(temp_path, path)
+
+
+def _search_position_worker(position, width, depth, time_limit):
+    """This function runs in a worker process. It searches the encoded position for the player to move, and returns
+    the position's Zobrist hash, the best move found, and a list of the Zobrist hashes and encodings of the positions
+    after the best move and the first 'width' moves in the search's move order that do not end the game."""
+    q = Quoridor.game_from_bytes(position)
+    player_num = q.get_turn()
+    bot = QuoridorSearch.SearchBot(q, player_num, depth=depth, time_limit=time_limit)
+    best_move = bot.find_best_move(player_num)
+    if best_move is None:
+        return q.get_zobrist_key(), None, []
+
+    moves = [best_move]
+    for move in bot.order_moves(player_num)[:width]:
+        if move not in moves:
+            moves.append(move)
+
+    children = []
+    for coord, alignment in moves:
+        q.push_move(player_num, coord, alignment)
+        if q.is_ongoing():
+            children.append((q.get_zobrist_key(), q.to_bytes()))
+        q.pop_move()
+    return q.get_zobrist_key(), best_move, children
+
+
+def build_book(grid_size=None, fence_count=None, plies=None, width=None, depth=None, time_limit=None, workers=None):
+    """This function builds an opening book for games of the given size, and returns its entries as a dictionary with
+    each position's Zobrist hash as the key and its best move as the value. The starting position is searched first,
+    and each position searched leads on to the positions after its best move and its 'width' most promising
+    alternatives, up to 'plies' moves into the game. Each position is searched 'depth' moves ahead, for at most
+    'time_limit' seconds, with the positions of each ply spread over 'workers' processes."""
+    if grid_size is None:
+        grid_size = 9
+    if fence_count is None:
+        fence_count = 10
+    if plies is None:
+        plies = DEFAULT_PLIES
+    if width is None:
+        width = DEFAULT_WIDTH
+    if depth is None:
+        depth = DEFAULT_DEPTH
+    if time_limit is None:
+        time_limit = DEFAULT_TIME_LIMIT
+    if workers is None:
+        workers = 1
+
+    entries = {}
+    start = Quoridor.QuoridorGame(grid_size, fence_count)
+    positions = {start.get_zobrist_key(): start.to_bytes()}
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(workers)
+    try:
+        for ply in range(0, plies):
+            results = []
+            if executor is not None:
+                futures = []
+                for position in positions.values():
+                    futures.append(executor.submit(_search_position_worker, position, width, depth, time_limit))
+                for future in futures:
+                    results.append(future.result())
+            else:
+                for position in positions.values():
+                    results.append(_search_position_worker(position, width, depth, time_limit))
+
+            #  Positions reached through different move orders are only searched once
+            positions = {}
+            for key, best_move, children in results:
+                if best_move is not None:
+                    entries[key] = best_move
+                for child_key, child in children:
+                    if child_key not in entries:
+                        positions[child_key] = child
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return entries
+
+
+def main():
+    """This function builds an opening book from the command line arguments and writes it to a file."""
+    parser = argparse.ArgumentParser(description="Build a Quoridor opening book.")
+    parser.add_argument("path", help="book file to write")
+    parser.add_argument("--grid-size", type=int, default=9, help="size of the board")
+    parser.add_argument("--fences", type=int, default=10, help="starting fences per player")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES, help="moves into the game covered by the book")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH,
+                        help="alternatives to the best move followed from each position")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="search depth of each position")
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT,
+                        help="search time limit of each position, in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    args = parser.parse_args()
+
+    entries = build_book(args.grid_size, args.fences, args.plies, args.width, args.depth, args.time_limit,
+                         args.workers)
+    write_book(args.path, args.grid_size, args.fences, entries)
+    print("Wrote", len(entries), "positions to", args.path)
+
+
+if __name__ == '__main__':
+    main()
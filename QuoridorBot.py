@@ -1,58 +1,116 @@
 import random
-import pygame as pg
-import time
+from concurrent.futures import ProcessPoolExecutor
+import Quoridor
+import QuoridorDistance
+import QuoridorPathfinding
+import QuoridorTablebase
+
+
+def _fence_move_changes_worker(position, player_num, account_pawn, candidates, opponent_min_moves, self_min_moves):
+    """This function runs in a worker process. It rebuilds the game from its encoded position and returns the result of
+    'Bot.fence_move_change' for each of the candidate (alignment, coord) fences, in order."""
+    bot = Bot(Quoridor.game_from_bytes(position), player_num)
+    return bot.serial_fence_move_changes(player_num, account_pawn, candidates, opponent_min_moves, self_min_moves)
 
 
 class Bot:
     """Governs the actions of the artificial 'intelligence' when playing against a bot."""
-    def __init__(self, quoridor, player_num):
-        """Initializes the Quoridor bot to play as the specified player in the specified game."""
+    def __init__(self, quoridor, player_num, workers=None, book=None, rng=None):
+        """Initializes the Quoridor bot to play as the specified player in the specified game. Work that can be
+        spread over several processes uses 'workers' of them (by default, 1). If the path of an opening book file is
+        given (see 'QuoridorBook'), the bot plays the book's move whenever the position is in the book. The bot's
+        random choices are drawn from 'rng', a 'random.Random' (by default, a new one seeded from the system), so
+        that a bot given a seeded one always plays the same moves."""
+        if workers is None:
+            workers = 1
+        if rng is None:
+            rng = random.Random()
         self._quoridor = quoridor
         self._player_num = player_num
-        self._min_think_time = 1300
-
-    def find_min_moves(self, player_num, account_pawn, pfence_align=None, pfence_coord=None, cur_tiles=None, path_count=None, num_moves=None, coords=None):
-        """This method returns the length of the shortest path from the given tile to a winning tile."""
+        self._workers = workers
+        self._rng = rng
+        self._executor = None
+        self._executor_workers = None
+
+        self._book = None
+        if book is not None:
+            import QuoridorBook
+            self._book = QuoridorBook.open_book(book)
+
+    def close(self):
+        """This method shuts down the bot's worker processes, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = None
+
+    def get_executor(self, workers):
+        """This method returns the bot's pool of the given number of worker processes, starting it if needed. The
+        pool is kept between moves until 'close' is called."""
+        if self._executor is None or self._executor_workers != workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(workers)
+            self._executor_workers = workers
+        return self._executor
+
+    def find_min_moves(self, player_num, account_pawn, pfence_align=None, pfence_coord=None, cur_tiles=None):
+        """This method returns the length of the shortest path from the given tile to a winning tile. When the opposing
+        pawn is ignored and no fence is proposed, the length is read from the cached distance field of the current
+        walls (see 'QuoridorDistance'), and otherwise it is found with an A* search (see 'QuoridorPathfinding'). Both
+        are checked against the breadth-first search of 'breadth_first_min_moves'."""
         q = self._quoridor
 
-        if path_count is None:
-            path_count = 0
-
         if cur_tiles is None:
             cur_tiles = [q.get_player_pawn(player_num)]
-
-        if num_moves is None:
-            num_moves = {}
-
-        if coords is None:
-            coords = set()
-
-        if len(cur_tiles) == 0:
-            return None
-
         if type(cur_tiles) is tuple:
             cur_tiles = [cur_tiles]
-
+        field = None
+        if not account_pawn and pfence_align is None:
+            field = QuoridorDistance.get_distance_field(q, player_num)
+        min_moves = None
         for i in cur_tiles:
-            if q.is_winning_tile(player_num, i):
-                return path_count
-
-        if (path_count + 1) not in num_moves:
-            num_moves[path_count + 1] = []
+            if field is not None:
+                distance = field.get_distance(i)
+            else:
+                distance = QuoridorPathfinding.astar_distance(q, player_num, i, pfence_align, pfence_coord,
+                                                              account_pawn)
+            if distance is not None and (min_moves is None or distance < min_moves):
+                min_moves = distance
+        return min_moves
+
+    def breadth_first_min_moves(self, player_num, account_pawn, pfence_align=None, pfence_coord=None, cur_tiles=None):
+        """This method returns the same length as 'find_min_moves', found with a breadth-first search from the given
+        tiles (by default, the player's pawn), one layer of tiles at a time. Returns None if no winning tile can be
+        reached. It visits most of the board, and is kept as the reference the faster searches are checked against."""
+        q = self._quoridor
 
-        for i in cur_tiles:
-            valid_tiles = q.valid_tiles(player_num, i, pfence_align, pfence_coord, account_pawn)
-            for j in valid_tiles:
-                if j not in num_moves[path_count + 1] and j not in coords:
-                    num_moves[path_count + 1].append(j)
-            coords.add(i)
+        if cur_tiles is None:
+            cur_tiles = [q.get_player_pawn(player_num)]
+        if type(cur_tiles) is tuple:
+            cur_tiles = [cur_tiles]
 
-        path_count += 1
-        return self.find_min_moves(player_num, account_pawn, pfence_align, pfence_coord, num_moves[path_count], path_count, num_moves, coords)
+        path_count = 0
+        coords = set(cur_tiles)
+        while len(cur_tiles) > 0:
+            for i in cur_tiles:
+                if q.is_winning_tile(player_num, i):
+                    return path_count
+
+            next_tiles = []
+            for i in cur_tiles:
+                for j in q.valid_tiles(player_num, i, pfence_align, pfence_coord, account_pawn):
+                    if j not in coords:
+                        next_tiles.append(j)
+                        coords.add(j)
+            cur_tiles = next_tiles
+            path_count += 1
+        return None
 
     def find_optimal_path(self, player_num, account_pawn, pfence_align=None, pfence_coord=None, path=None, cur_tile=None):
         """This method takes a player number and returns the path to win that requires the least moves. The path
-        is in the form of a list of tuples, starting with the starting tile."""
+        is in the form of a list of tuples, starting with the starting tile. Each step is the first tile of
+        'valid_tiles' that is closer to a winning tile, read from the player's distance field (see
+        'QuoridorDistance')."""
         q = self._quoridor
 
         if cur_tile is None:
@@ -61,25 +119,34 @@ class Bot:
         if path is None:
             path = []
 
-        path.append(cur_tile)
+        field = QuoridorDistance.get_distance_field(q, player_num, pfence_align, pfence_coord, account_pawn)
+        while True:
+            path.append(cur_tile)
 
-        if q.is_winning_tile(player_num, cur_tile):
-            return path
+            if q.is_winning_tile(player_num, cur_tile):
+                return path
 
-        cur_min_move = self.find_min_moves(player_num, account_pawn, pfence_align, pfence_coord, cur_tiles=cur_tile)
+            cur_min_move = field.get_distance(cur_tile)
 
-        valid_tiles = q.valid_tiles(player_num, cur_tile, pfence_align, pfence_coord, account_pawn)
+            valid_tiles = q.valid_tiles(player_num, cur_tile, pfence_align, pfence_coord, account_pawn)
 
-        for i in valid_tiles:
-            p_min_move = self.find_min_moves(player_num, account_pawn, pfence_align, pfence_coord, cur_tiles=i)
-            if p_min_move is not None and cur_min_move is not None:
-                if p_min_move < cur_min_move:
-                    return self.find_optimal_path(player_num, account_pawn, pfence_align, pfence_coord, path, i)
-            else:
-                return path
+            next_tile = None
+            for i in valid_tiles:
+                p_min_move = field.get_distance(i)
+                if p_min_move is not None and cur_min_move is not None:
+                    if p_min_move < cur_min_move:
+                        next_tile = i
+                        break
+                else:
+                    return path
+            if next_tile is None:
+                return None
+            cur_tile = next_tile
 
     def find_rand_optimal_path(self, player_num, account_pawn, pfence_align=None, pfence_coord=None, path=None, cur_tile=None):
-        """This method returns the shortest path, in any tile order."""
+        """This method returns the shortest path, in any tile order. Each step is chosen at random from the tiles of
+        'valid_tiles' that are closer to a winning tile, read from the player's distance field (see
+        'QuoridorDistance')."""
         q = self._quoridor
 
         if cur_tile is None:
@@ -88,77 +155,180 @@ class Bot:
         if path is None:
             path = []
 
-        path.append(cur_tile)
+        field = QuoridorDistance.get_distance_field(q, player_num, pfence_align, pfence_coord, account_pawn)
+        while True:
+            path.append(cur_tile)
 
-        if q.is_winning_tile(player_num, cur_tile):
-            return path
+            if q.is_winning_tile(player_num, cur_tile):
+                return path
 
-        cur_min_moves = self.find_min_moves(player_num, account_pawn, pfence_align, pfence_coord, cur_tiles=cur_tile)
+            cur_min_moves = field.get_distance(cur_tile)
 
-        valid_tiles = q.valid_tiles(player_num, cur_tile, pfence_align, pfence_coord, account_pawn)
-        path_valid_tiles = []
+            valid_tiles = q.valid_tiles(player_num, cur_tile, pfence_align, pfence_coord, account_pawn)
+            path_valid_tiles = []
 
-        for i in valid_tiles:
-            p_min_moves = self.find_min_moves(player_num, account_pawn, pfence_align, pfence_coord, cur_tiles=i)
-            if cur_min_moves is not None and p_min_moves is not None:
-                if p_min_moves < cur_min_moves:
-                    path_valid_tiles.append(i)
-            else:
+            for i in valid_tiles:
+                p_min_moves = field.get_distance(i)
+                if cur_min_moves is not None and p_min_moves is not None:
+                    if p_min_moves < cur_min_moves:
+                        path_valid_tiles.append(i)
+                else:
+                    return path
+
+            #  A pawn boxed in by fences and the opposing pawn has no step to take
+            if len(path_valid_tiles) == 0:
                 return path
+            cur_tile = self._rng.choice(path_valid_tiles)
+
+    def find_path_fences(self, player_num):
+        """This method returns a list of the fences, as (alignment, coord) tuples, that would block a step along a
+        shortest path from the given player's pawn to their winning tiles (ignoring the opposing pawn)."""
+        q = self._quoridor
+
+        pawn = q.get_player_pawn(player_num)
+        parents = {pawn: None}
+        goal = None
+        frontier = [pawn]
+        while len(frontier) > 0 and goal is None:
+            next_frontier = []
+            for i in frontier:
+                if q.is_winning_tile(player_num, i):
+                    goal = i
+                    break
+                for j in q.valid_tiles(player_num, i, account_pawn=False):
+                    if j not in parents:
+                        parents[j] = i
+                        next_frontier.append(j)
+            frontier = next_frontier
+
+        path_fences = []
+        tile = goal
+        while tile is not None and parents[tile] is not None:
+            path_fences.append(q.fence_between(parents[tile], tile))
+            tile = parents[tile]
+        return path_fences
+
+    def fence_move_change(self, player_num, account_pawn, align, coord, opponent_min_moves, self_min_moves):
+        """This method returns how many more moves the given fence would add to the opponent's shortest path than to
+        the given player's, given both players' current shortest path lengths. Returns None if the fence cannot be
+        placed or would leave either player without a path."""
+        q = self._quoridor
+        opponent_num = q.get_opposing_num(player_num)
 
-        return self.find_rand_optimal_path(player_num, account_pawn, pfence_align, pfence_coord, path, random.choice(path_valid_tiles))
+        if not q.fence_allows_fair_play(align, coord):
+            return None
+        p_min_moves_opponent = self.find_min_moves(opponent_num, account_pawn, align, coord)
+        p_min_moves_self = self.find_min_moves(player_num, account_pawn, align, coord)
+        if p_min_moves_opponent is None or p_min_moves_self is None:
+            return None
+        move_change_opponent = p_min_moves_opponent - opponent_min_moves
+        move_change_self = p_min_moves_self - self_min_moves
+
+        #  Positive: The opponent's path length is increased more than ours
+        return move_change_opponent - move_change_self
 
-    def get_optimal_fence_placement(self, player_num, account_pawn):
+    def get_optimal_fence_placement(self, player_num, account_pawn, workers=None):
         """This method returns the coordinates of possible fences that would most hinder the opponent with regards to
         the number of moves required to win. Returns the fence as a dictionary with the alignment as the key and the
-        tuple as the value."""
+        tuple as the value. Only the legal fences of the player (see 'QuoridorGame.legal_moves') are considered.
+        With more than one worker (by default, the bot's 'workers'), the candidate fences are split between that many
+        processes. Otherwise, if the opposing pawn is ignored and NumPy is installed, every candidate is evaluated in
+        a single batch, and if not, the candidates are evaluated one at a time."""
         q = self._quoridor
 
-        board = q.get_board()
+        if workers is None:
+            workers = self._workers
+
         opponent_num = q.get_opposing_num(player_num)
-        #print("Self:", player_num)
-        #print("Opponent:", opponent_num)
-        alignments = ["v", "h"]
 
-        best_fences = {}
+        #  The current path lengths are the same for every candidate, so they are only found once
+        opponent_min_moves = self.find_min_moves(opponent_num, False)
+        self_min_moves = self.find_min_moves(player_num, False)
+
+        #  Only the fences the player could place are candidates, in the same column-by-column order as the board
+        candidates = []
+        for coord, align in q.legal_moves(player_num):
+            if align is not None:
+                candidates.append((align, coord))
+
+        if workers > 1:
+            move_changes = self.parallel_fence_move_changes(player_num, account_pawn, candidates, opponent_min_moves,
+                                                            self_min_moves, workers)
+        elif account_pawn:
+            move_changes = self.serial_fence_move_changes(player_num, account_pawn, candidates, opponent_min_moves,
+                                                          self_min_moves)
+        else:
+            move_changes = self.batch_fence_move_changes(player_num, candidates, opponent_min_moves, self_min_moves)
 
-        for row in board:
-            for coord in row:
-                for align in alignments:
-                    fair_play = True
-                    for temp_num in range(1, 3):
-                        if not q.fair_play_checker(temp_num, align, coord):
-                            fair_play = False
-                    if fair_play:
-                        opponent_min_moves = self.find_min_moves(opponent_num, False)
-                        self_min_moves = self.find_min_moves(player_num, False)
-                        p_min_moves_opponent = self.find_min_moves(opponent_num, account_pawn, align, coord)
-                        p_min_moves_self = self.find_min_moves(player_num, account_pawn, align, coord)
-                        if p_min_moves_opponent is not None and p_min_moves_self is not None:
-                            move_change_opponent = p_min_moves_opponent - opponent_min_moves
-                            move_change_self = p_min_moves_self - self_min_moves
-
-                            #  Positive: The opponent's path length is increased more than ours
-                            move_change_diff = move_change_opponent - move_change_self
-                            #print()
-                            #print("Alignment:", align)
-                            #print("Coords:", coord)
-                            #print("Self Original Min Moves:", self_min_moves)
-                            #print("Self Theoretical Min Moves:", p_min_moves_self)
-                            #print("Self Move Difference:", move_change_self)
-                            #print("Opponent Original Min Moves:", opponent_min_moves)
-                            #print("Opponent Theoretical Min Moves:", p_min_moves_opponent)
-                            #print("Opponent Move Difference:", move_change_opponent)
-                            #print("Move Change Difference:", move_change_diff)
-
-                            if move_change_diff not in best_fences:
-                                best_fences[move_change_diff] = {}
-                            #if len(best_fences[move_change]) not in best_fences[move_change]:
-                            best_fences[move_change_diff][len(best_fences[move_change_diff]) + 1] = {}
-                            best_fences[move_change_diff][len(best_fences[move_change_diff])]["alignment"] = align
-                            best_fences[move_change_diff][len(best_fences[move_change_diff])]["coord"] = coord
+        best_fences = {}
+        for i in range(0, len(candidates)):
+            align, coord = candidates[i]
+            move_change_diff = move_changes[i]
+            if move_change_diff is not None:
+                if move_change_diff not in best_fences:
+                    best_fences[move_change_diff] = {}
+                best_fences[move_change_diff][len(best_fences[move_change_diff]) + 1] = {}
+                best_fences[move_change_diff][len(best_fences[move_change_diff])]["alignment"] = align
+                best_fences[move_change_diff][len(best_fences[move_change_diff])]["coord"] = coord
         return best_fences
 
+    def serial_fence_move_changes(self, player_num, account_pawn, candidates, opponent_min_moves, self_min_moves):
+        """This method returns the result of 'fence_move_change' for each of the candidate (alignment, coord) fences,
+        in order, evaluating them one at a time."""
+        move_changes = []
+        for align, coord in candidates:
+            move_changes.append(self.fence_move_change(player_num, account_pawn, align, coord, opponent_min_moves,
+                                                       self_min_moves))
+        return move_changes
+
+    def batch_fence_move_changes(self, player_num, candidates, opponent_min_moves, self_min_moves):
+        """This method returns the result of 'fence_move_change' (ignoring the opposing pawn) for each of the
+        candidate (alignment, coord) fences, in order, with the path lengths of every candidate found together by
+        'QuoridorGame.batch_goal_distances'. If NumPy is not installed, the candidates are evaluated one at a time by
+        'serial_fence_move_changes' instead."""
+        q = self._quoridor
+        opponent_num = q.get_opposing_num(player_num)
+
+        allowed = []
+        for align, coord in candidates:
+            if q.fence_allows_fair_play(align, coord):
+                allowed.append((align, coord))
+        try:
+            distances = q.batch_goal_distances(allowed)
+        except ImportError:
+            return self.serial_fence_move_changes(player_num, False, candidates, opponent_min_moves, self_min_moves)
+
+        allowed_changes = {}
+        for i in range(0, len(allowed)):
+            p_min_moves_self = distances[i][player_num - 1]
+            p_min_moves_opponent = distances[i][opponent_num - 1]
+            if p_min_moves_opponent is not None and p_min_moves_self is not None:
+                move_change_opponent = p_min_moves_opponent - opponent_min_moves
+                move_change_self = p_min_moves_self - self_min_moves
+                allowed_changes[allowed[i]] = move_change_opponent - move_change_self
+
+        move_changes = []
+        for i in candidates:
+            move_changes.append(allowed_changes.get(i))
+        return move_changes
+
+    def parallel_fence_move_changes(self, player_num, account_pawn, candidates, opponent_min_moves, self_min_moves,
+                                    workers):
+        """This method returns the result of 'fence_move_change' for each of the candidate (alignment, coord) fences,
+        in order, with the candidates split into one contiguous share per worker process."""
+        executor = self.get_executor(workers)
+        position = self._quoridor.to_bytes()
+        share_size = max(1, -(-len(candidates) // workers))
+        futures = []
+        for i in range(0, len(candidates), share_size):
+            futures.append(executor.submit(_fence_move_changes_worker, position, player_num, account_pawn,
+                                           candidates[i:i + share_size], opponent_min_moves, self_min_moves))
+
+        move_changes = []
+        for future in futures:
+            move_changes.extend(future.result())
+        return move_changes
+
     def get_fence_increased_moves(self, best_fences_list):
         """Takes the output from 'get_optimal_fence_placement' and returns the maximum amount of turns that could
         be added to the enemy player's path with a single fence."""
@@ -170,6 +340,43 @@ class Bot:
                 max_move_increase = int(i)
         return max_move_increase
 
+    def make_book_move(self, player_num):
+        """This method makes the opening book's move for the given player, if the bot has a book and the current
+        position is in it. Returns True if a move was made, and False otherwise."""
+        q = self._quoridor
+        if self._book is None or q.get_turn() != player_num:
+            return False
+
+        book_move = self._book.find_move(q)
+        if book_move is None:
+            return False
+        coord, alignment = book_move
+        if alignment is None:
+            return q.move_pawn(player_num, coord)
+        return q.place_fence(player_num, alignment, coord)
+
+    def make_tablebase_move(self, player_num):
+        """This method makes the endgame tablebase's best move for the given player, if neither player has any fences
+        left and the board is small enough to solve (see 'QuoridorTablebase'). Returns True if a move was made, and
+        False otherwise."""
+        q = self._quoridor
+        if q.get_turn() != player_num or not q.is_ongoing() or not QuoridorTablebase.is_pawn_race(q):
+            return False
+        if not QuoridorTablebase.is_solvable(q):
+            return False
+
+        best_move = QuoridorTablebase.get_tablebase(q).find_best_move(q, player_num)
+        if best_move is None:
+            return False
+        return q.move_pawn(player_num, best_move)
+
+    def make_move(self, player_num):
+        """This method makes the bot's move for the given player, from the opening book or the endgame tablebase if
+        possible."""
+        if self.make_book_move(player_num) or self.make_tablebase_move(player_num):
+            return
+        self.make_move_v2(player_num)
+
     def make_move_v2(self, player_num):
         q = self._quoridor
         opponent_num = q.get_opposing_num(player_num)
@@ -177,29 +384,35 @@ class Bot:
         self_min_path = self.find_rand_optimal_path(player_num, True)
         opponent_min_path = self.find_optimal_path(opponent_num, True)
 
-        print("Self Path:", self_min_path)
-        print("Opponent Path:", opponent_min_path)
-
+        self_valid_tiles = q.valid_tiles(player_num, q.get_player_pawn(player_num))
         if len(self_min_path) >= 2:
             self_next_tile = self_min_path[1]
+        elif len(self_valid_tiles) > 0:
+            self_next_tile = self._rng.choice(self_valid_tiles)
         else:
-            self_next_tile = random.choice(q.valid_tiles(player_num, q.get_player_pawn(player_num)))
+            #  A pawn with nowhere to move must place a fence, and the game is only ongoing if one can be placed
+            moves = list(q.legal_moves(player_num))
+            if len(moves) > 0:
+                coord, alignment = self._rng.choice(moves)
+                q.place_fence(player_num, alignment, coord)
+            return
 
-        if len(opponent_min_path) >= 2:
+        opponent_valid_tiles = q.valid_tiles(opponent_num, q.get_player_pawn(opponent_num))
+        if opponent_min_path is not None and len(opponent_min_path) >= 2:
             opponent_next_tile = opponent_min_path[1]
+        elif len(opponent_valid_tiles) > 0:
+            opponent_next_tile = self._rng.choice(opponent_valid_tiles)
         else:
-            opponent_next_tile = random.choice(q.valid_tiles(opponent_num, q.get_player_pawn(opponent_num)))
+            opponent_next_tile = q.get_player_pawn(opponent_num)
 
         #  Action 1: Win
         if q.is_winning_tile(player_num, self_next_tile):
-            pg.time.delay(self._min_think_time)
             q.move_pawn(player_num, self_next_tile)
             return
 
         #  Action 2: Block Win
         if q.get_remaining_fences(player_num) > 0:
             if q.is_winning_tile(opponent_num, opponent_next_tile):
-                pg.time.delay(self._min_think_time)
                 if opponent_num == 1:
                     front_tile = (q.get_player_pawn(opponent_num)[0], (q.get_player_pawn(opponent_num)[1] + 1))
                 elif opponent_num == 2:
@@ -212,9 +425,8 @@ class Bot:
             best_fences = self.get_optimal_fence_placement(player_num, False)
             max_move_diff = self.get_fence_increased_moves(best_fences)
 
-            if max_move_diff > 1:
-                random.seed()
-                rand_fence = random.randint(1, len(best_fences[max_move_diff]))
+            if max_move_diff is not None and max_move_diff > 1:
+                rand_fence = self._rng.randint(1, len(best_fences[max_move_diff]))
                 alignment = best_fences[max_move_diff][rand_fence]["alignment"]
                 coord = best_fences[max_move_diff][rand_fence]["coord"]
                 if not q.place_fence(player_num, alignment, coord):
@@ -238,7 +450,6 @@ class Bot:
                 if not q.place_fence(player_num, "h", front_tile):
                     q.move_pawn(player_num, self_next_tile)
                 return
-        pg.time.delay(self._min_think_time)
         q.move_pawn(player_num, self_next_tile)
         return
 
@@ -0,0 +1,125 @@
+# Description: This module contains the distance fields of the Quoridor bots. A distance field holds, for every tile
+#   of the board, the length of the shortest path from that tile to one of a player's winning tiles, as found by
+#   'Bot.find_min_moves'. The whole field is found with one breadth-first search spreading outwards from the winning
+#   row, after which the distance of any tile, and the next steps of a shortest path from it, are read from the field
+#   directly.
+#
+#   Ignoring the pawns, fences block movement in both directions, so the search follows the moves themselves. With the
+#   opposing pawn taken into account, some moves are one-way (no move enters the pawn's tile, and a jump over it cannot
+#   be made in reverse), so the search follows every move of the board backwards instead.
+#
+#   The field depends only on the walls, the player, and, if it is taken into account, the opposing pawn. Fields are
+#   kept in a cache shared by every bot in the process, keyed by the walls they were found for (see
+#   'QuoridorGame.get_wall_key') along with the player, any proposed fence, and the opposing pawn, and the least
+#   recently used field is discarded once the cache is full. Because the cache outlives any one game or bot, a repeated
+#   call is much faster than the first; 'clear_cache' empties it, so that benchmarks and tests can measure or check
+#   the bots starting without any fields found.
+
+from collections import OrderedDict
+from array import array
+
+#  The number of fields kept in the cache.
+CACHE_SIZE = 1024
+
+#  The cache of distance fields, by wall key, player, proposed fence, and opposing pawn, least recently used first.
+_fields = OrderedDict()
+
+
+class DistanceField:
+    """This class represents the distances of every tile of a board to one player's winning tiles."""
+    def __init__(self, quoridor, player_num, prop_fence_align=None, prop_fence_coord=None, account_pawn=None):
+        """Initializes the field of the given player on the given game's walls, with the proposed fence, if any,
+        treated as placed, and the opposing pawn taken into account if 'account_pawn' is True (by default, False).
+        The game is not changed."""
+        if account_pawn is None:
+            account_pawn = False
+        self._grid_size = quoridor.get_grid_size()
+        self._player_num = player_num
+
+        #  Each tile's distance, by tile index 'row * grid_size + column', or -1 if no winning tile can be reached
+        self._distances = array("h", [-1]) * (self._grid_size * self._grid_size)
+        self.solve(quoridor, prop_fence_align, prop_fence_coord, account_pawn)
+
+    def get_player_num(self):
+        """This method returns the number of the player the field was found for."""
+        return self._player_num
+
+    def solve(self, quoridor, prop_fence_align=None, prop_fence_coord=None, account_pawn=None):
+        """This method fills the field with a breadth-first search starting from every winning tile at once, following
+        the moves of 'valid_tiles' backwards."""
+        n = self._grid_size
+
+        #  With the opposing pawn, the moves into each tile are found from the moves out of every tile
+        predecessors = None
+        if account_pawn:
+            predecessors = []
+            for i in range(0, n * n):
+                predecessors.append([])
+            for row in range(0, n):
+                for column in range(0, n):
+                    for j in quoridor.valid_tiles(self._player_num, (column, row), prop_fence_align, prop_fence_coord,
+                                                  True):
+                        if 0 <= j[0] < n and 0 <= j[1] < n:
+                            predecessors[j[1] * n + j[0]].append((column, row))
+
+        goal_row = 0
+        if self._player_num == 1:
+            goal_row = n - 1
+
+        frontier = []
+        for column in range(0, n):
+            frontier.append((column, goal_row))
+            self._distances[goal_row * n + column] = 0
+
+        distance = 0
+        while len(frontier) > 0:
+            distance += 1
+            next_frontier = []
+            for i in frontier:
+                if predecessors is None:
+                    neighbours = quoridor.valid_tiles(self._player_num, i, prop_fence_align, prop_fence_coord, False)
+                else:
+                    neighbours = predecessors[i[1] * n + i[0]]
+                for j in neighbours:
+                    index = j[1] * n + j[0]
+                    if self._distances[index] < 0:
+                        self._distances[index] = distance
+                        next_frontier.append(j)
+            frontier = next_frontier
+
+    def get_distance(self, coord):
+        """This method returns the length of the shortest path from the given tile to a winning tile, or None if no
+        winning tile can be reached or the tile is not on the board."""
+        n = self._grid_size
+        if not (0 <= coord[0] < n and 0 <= coord[1] < n):
+            return None
+        distance = self._distances[coord[1] * n + coord[0]]
+        if distance < 0:
+            return None
+        return distance
+
+
+def get_distance_field(quoridor, player_num, prop_fence_align=None, prop_fence_coord=None, account_pawn=None):
+    """This function returns the distance field of the given player on the given game's walls, with the proposed fence,
+    if any, treated as placed, and the opposing pawn taken into account if 'account_pawn' is True (by default, False),
+    from the cache if it has already been found."""
+    opposing_pawn = None
+    if account_pawn:
+        opposing_pawn = quoridor.get_opposing_pawn(player_num)
+    key = (quoridor.get_wall_key(), player_num, prop_fence_align, prop_fence_coord, opposing_pawn)
+    if key in _fields:
+        _fields.move_to_end(key)
+        return _fields[key]
+
+    field = DistanceField(quoridor, player_num, prop_fence_align, prop_fence_coord, account_pawn)
+    _fields[key] = field
+    while len(_fields) > CACHE_SIZE:
+        _fields.popitem(last=False)
+    return field
+
+
+def clear_cache():
+    """This function discards every cached distance field, so that each field is found again the next time it is
+    asked for. Fields are only ever found from the walls they are keyed by, so clearing the cache changes how long
+    the bots take but never what they decide."""
+    _fields.clear()
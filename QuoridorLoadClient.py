@@ -0,0 +1,182 @@
+# Description: This program measures the speed of a running 'QuoridorServer' by playing many games on it at once. Each
+#   connection plays games one after another: it asks for the legal moves of the player to move and plays a random one,
+#   pawn moves being chosen more often than fences, until the game ends or reaches the move cap. If a bot is given,
+#   the bot plays one side and the server makes its moves in reply.
+#
+#   At the end it reports the moves made per second (both the client's and the bot's) and the latency of each kind of
+#   request at the 50th, 95th, and 99th percentiles.
+#
+#   Example: python QuoridorLoadClient.py --connections 50 --games 200 --bot v2
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import QuoridorServer
+
+#  Default load settings.
+DEFAULT_CONNECTIONS = 10
+DEFAULT_GAMES = 100
+DEFAULT_MOVE_CAP = 200
+
+#  The chance that the client places a fence when it could.
+FENCE_PROBABILITY = 0.2
+
+
+class LoadConnection:
+    """This class represents one client connection to the server, which times each of its requests."""
+    def __init__(self, reader, writer, latencies):
+        """Initializes the connection from its stream reader and writer, recording the latency of each request in
+        the given dictionary of lists, by operation."""
+        self._reader = reader
+        self._writer = writer
+        self._latencies = latencies
+
+    async def request(self, request):
+        """This method sends a request and returns its response. Raises ValueError if the request failed."""
+        start = time.perf_counter()
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+        line = await self._reader.readline()
+        elapsed = time.perf_counter() - start
+        if line == b"":
+            raise ConnectionError("The server closed the connection")
+
+        if request["op"] not in self._latencies:
+            self._latencies[request["op"]] = []
+        self._latencies[request["op"]].append(elapsed)
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response
+
+    def close(self):
+        """This method closes the connection."""
+        self._writer.close()
+
+
+async def play_games(connection, games, grid_size, fence_count, bot_config, move_cap, rng):
+    """This function plays the given number of games over one connection, and returns the number of moves made, by
+    both the client and the bot."""
+    moves = 0
+    for i in range(0, games):
+        request = {"op": "new", "grid_size": grid_size, "fences": fence_count}
+        if bot_config is not None:
+            request["bot"] = bot_config
+            request["bot_player"] = rng.choice((1, 2))
+        response = await connection.request(request)
+        game_id = response["game"]
+        moves += len(response["moves"])
+
+        while response["state"] == "ONGOING" and response["move_count"] < move_cap:
+            legal = (await connection.request({"op": "legal", "game": game_id}))["moves"]
+            if len(legal) == 0:
+                #  The server ends a game as a stalemate once the player to move has no legal move, so this is not
+                #  expected, but a game with no move to make cannot be played any further
+                break
+            pawn_moves = []
+            for move in legal:
+                if move[-1] not in "vh":
+                    pawn_moves.append(move)
+            if len(pawn_moves) > 0 and (len(pawn_moves) == len(legal) or rng.random() > FENCE_PROBABILITY):
+                move = rng.choice(pawn_moves)
+            else:
+                move = rng.choice(legal)
+            response = await connection.request({"op": "move", "game": game_id, "move": move})
+            moves += len(response["moves"])
+
+        await connection.request({"op": "close", "game": game_id})
+    return moves
+
+
+def percentile(values, fraction):
+    """This function returns the value below which the given fraction of the sorted values fall."""
+    if len(values) == 0:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(host=None, port=None, unix_path=None, connections=None, games=None, grid_size=None,
+                   fence_count=None, bot_config=None, move_cap=None, seed=None):
+    """This function plays 'games' games spread over 'connections' connections to the server, and returns a
+    dictionary of the results: the number of 'games' and 'moves', the 'elapsed' time in seconds, and the sorted
+    'latencies' of each operation in seconds."""
+    if host is None:
+        host = QuoridorServer.DEFAULT_HOST
+    if port is None:
+        port = QuoridorServer.DEFAULT_PORT
+    if connections is None:
+        connections = DEFAULT_CONNECTIONS
+    if games is None:
+        games = DEFAULT_GAMES
+    if grid_size is None:
+        grid_size = 9
+    if fence_count is None:
+        fence_count = 10
+    if move_cap is None:
+        move_cap = DEFAULT_MOVE_CAP
+    rng = random.Random(seed)
+
+    latencies = {}
+    clients = []
+    for i in range(0, connections):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        clients.append(LoadConnection(reader, writer, latencies))
+
+    #  The games are shared out as evenly as possible
+    start = time.perf_counter()
+    coroutines = []
+    for i in range(0, connections):
+        connection_games = games // connections
+        if i < games % connections:
+            connection_games += 1
+        coroutines.append(play_games(clients[i], connection_games, grid_size, fence_count, bot_config, move_cap,
+                                     random.Random(rng.getrandbits(32))))
+    try:
+        moves = sum(await asyncio.gather(*coroutines))
+    finally:
+        for client in clients:
+            client.close()
+    elapsed = time.perf_counter() - start
+
+    for op in latencies:
+        latencies[op].sort()
+    return {"games": games, "moves": moves, "elapsed": elapsed, "latencies": latencies}
+
+
+def print_results(results):
+    """This function prints the results of 'run_load'."""
+    print("Games: %d  Moves: %d  Time: %.1f s" % (results["games"], results["moves"], results["elapsed"]))
+    print("Moves/sec: %.1f" % (results["moves"] / results["elapsed"]))
+    print("  %-10s %10s %10s %10s %10s" % ("request", "count", "p50 (ms)", "p95 (ms)", "p99 (ms)"))
+    for op, values in sorted(results["latencies"].items()):
+        print("  %-10s %10d %10.2f %10.2f %10.2f" % (op, len(values), 1000 * percentile(values, 0.5),
+                                                     1000 * percentile(values, 0.95), 1000 * percentile(values, 0.99)))
+
+
+def main():
+    """This function runs the load test from the command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure the speed of a running Quoridor server.")
+    parser.add_argument("--host", default=QuoridorServer.DEFAULT_HOST, help="TCP address of the server")
+    parser.add_argument("--port", type=int, default=QuoridorServer.DEFAULT_PORT, help="TCP port of the server")
+    parser.add_argument("--unix", help="Unix socket path of the server, instead of TCP")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="number of connections")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="number of games to play")
+    parser.add_argument("--grid-size", type=int, default=9, help="size of the board")
+    parser.add_argument("--fences", type=int, default=10, help="fences per player")
+    parser.add_argument("--bot", help="bot playing one side of each game, as in QuoridorTournament")
+    parser.add_argument("--move-cap", type=int, default=DEFAULT_MOVE_CAP, help="moves after which a game is ended")
+    parser.add_argument("--seed", type=int, default=None, help="random seed, for repeatable games")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.host, args.port, args.unix, args.connections, args.games, args.grid_size,
+                                   args.fences, args.bot, args.move_cap, args.seed))
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
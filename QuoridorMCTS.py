@@ -0,0 +1,279 @@
+# Description: This module contains a Monte Carlo tree search (MCTS) Quoridor bot. The bot grows a game tree from the
+#   current position, choosing which branch to explore with the UCT formula, and scores each new position by playing
+#   the game out with a cheap policy: each player steps to a random one of their pawn moves closest to the goal, and
+#   occasionally places a fence across the opponent's shortest path instead. The move whose branch was explored the
+#   most is played.
+#
+#   The search is limited by a time budget, a number of playouts, or both. With more than one worker, the search runs
+#   'root-parallel': each worker process grows its own independent tree from an encoded copy of the position, and the
+#   visit counts of the root moves are added together before the move is chosen.
+
+import math
+import random
+import time
+import Quoridor
+import QuoridorBot
+
+#  Exploration constant of the UCT formula.
+EXPLORATION = 1.4
+
+#  Chance of a rollout placing a fence across the opponent's path instead of moving.
+FENCE_PROBABILITY = 0.1
+
+#  Moves after which a rollout is stopped and the player with the shorter path is taken to be the winner.
+ROLLOUT_LIMIT = 80
+
+#  Default time budget per move, in seconds, if neither a time budget nor a playout budget is given.
+DEFAULT_TIME_LIMIT = 5.0
+
+
+class MCTSNode:
+    """This class represents a position in the search tree, reached by a move of the given player."""
+    def __init__(self, move, player_num, parent, untried_moves):
+        """Initializes a node for the position reached by 'move' (a (coord, alignment) tuple) of the given player."""
+        self.move = move
+        self.player_num = player_num
+        self.parent = parent
+        self.children = []
+        self.untried_moves = untried_moves
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self):
+        """This method returns the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        best_child = None
+        best_score = None
+        for child in self.children:
+            score = child.wins / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if best_score is None or score > best_score:
+                best_child = child
+                best_score = score
+        return best_child
+
+
+def _search_worker(position, player_num, playouts, time_limit, seed):
+    """This function runs one independent tree search in a worker process, on the game rebuilt from its encoded
+    position, and returns the root statistics."""
+    bot = MCTSBot(Quoridor.game_from_bytes(position), player_num, playouts=playouts, time_limit=time_limit,
+                  rng=random.Random(seed))
+    return bot.search(player_num)
+
+
+class MCTSBot(QuoridorBot.Bot):
+    """A Quoridor bot that chooses its moves with Monte Carlo tree search."""
+    def __init__(self, quoridor, player_num, playouts=None, time_limit=None, workers=None, book=None, rng=None):
+        """Initializes the MCTS bot to play as the specified player in the specified game. Each move is searched for
+        'time_limit' seconds and/or 'playouts' playouts, spread over 'workers' processes. Positions in the opening
+        book file 'book', if given, are not searched. Random choices are drawn from 'rng' (see 'Bot')."""
+        super().__init__(quoridor, player_num, workers, book, rng)
+        if playouts is None and time_limit is None:
+            time_limit = DEFAULT_TIME_LIMIT
+        self._playouts = playouts
+        self._time_limit = time_limit
+
+    def candidate_moves(self, player_num):
+        """This method returns the moves considered in the tree for the given player as (coord, alignment) tuples:
+        every pawn move, and the legal fences across the opponent's shortest path (or every legal fence, if there are
+        neither)."""
+        q = self._quoridor
+
+        moves = []
+        fences = []
+        for move in q.legal_moves(player_num):
+            if move[1] is None:
+                moves.append(move)
+            else:
+                fences.append(move)
+        if len(fences) > 0:
+            legal_fences = set(fences)
+            for alignment, coord in self.find_path_fences(q.get_opposing_num(player_num)):
+                if (coord, alignment) in legal_fences and (coord, alignment) not in moves:
+                    moves.append((coord, alignment))
+            if len(moves) == 0:
+                moves = fences
+        return moves
+
+    def rollout_move(self, player_num):
+        """This method returns the rollout policy's move for the given player as a (coord, alignment) tuple, or None
+        if the player has no legal move."""
+        q = self._quoridor
+
+        if q.get_remaining_fences(player_num) > 0 and self._rng.random() < FENCE_PROBABILITY:
+            fences = []
+            for alignment, coord in self.find_path_fences(q.get_opposing_num(player_num)):
+                if q.is_legal_fence(alignment, coord):
+                    fences.append((coord, alignment))
+            if len(fences) > 0:
+                return self._rng.choice(fences)
+
+        #  Step to a random one of the pawn moves closest to the goal
+        best_tiles = []
+        best_min_moves = None
+        for i in q.valid_tiles(player_num, q.get_player_pawn(player_num)):
+            min_moves = q.goal_distance(player_num, start_tile=i)
+            if min_moves is None:
+                continue
+            if best_min_moves is None or min_moves < best_min_moves:
+                best_tiles = [i]
+                best_min_moves = min_moves
+            elif min_moves == best_min_moves:
+                best_tiles.append(i)
+        if len(best_tiles) > 0:
+            return self._rng.choice(best_tiles), None
+
+        #  A pawn boxed in by the opposing pawn must place a fence instead
+        moves = list(q.legal_moves(player_num))
+        if len(moves) > 0:
+            return self._rng.choice(moves)
+        return None
+
+    def rollout(self):
+        """This method plays the game out from the current position with the rollout policy, reverts the moves, and
+        returns the winner's player number (0 for a stalemate)."""
+        q = self._quoridor
+
+        moves_played = 0
+        while q.is_ongoing() and moves_played < ROLLOUT_LIMIT:
+            player_num = q.get_turn()
+            move = self.rollout_move(player_num)
+            if move is None:
+                break
+            q.push_move(player_num, move[0], move[1])
+            moves_played += 1
+
+        if q.is_winner(1):
+            winner = 1
+        elif q.is_winner(2):
+            winner = 2
+        elif not q.is_ongoing():
+            winner = 0
+        else:
+            #  Adjudicate an unfinished rollout by the players' shortest paths, the player to move winning ties
+            player_num = q.get_turn()
+            opponent_num = q.get_opposing_num(player_num)
+            if q.goal_distance(player_num) <= q.goal_distance(opponent_num):
+                winner = player_num
+            else:
+                winner = opponent_num
+
+        for i in range(0, moves_played):
+            q.pop_move()
+        return winner
+
+    def playout(self, root):
+        """This method runs one playout: it selects a path down the tree, expands one new node, scores it with a
+        rollout, and updates the statistics of every node on the path."""
+        q = self._quoridor
+
+        node = root
+        moves_played = 0
+        while len(node.untried_moves) == 0 and len(node.children) > 0 and q.is_ongoing():
+            node = node.select_child()
+            q.push_move(node.player_num, node.move[0], node.move[1])
+            moves_played += 1
+
+        if len(node.untried_moves) > 0 and q.is_ongoing():
+            move = node.untried_moves.pop(self._rng.randrange(len(node.untried_moves)))
+            player_num = q.get_turn()
+            q.push_move(player_num, move[0], move[1])
+            moves_played += 1
+            untried_moves = []
+            if q.is_ongoing():
+                untried_moves = self.candidate_moves(q.get_turn())
+            child = MCTSNode(move, player_num, node, untried_moves)
+            node.children.append(child)
+            node = child
+
+        winner = self.rollout()
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.player_num:
+                node.wins += 1
+            elif winner == 0:
+                node.wins += 0.5
+            node = node.parent
+
+        for i in range(0, moves_played):
+            q.pop_move()
+
+    def search(self, player_num):
+        """This method runs a tree search from the current position for the given player, within the bot's budget,
+        and returns a dictionary with each root move as the key and its (visits, wins) as the value."""
+        q = self._quoridor
+
+        root = MCTSNode(None, q.get_opposing_num(player_num), None, self.candidate_moves(player_num))
+        if self._time_limit is not None:
+            deadline = time.perf_counter() + self._time_limit
+        else:
+            deadline = None
+
+        playouts = 0
+        while self._playouts is None or playouts < self._playouts:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self.playout(root)
+            playouts += 1
+
+        root_stats = {}
+        for child in root.children:
+            root_stats[child.move] = (child.visits, child.wins)
+        return root_stats
+
+    def search_parallel(self, player_num):
+        """This method runs one independent tree search per worker process and returns the root statistics of all
+        the searches added together."""
+        executor = self.get_executor(self._workers)
+        position = self._quoridor.to_bytes()
+
+        playouts = None
+        if self._playouts is not None:
+            playouts = max(1, self._playouts // self._workers)
+
+        futures = []
+        for i in range(0, self._workers):
+            seed = self._rng.getrandbits(64)
+            futures.append(executor.submit(_search_worker, position, player_num, playouts, self._time_limit,
+                                           seed))
+
+        root_stats = {}
+        for future in futures:
+            for move, (visits, wins) in future.result().items():
+                total_visits, total_wins = root_stats.get(move, (0, 0.0))
+                root_stats[move] = (total_visits + visits, total_wins + wins)
+        return root_stats
+
+    def find_best_move(self, player_num):
+        """This method searches the current position and returns the most visited move for the given player as a
+        (coord, alignment) tuple, with an alignment of None for pawn moves."""
+        if self._workers > 1:
+            root_stats = self.search_parallel(player_num)
+        else:
+            root_stats = self.search(player_num)
+
+        best_move = None
+        best_visits = -1
+        for move, (visits, wins) in root_stats.items():
+            if visits > best_visits:
+                best_move = move
+                best_visits = visits
+        return best_move
+
+    def make_move(self, player_num):
+        """This method searches for and makes the bot's move for the given player, or plays the opening book's or
+        endgame tablebase's move if there is one."""
+        q = self._quoridor
+
+        if self.make_book_move(player_num) or self.make_tablebase_move(player_num):
+            return
+
+        best_move = self.find_best_move(player_num)
+        if best_move is None:
+            return self.make_move_v2(player_num)
+
+        coord, alignment = best_move
+        if alignment is None:
+            q.move_pawn(player_num, coord)
+        else:
+            q.place_fence(player_num, alignment, coord)
@@ -0,0 +1,184 @@
+# Description: This module answers shortest path questions about a Quoridor board, the length of the shortest path
+#   from a tile to one of a player's winning tiles, without searching the whole board. The breadth-first searches of
+#   'QuoridorGame.goal_distance' and 'Bot.breadth_first_min_moves' spread evenly in every direction, so on large
+#   boards they visit most of the tiles before reaching the goal. Two searches here visit fewer:
+#
+#     'astar_distance' always expands the tile with the smallest path length so far plus its number of rows from the
+#     winning row. No move changes the row by more than one, so that count never overestimates the distance left, and
+#     the first winning tile expanded is reached by a shortest path. It can also take the opposing pawn into account,
+#     as 'find_min_moves' does: a jump over the pawn changes the row by two, so one less is counted while the pawn is
+#     still between the tile and the winning row.
+#
+#     'bidirectional_distance' searches from the tile and from the whole winning row at once, one layer at a time,
+#     always growing the smaller of the two frontiers, until they meet. Fences block movement in both directions, so
+#     the search from the winning row follows the same moves.
+#
+#   Both give the same lengths as the breadth-first searches, which remain the reference. Running this module checks
+#   them against those on random positions and times them all. 'Bot.find_min_moves' uses the A* search when its
+#   distance fields (see 'QuoridorDistance') do not apply.
+#
+#   Example: python QuoridorPathfinding.py --grid-sizes 9,31,51 --positions 20
+
+import argparse
+import heapq
+import random
+import time
+import Quoridor
+
+
+def goal_row(quoridor, player_num):
+    """This function returns the row of the given player's winning tiles."""
+    if player_num == 1:
+        return quoridor.get_grid_size() - 1
+    return 0
+
+
+def estimate_distance(tile, row, opposing_row):
+    """This function returns the A* estimate of the distance from the given tile to the given winning row: the number
+    of rows between them, less one if the row of the opposing pawn (None if it is ignored) lies strictly between
+    them."""
+    estimate = abs(row - tile[1])
+    if opposing_row is not None and min(row, tile[1]) < opposing_row < max(row, tile[1]):
+        estimate -= 1
+    return estimate
+
+
+def astar_distance(quoridor, player_num, start_tile=None, prop_fence_align=None, prop_fence_coord=None,
+                   account_pawn=None):
+    """This function returns the length of the shortest path from the given player's pawn (or the start tile, if
+    given) to one of their winning tiles, with the proposed fence, if any, treated as placed, found with an A* search.
+    The opposing pawn is ignored unless 'account_pawn' is True. Returns None if no winning tile can be reached."""
+    if account_pawn is None:
+        account_pawn = False
+    q = quoridor
+    if start_tile is None:
+        start_tile = q.get_player_pawn(player_num)
+    row = goal_row(q, player_num)
+    opposing_row = None
+    if account_pawn:
+        opposing_row = q.get_opposing_pawn(player_num)[1]
+
+    #  Tiles are expanded by their estimated total length, and then by their longest path so far, which reaches the
+    #  winning row sooner when estimates tie
+    distances = {start_tile: 0}
+    heap = [(estimate_distance(start_tile, row, opposing_row), 0, start_tile)]
+    expanded = set()
+    while len(heap) > 0:
+        estimate, negative_distance, tile = heapq.heappop(heap)
+        if tile in expanded:
+            continue
+        if tile[1] == row:
+            return -negative_distance
+        expanded.add(tile)
+
+        distance = 1 - negative_distance
+        for i in q.valid_tiles(player_num, tile, prop_fence_align, prop_fence_coord, account_pawn):
+            if i not in distances or distance < distances[i]:
+                distances[i] = distance
+                heapq.heappush(heap, (distance + estimate_distance(i, row, opposing_row), -distance, i))
+    return None
+
+
+def bidirectional_distance(quoridor, player_num, start_tile=None, prop_fence_align=None, prop_fence_coord=None):
+    """This function returns the length of the shortest path from the given player's pawn (or the start tile, if
+    given) to one of their winning tiles, ignoring the opposing pawn and with the proposed fence, if any, treated as
+    placed, found with a breadth-first search from both ends. Returns None if no winning tile can be reached."""
+    q = quoridor
+    if start_tile is None:
+        start_tile = q.get_player_pawn(player_num)
+    row = goal_row(q, player_num)
+    if start_tile[1] == row:
+        return 0
+
+    forward = {start_tile: 0}
+    forward_frontier = [start_tile]
+    backward = {}
+    backward_frontier = []
+    for column in range(0, q.get_grid_size()):
+        backward[(column, row)] = 0
+        backward_frontier.append((column, row))
+
+    while len(forward_frontier) > 0 and len(backward_frontier) > 0:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, reached, other = forward_frontier, forward, backward
+        else:
+            frontier, reached, other = backward_frontier, backward, forward
+
+        #  The whole layer is grown before stopping, so that the shortest of the paths meeting in it is found
+        shortest = None
+        next_frontier = []
+        for i in frontier:
+            distance = reached[i] + 1
+            for j in q.valid_tiles(player_num, i, prop_fence_align, prop_fence_coord, False):
+                if j in reached:
+                    continue
+                reached[j] = distance
+                next_frontier.append(j)
+                if j in other and (shortest is None or distance + other[j] < shortest):
+                    shortest = distance + other[j]
+        if shortest is not None:
+            return shortest
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    return None
+
+
+def pawn_breadth_first_distance(quoridor, player_num):
+    """This function returns the length of the shortest path from the given player's pawn to one of their winning
+    tiles, taking the opposing pawn into account, found with 'Bot.breadth_first_min_moves'."""
+    import QuoridorBot
+    return QuoridorBot.Bot(quoridor, player_num).breadth_first_min_moves(player_num, True)
+
+
+def pawn_astar_distance(quoridor, player_num):
+    """This function returns the result of 'astar_distance' taking the opposing pawn into account."""
+    return astar_distance(quoridor, player_num, account_pawn=True)
+
+
+def main():
+    """This function checks the searches against the breadth-first searches on random positions from the command line
+    arguments, and prints the average time of each search."""
+    import QuoridorBenchmark
+
+    parser = argparse.ArgumentParser(description="Check and time the Quoridor shortest path searches.")
+    parser.add_argument("--grid-sizes", default="9,31", help="comma-separated board sizes")
+    parser.add_argument("--fences", type=int, default=20, help="fences placed in each position")
+    parser.add_argument("--positions", type=int, default=20, help="positions per board size")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random positions")
+    args = parser.parse_args()
+
+    #  Each group of searches starts with its reference
+    groups = ((("breadth-first", Quoridor.QuoridorGame.goal_distance), ("A*", astar_distance),
+               ("bidirectional", bidirectional_distance)),
+              (("pawn breadth-first", pawn_breadth_first_distance), ("pawn A*", pawn_astar_distance)))
+    rng = random.Random(args.seed)
+    for grid_size in [int(i) for i in args.grid_sizes.split(",")]:
+        times = {}
+        for searches in groups:
+            for name, search in searches:
+                times[name] = 0.0
+        for i in range(0, args.positions):
+            q = QuoridorBenchmark.random_position(grid_size, args.fences, rng)
+            for player_num in (1, 2):
+                for searches in groups:
+                    results = []
+                    for name, search in searches:
+                        start = time.perf_counter()
+                        results.append(search(q, player_num))
+                        times[name] += time.perf_counter() - start
+                    for j in range(1, len(searches)):
+                        if results[j] != results[0]:
+                            raise ValueError(searches[j][0] + " disagrees with " + searches[0][0] + " on a " +
+                                             str(grid_size) + "x" + str(grid_size) + " board")
+
+        print("grid=%d: %d positions agree" % (grid_size, args.positions))
+        for searches in groups:
+            for name, search in searches:
+                print("  %-20s %10.1f us" % (name, 1e6 * times[name] / (2 * args.positions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# Description: This module contains opt-in instrumentation for finding out why a bot move is slow. A profiler is
+#   attached to a game and its bots, and from then on counts the calls to, and the time spent in, the hot operations:
+#   'valid_tiles', 'fair_play_checker', 'Bot.find_min_moves', and each candidate fence evaluated by
+#   'Bot.get_optimal_fence_placement'. It also counts the search nodes expanded by each call, where a node is one tile
+#   whose neighbours are generated, either by 'valid_tiles' or by a flood of the bitboard.
+#
+#   The profiler works by replacing the methods of the attached objects with timed wrappers, and 'detach' restores the
+#   original methods. Objects that are not attached are not changed at all, so there is no cost when profiling is not
+#   used. Recursive calls, such as those of 'find_min_moves', are counted as part of the outermost call.
+#
+#   Counters accumulate until 'end_move' is called, which stores them as the counters of that move and starts afresh.
+#   'get_report' then returns the counters of every move along with the totals for the game.
+#
+#   Example: python QuoridorProfiler.py v2 search:depth=2 (plays one game and prints its report)
+
+import argparse
+import time
+import Quoridor
+import QuoridorTournament
+
+#  The game methods that are profiled.
+GAME_OPERATIONS = ("valid_tiles", "fair_play_checker")
+
+#  The bot methods that are profiled. Each candidate fence evaluated, whether one at a time, in a batch, or in worker
+#  processes, is counted as one call of 'fence_candidate'.
+BOT_OPERATIONS = ("find_min_moves", "get_optimal_fence_placement")
+CANDIDATE_OPERATIONS = ("fence_move_change", "serial_fence_move_changes", "batch_fence_move_changes",
+                        "parallel_fence_move_changes")
+
+
+class Profiler:
+    """This class represents a set of call, time, and node counters for the hot operations of a game and its bots."""
+    def __init__(self):
+        """Initializes a profiler that is not attached to anything."""
+        self._counters = {}
+        self._moves = []
+        self._active = []
+        self._attached = []
+
+    def attach_game(self, quoridor):
+        """This method starts profiling the given game's hot operations, and the floods of its bitboard."""
+        for name in GAME_OPERATIONS:
+            self.attach(quoridor, name)
+
+        bitboard = quoridor.get_bitboard()
+        if bitboard is not None:
+            expand = bitboard.expand
+
+            def counted_expand(tiles_mask, blocked_masks):
+                self.add_nodes(bin(tiles_mask).count("1"))
+                return expand(tiles_mask, blocked_masks)
+
+            bitboard.expand = counted_expand
+            self._attached.append((bitboard, "expand"))
+
+    def attach_bot(self, bot):
+        """This method starts profiling the given bot's hot operations."""
+        for name in BOT_OPERATIONS:
+            self.attach(bot, name)
+        for name in CANDIDATE_OPERATIONS:
+            self.attach(bot, name, "fence_candidate")
+
+    def attach(self, obj, method_name, operation=None):
+        """This method starts profiling the named method of the given object, counting its calls under the given
+        operation name (by default, the method's name)."""
+        if operation is None:
+            operation = method_name
+        method = getattr(obj, method_name)
+
+        def profiled(*args, **kwargs):
+            if operation in self._active:
+                return method(*args, **kwargs)
+
+            #  Every tile 'valid_tiles' is asked about is a node of whichever search is asking
+            if operation == "valid_tiles":
+                self.add_nodes(1)
+
+            counter = self._get_counter(operation)
+            if method_name == "batch_fence_move_changes":
+                counter["calls"] += len(args[1])
+            elif method_name in ("serial_fence_move_changes", "parallel_fence_move_changes"):
+                counter["calls"] += len(args[2])
+            else:
+                counter["calls"] += 1
+
+            self._active.append(operation)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                counter["time"] += time.perf_counter() - start
+                self._active.pop()
+
+        setattr(obj, method_name, profiled)
+        self._attached.append((obj, method_name))
+
+    def detach(self):
+        """This method stops profiling, restoring the original methods of every attached object."""
+        for obj, method_name in reversed(self._attached):
+            delattr(obj, method_name)
+        self._attached = []
+        self._active = []
+
+    def _get_counter(self, operation):
+        """This method returns the counters of the given operation, creating them if needed."""
+        if operation not in self._counters:
+            self._counters[operation] = {"calls": 0, "time": 0.0, "nodes": 0}
+        return self._counters[operation]
+
+    def add_nodes(self, count):
+        """This method adds the given number of expanded nodes to every operation currently running."""
+        for operation in self._active:
+            self._counters[operation]["nodes"] += count
+
+    def get_counters(self):
+        """This method returns the counters of the current move: a dictionary with each operation's name as the key
+        and a dictionary of its 'calls', 'time' (in seconds), and 'nodes' as the value."""
+        counters = {}
+        for operation, counter in self._counters.items():
+            counters[operation] = dict(counter)
+        return counters
+
+    def end_move(self, player_num=None):
+        """This method stores the counters of the current move, made by the given player, and resets them for the
+        next move. Returns the stored counters."""
+        counters = self.get_counters()
+        self._moves.append({"player": player_num, "counters": counters})
+        self._counters = {}
+        return counters
+
+    def get_report(self):
+        """This method returns a report of the game so far: a dictionary with a list of the counters of each 'moves'
+        entry (with the 'player' who made it), and the 'totals' of every operation over all of the moves."""
+        totals = {}
+        for move in self._moves:
+            for operation, counter in move["counters"].items():
+                if operation not in totals:
+                    totals[operation] = {"calls": 0, "time": 0.0, "nodes": 0}
+                totals[operation]["calls"] += counter["calls"]
+                totals[operation]["time"] += counter["time"]
+                totals[operation]["nodes"] += counter["nodes"]
+        return {"moves": list(self._moves), "totals": totals}
+
+    def format_report(self):
+        """This method returns the report from 'get_report' as readable text."""
+        report = self.get_report()
+        lines = []
+        for i in range(0, len(report["moves"])):
+            move = report["moves"][i]
+            line = "Move %d (player %s):" % (i + 1, move["player"])
+            for operation, counter in sorted(move["counters"].items()):
+                line += "  %s %d/%.1fms" % (operation, counter["calls"], 1000 * counter["time"])
+            lines.append(line)
+
+        lines.append("Totals:")
+        lines.append("  %-28s %10s %12s %12s %12s" % ("operation", "calls", "time (ms)", "us/call", "nodes/call"))
+        for operation, counter in sorted(report["totals"].items()):
+            calls = max(1, counter["calls"])
+            lines.append("  %-28s %10d %12.1f %12.1f %12.1f" % (operation, counter["calls"], 1000 * counter["time"],
+                                                                 1000000 * counter["time"] / calls,
+                                                                 counter["nodes"] / calls))
+        return "\n".join(lines)
+
+
+def main():
+    """This function plays one profiled game between two bot configurations and prints its report."""
+    parser = argparse.ArgumentParser(description="Play one profiled game between two Quoridor bots.")
+    parser.add_argument("bot_1", help="Player 1's bot, as in QuoridorTournament (e.g. 'v2' or 'search:depth=2')")
+    parser.add_argument("bot_2", help="Player 2's bot")
+    parser.add_argument("--grid-size", type=int, default=9, help="size of the board")
+    parser.add_argument("--fences", type=int, default=10, help="fences per player")
+    parser.add_argument("--move-cap", type=int, default=QuoridorTournament.DEFAULT_MOVE_CAP,
+                        help="moves after which the game is stopped")
+    args = parser.parse_args()
+
+    q = Quoridor.QuoridorGame(args.grid_size, args.fences)
+    bots = {1: QuoridorTournament.create_bot(args.bot_1, q, 1), 2: QuoridorTournament.create_bot(args.bot_2, q, 2)}
+    profiler = Profiler()
+    profiler.attach_game(q)
+    profiler.attach_bot(bots[1])
+    profiler.attach_bot(bots[2])
+
+    moves = 0
+    while q.is_ongoing() and moves < args.move_cap:
+        player_num = q.get_turn()
+        bots[player_num].make_move(player_num)
+        profiler.end_move(player_num)
+        moves += 1
+    profiler.detach()
+    bots[1].close()
+    bots[2].close()
+
+    print(profiler.format_report())
+    print("Result:", q.get_game_state())
+
+
+if __name__ == '__main__':
+    main()
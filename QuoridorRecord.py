@@ -0,0 +1,166 @@
+# Description: This module records Quoridor games in a compact text notation, and reads them back. A move is written
+#   as the tile's column letter followed by its row number, counting from 1, so that 'e2' moves a pawn to the tile
+#   (4, 1). Columns after 'z' continue as 'aa', 'ab', and so on, for larger boards. A fence move adds its alignment to
+#   the tile it is placed on: 'd4h' is a horizontal fence above the tile (3, 3), and 'd4v' a vertical fence to its
+#   left.
+#
+#   A record file holds one game per line: the grid size, each player's starting number of fences, the result ('1' or
+#   '2' for the winner, '=' for a stalemate, or '*' for an unfinished game), and the moves in order, all separated by
+#   spaces. Players take turns, with Player 1 moving first, so the moves do not name their player. Lines starting with
+#   '#' are comments. Games are only ever appended to a file, so a file can be written by a long-running process while
+#   it is being read.
+#
+#   'replay_records' reads a file one line at a time, replaying each game through 'QuoridorGame' and checking every
+#   move and the result as it goes, so files of any length can be checked without loading them into memory.
+#
+#   Example: python QuoridorRecord.py games.txt (replays every game in the file and prints a summary)
+
+import argparse
+import re
+import Quoridor
+
+#  The result written for each game state.
+RESULTS = {"ONGOING": "*", "STALEMATE": "=", "PLAYER_1_WIN": "1", "PLAYER_2_WIN": "2"}
+
+#  A move in notation: the column letters, the row number, and the optional fence alignment.
+_MOVE_PATTERN = re.compile(r"([a-z]+)([1-9][0-9]*)([vh]?)")
+
+
+def column_name(column):
+    """This function returns the letters naming the given column: 'a' to 'z' for the first 26 columns, then 'aa',
+    'ab', and so on."""
+    name = ""
+    column += 1
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        name = chr(ord("a") + remainder) + name
+    return name
+
+
+def column_number(name):
+    """This function returns the column named by the given letters, the reverse of 'column_name'."""
+    column = 0
+    for i in name:
+        column = column * 26 + ord(i) - ord("a") + 1
+    return column - 1
+
+
+def move_to_notation(coord, alignment=None):
+    """This function returns the notation of the move to the given coordinate, which is a fence move if an alignment
+    ('v' or 'h') is given and a pawn move otherwise."""
+    notation = column_name(coord[0]) + str(coord[1] + 1)
+    if alignment is not None:
+        notation += alignment
+    return notation
+
+
+def notation_to_move(notation):
+    """This function takes a move in notation and returns it as a (coord, alignment) tuple, with an alignment of None
+    for a pawn move. Raises ValueError if the notation is not a valid move."""
+    match = _MOVE_PATTERN.fullmatch(notation)
+    if match is None:
+        raise ValueError("Invalid move notation '" + notation + "'")
+
+    alignment = None
+    if match.group(3) != "":
+        alignment = match.group(3)
+    return (column_number(match.group(1)), int(match.group(2)) - 1), alignment
+
+
+def apply_move(quoridor, notation):
+    """This function makes the move given in notation for the player whose turn it is, and returns True if the move
+    was legal and made, or False otherwise. Raises ValueError if the notation is not a valid move."""
+    coord, alignment = notation_to_move(notation)
+    player_num = quoridor.get_turn()
+    if alignment is None:
+        return quoridor.move_pawn(player_num, coord)
+    return quoridor.place_fence(player_num, alignment, coord)
+
+
+def format_record(quoridor, fence_count):
+    """This function returns the record line of the given game, which was started with the given number of fences
+    per player, without a trailing newline."""
+    parts = [str(quoridor.get_grid_size()), str(fence_count), RESULTS[quoridor.get_game_state()]]
+    for coord, alignment in quoridor.get_move_log():
+        parts.append(move_to_notation(coord, alignment))
+    return " ".join(parts)
+
+
+def append_record(path, quoridor, fence_count):
+    """This function appends the record of the given game, which was started with the given number of fences per
+    player, to the record file at the given path, creating the file if needed."""
+    with open(path, "a") as record_file:
+        record_file.write(format_record(quoridor, fence_count) + "\n")
+
+
+def parse_record(line):
+    """This function takes a record line and returns a tuple of its grid size, starting fence count, result, and list
+    of moves in notation. Raises ValueError if the line is not a valid record."""
+    parts = line.split()
+    if len(parts) < 3:
+        raise ValueError("Incomplete record '" + line.strip() + "'")
+    if parts[2] not in RESULTS.values():
+        raise ValueError("Unknown result '" + parts[2] + "'")
+    return int(parts[0]), int(parts[1]), parts[2], parts[3:]
+
+
+def read_records(path):
+    """This generator reads the record file at the given path one line at a time, and yields a tuple of each game's
+    line number, grid size, starting fence count, result, and list of moves in notation. Comments and blank lines are
+    skipped. Raises ValueError, naming the line, if a line is not a valid record."""
+    with open(path) as record_file:
+        line_num = 0
+        for line in record_file:
+            line_num += 1
+            if line.strip() == "" or line.startswith("#"):
+                continue
+            try:
+                grid_size, fence_count, result, moves = parse_record(line)
+            except ValueError as error:
+                raise ValueError("Line " + str(line_num) + ": " + str(error))
+            yield line_num, grid_size, fence_count, result, moves
+
+
+def replay_records(path):
+    """This generator reads the record file at the given path one game at a time, replays each game's moves on a new
+    'QuoridorGame', and yields each finished game. Raises ValueError, naming the line and move, if a move is not legal
+    or the game's result does not match its record."""
+    for line_num, grid_size, fence_count, result, moves in read_records(path):
+        q = Quoridor.QuoridorGame(grid_size, fence_count)
+        for i in range(0, len(moves)):
+            try:
+                legal = apply_move(q, moves[i])
+            except ValueError:
+                legal = False
+            if not legal:
+                raise ValueError("Line " + str(line_num) + ": illegal move " + str(i + 1) + " '" + moves[i] + "'")
+        if RESULTS[q.get_game_state()] != result:
+            raise ValueError("Line " + str(line_num) + ": recorded result '" + result + "' does not match '" +
+                             RESULTS[q.get_game_state()] + "'")
+        yield q
+
+
+def main():
+    """This function replays every game of the given record files and prints a summary of their results."""
+    parser = argparse.ArgumentParser(description="Replay and check Quoridor game record files.")
+    parser.add_argument("paths", nargs="+", help="record files to replay")
+    args = parser.parse_args()
+
+    counts = {}
+    moves = 0
+    for path in args.paths:
+        try:
+            for q in replay_records(path):
+                result = RESULTS[q.get_game_state()]
+                counts[result] = counts.get(result, 0) + 1
+                moves += len(q.get_move_log())
+        except ValueError as error:
+            parser.error(path + ": " + str(error))
+
+    print("Games:", sum(counts.values()), " Moves:", moves)
+    print("Player 1 wins: %d  Player 2 wins: %d  Stalemates: %d  Unfinished: %d" % (
+        counts.get("1", 0), counts.get("2", 0), counts.get("=", 0), counts.get("*", 0)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+# Description: This module contains a search-based Quoridor bot. Rather than the one-move heuristics of
+#   'Bot.make_move_v2', it looks several moves ahead with a negamax search using alpha-beta pruning, over both pawn
+#   moves and fence placements. Moves are tried on the game itself with 'push_move' and 'pop_move', so no copies of the
+#   game are made during the search.
+#
+#   The search is run with iterative deepening: each depth is searched in turn until the maximum depth is reached or
+#   the time limit for the move runs out, and the best move of the deepest completed search is played. Results are
+#   kept in a transposition table (see 'QuoridorTransposition'), so positions reached through different move orders
+#   are only searched once, and the best move found by the previous depth is tried first.
+
+import time
+import QuoridorBot
+import QuoridorTablebase
+import QuoridorTransposition
+
+#  Scores of positions. A win is worth more than any evaluation, and quicker wins are preferred.
+WIN_SCORE = 100000
+PATH_WEIGHT = 10
+FENCE_WEIGHT = 4
+
+#  Default search limits.
+DEFAULT_DEPTH = 3
+DEFAULT_TIME_LIMIT = 5.0
+
+
+def score_to_table(score, ply):
+    """This function converts a score found 'ply' moves from the root into one relative to the position itself, so
+    that a stored win is still correct when the position is reached at another depth."""
+    if score >= WIN_SCORE - 1000:
+        return score + ply
+    if score <= -(WIN_SCORE - 1000):
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """This function converts a score stored with 'score_to_table' back into one relative to the root."""
+    if score >= WIN_SCORE - 1000:
+        return score - ply
+    if score <= -(WIN_SCORE - 1000):
+        return score + ply
+    return score
+
+
+class SearchTimeout(Exception):
+    """This exception is raised inside the search when the time limit for the move has run out."""
+    pass
+
+
+class SearchBot(QuoridorBot.Bot):
+    """A Quoridor bot that chooses its moves with an alpha-beta search to a configurable depth."""
+    def __init__(self, quoridor, player_num, depth=None, time_limit=None, table_size_mb=None, book=None, rng=None):
+        """Initializes the search bot to play as the specified player in the specified game. The search looks at
+        most 'depth' moves ahead, stops deepening after 'time_limit' seconds, and keeps its transposition table within
+        'table_size_mb' megabytes. Positions in the opening book file 'book', if given, are not searched. Random
+        choices are drawn from 'rng' (see 'Bot')."""
+        super().__init__(quoridor, player_num, book=book, rng=rng)
+        if depth is None:
+            depth = DEFAULT_DEPTH
+        if time_limit is None:
+            time_limit = DEFAULT_TIME_LIMIT
+        self._depth = depth
+        self._time_limit = time_limit
+        self._deadline = None
+        self._nodes = 0
+        self._table = QuoridorTransposition.TranspositionTable(table_size_mb)
+
+    def get_table(self):
+        """This method returns the bot's transposition table."""
+        return self._table
+
+    def get_nodes(self):
+        """This method returns the number of positions visited by the most recent search."""
+        return self._nodes
+
+    def evaluate(self, player_num):
+        """This method returns the score of the current position from the given player's point of view: the
+        difference between the players' shortest path lengths (as in 'find_min_moves'), plus the difference between
+        their remaining fences."""
+        q = self._quoridor
+        opponent_num = q.get_opposing_num(player_num)
+
+        self_min_moves = q.goal_distance(player_num)
+        opponent_min_moves = q.goal_distance(opponent_num)
+        if self_min_moves is None or opponent_min_moves is None:
+            return 0
+
+        path_score = (opponent_min_moves - self_min_moves) * PATH_WEIGHT
+        fence_score = (q.get_remaining_fences(player_num) - q.get_remaining_fences(opponent_num)) * FENCE_WEIGHT
+        return path_score + fence_score
+
+    def order_moves(self, player_num):
+        """This method returns a list of the legal moves for the given player as (coord, alignment) tuples, with an
+        alignment of None for pawn moves. Pawn moves along a shortest path come first, followed by fences that cut the
+        opponent's shortest path (those that lengthen it most relative to ours first), then the remaining pawn moves
+        and fences."""
+        q = self._quoridor
+        opponent_num = q.get_opposing_num(player_num)
+
+        self_min_moves = q.goal_distance(player_num)
+        path_moves = []
+        other_moves = []
+        fences = []
+        for move in q.legal_moves(player_num):
+            if move[1] is not None:
+                fences.append(move)
+                continue
+            min_moves = q.goal_distance(player_num, start_tile=move[0])
+            if self_min_moves is not None and min_moves is not None and min_moves < self_min_moves:
+                path_moves.append(move)
+            else:
+                other_moves.append(move)
+
+        if len(fences) == 0:
+            return path_moves + other_moves
+
+        #  Score the fences on the opponent's shortest path by how much more they slow the opponent than us
+        opponent_min_moves = q.goal_distance(opponent_num)
+        legal_fences = set(fences)
+        cutting_fences = []
+        cutting_set = set()
+        for alignment, coord in self.find_path_fences(opponent_num):
+            if (coord, alignment) in legal_fences and (coord, alignment) not in cutting_set:
+                opponent_change = q.goal_distance(opponent_num, alignment, coord) - opponent_min_moves
+                self_change = q.goal_distance(player_num, alignment, coord) - self_min_moves
+                cutting_fences.append((opponent_change - self_change, (coord, alignment)))
+                cutting_set.add((coord, alignment))
+        cutting_fences.sort(key=lambda fence: fence[0], reverse=True)
+
+        other_fences = []
+        for move in fences:
+            if move not in cutting_set:
+                other_fences.append(move)
+
+        ordered_moves = path_moves
+        for i in cutting_fences:
+            ordered_moves.append(i[1])
+        return ordered_moves + other_moves + other_fences
+
+    def negamax(self, depth, alpha, beta, ply):
+        """This method returns the score of the current position for the player whose turn it is, searching 'depth'
+        moves ahead with alpha-beta pruning. Raises SearchTimeout when the time limit has run out."""
+        q = self._quoridor
+        self._nodes += 1
+        if self._nodes % 256 == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+        player_num = q.get_turn()
+        if not q.is_ongoing():
+            if q.is_winner(player_num):
+                return WIN_SCORE - ply
+            if q.is_winner(q.get_opposing_num(player_num)):
+                return -(WIN_SCORE - ply)
+            return 0
+
+        #  Once neither player has fences left, a tablebase already solved for these walls has the exact result.
+        #  Tables are not solved during the search, as each fence placed in the search would need its own.
+        tablebase = None
+        if QuoridorTablebase.is_pawn_race(q):
+            tablebase = QuoridorTablebase.find_tablebase(q)
+        if tablebase is not None:
+            result, moves_left = tablebase.probe(q.get_player_pawn(1), q.get_player_pawn(2), player_num)
+            if result == QuoridorTablebase.RESULT_WIN:
+                return WIN_SCORE - ply - moves_left
+            if result == QuoridorTablebase.RESULT_LOSS:
+                return -(WIN_SCORE - ply - moves_left)
+            return 0
+
+        if depth == 0:
+            return self.evaluate(player_num)
+
+        #  Use the stored result of an earlier search of this position if it was deep enough
+        key = q.get_zobrist_key()
+        table_move = None
+        entry = self._table.probe(key)
+        if entry is not None:
+            table_depth, table_score, table_bound, table_move = entry
+            if table_depth >= depth:
+                table_score = score_from_table(table_score, ply)
+                if table_bound == QuoridorTransposition.BOUND_EXACT:
+                    return table_score
+                if table_bound == QuoridorTransposition.BOUND_LOWER and table_score >= beta:
+                    return table_score
+                if table_bound == QuoridorTransposition.BOUND_UPPER and table_score <= alpha:
+                    return table_score
+
+        moves = self.order_moves(player_num)
+        if table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        alpha_orig = alpha
+        best_score = None
+        best_move = None
+        for coord, alignment in moves:
+            q.push_move(player_num, coord, alignment)
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                q.pop_move()
+            if best_score is None or score > best_score:
+                best_score = score
+                best_move = (coord, alignment)
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score is None:
+            return self.evaluate(player_num)
+
+        if best_score <= alpha_orig:
+            bound = QuoridorTransposition.BOUND_UPPER
+        elif best_score >= beta:
+            bound = QuoridorTransposition.BOUND_LOWER
+        else:
+            bound = QuoridorTransposition.BOUND_EXACT
+        self._table.store(key, depth, score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def search_root(self, player_num, depth, first_move=None):
+        """This method searches every move of the given player to the given depth, trying 'first_move' first, and
+        returns the best move as a (coord, alignment) tuple along with its score."""
+        q = self._quoridor
+
+        moves = self.order_moves(player_num)
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        best_move = None
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        for move in moves:
+            q.push_move(player_num, move[0], move[1])
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                q.pop_move()
+            if best_move is None or score > alpha:
+                best_move = move
+                alpha = score
+        return best_move, alpha
+
+    def find_best_move(self, player_num):
+        """This method runs the iterative deepening search for the given player and returns the best move found as a
+        (coord, alignment) tuple, with an alignment of None for pawn moves."""
+        self._deadline = time.perf_counter() + self._time_limit
+        self._nodes = 0
+        self._table.new_search()
+
+        best_move = None
+        for depth in range(1, self._depth + 1):
+            try:
+                best_move, score = self.search_root(player_num, depth, best_move)
+            except SearchTimeout:
+                break
+            if abs(score) >= WIN_SCORE - self._depth:
+                break
+        return best_move
+
+    def make_move(self, player_num):
+        """This method searches for and makes the bot's move for the given player, or plays the opening book's or
+        endgame tablebase's move if there is one."""
+        q = self._quoridor
+
+        if self.make_book_move(player_num) or self.make_tablebase_move(player_num):
+            return
+
+        best_move = self.find_best_move(player_num)
+        if best_move is None:
+            return self.make_move_v2(player_num)
+
+        coord, alignment = best_move
+        if alignment is None:
+            q.move_pawn(player_num, coord)
+        else:
+            q.place_fence(player_num, alignment, coord)
@@ -0,0 +1,358 @@
+# Description: This program hosts many Quoridor games at once for clients connecting over a local TCP or Unix socket.
+#   Each request and response is one line of JSON. A request names its operation in 'op', and may carry an 'id', which
+#   is copied into its response so that a client can send several requests without waiting for each answer:
+#
+#     {"op": "new", "grid_size": 9, "fences": 10, "bot": "v2", "bot_player": 2}  starts a game, optionally with a bot
+#                                                                              (configured as in 'QuoridorTournament')
+#     {"op": "move", "game": 1, "move": "e2"}   makes a move in notation (see 'QuoridorRecord'), and the bot's reply
+#     {"op": "bot_move", "game": 1}             has the game's bot make the next move, whoever's turn it is
+#     {"op": "state", "game": 1}                returns the game's state
+#     {"op": "legal", "game": 1}                returns the legal moves of the player to move
+#     {"op": "close", "game": 1}                ends the game
+#     {"op": "stats"}                           returns the server's counters
+#
+#   A client's bot may only be given the options of 'CLIENT_BOT_OPTIONS', each up to its limit there, so that no client
+#   can tie up the server's worker processes, start more processes, or have the server open a file.
+#
+#   Every response has 'ok' set to true, or false along with an 'error' message. Responses about a game include its
+#   state, and those of 'new', 'move', and 'bot_move' list the 'moves' made, in notation.
+#
+#   Between requests each game is kept as its encoded position (see 'QuoridorGame.to_bytes') and the Zobrist hashes of
+#   its earlier positions, a few hundred bytes for a whole game, and the game is rebuilt for each request. Bot moves are
+#   made in a pool of worker processes, so the server keeps answering other games while a bot is thinking.
+#
+#   Example: python QuoridorServer.py --port 7878 --workers 4
+
+import argparse
+import asyncio
+import json
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import Quoridor
+import QuoridorRecord
+import QuoridorTournament
+
+#  Default server settings.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7878
+DEFAULT_MAX_SESSIONS = 10000
+
+#  The options a client may give each type of bot, with the largest value allowed for each. Options with an integer
+#  limit must be integers.
+CLIENT_BOT_OPTIONS = {"v2": {},
+                      "search": {"depth": 6, "time_limit": 10.0, "table_size_mb": 64},
+                      "mcts": {"playouts": 100000, "time_limit": 10.0}}
+
+
+def check_bot_config(bot_config):
+    """This function raises ValueError, naming the problem, if a bot configuration from a client is not a string, or
+    names a bot type or option that clients may not use, or gives an option a value outside its limit (see
+    'CLIENT_BOT_OPTIONS')."""
+    if not isinstance(bot_config, str):
+        raise ValueError("Invalid bot " + json.dumps(bot_config))
+    name, kwargs = QuoridorTournament.parse_bot_config(bot_config)
+    if name not in CLIENT_BOT_OPTIONS:
+        raise ValueError("Unknown bot type '" + name + "'; expected one of: " + ", ".join(CLIENT_BOT_OPTIONS))
+
+    options = CLIENT_BOT_OPTIONS[name]
+    for key, value in kwargs.items():
+        if key not in options:
+            allowed = "none"
+            if len(options) > 0:
+                allowed = ", ".join(options)
+            raise ValueError("Option '" + key + "' is not allowed for '" + name + "' bots; allowed options: " +
+                             allowed)
+        limit = options[key]
+        if isinstance(limit, int) and not isinstance(value, int):
+            raise ValueError("Option '" + key + "' must be an integer")
+        if not isinstance(value, (int, float)) or not 0 < value <= limit:
+            raise ValueError("Option '" + key + "' must be a number greater than 0 and at most " + str(limit))
+
+
+def _bot_move_worker(position, history, bot_config, player_num):
+    """This function runs in a worker process. It rebuilds the game from its encoded position and history, has a bot
+    of the given configuration make the given player's move, and returns the move as a (coord, alignment) tuple, or
+    None if the bot did not move."""
+    q = Quoridor.game_from_bytes(position, history=history)
+    bot = QuoridorTournament.create_bot(bot_config, q, player_num)
+    try:
+        bot.make_move(player_num)
+    finally:
+        bot.close()
+
+    move_log = q.get_move_log()
+    if len(move_log) == 0:
+        return None
+    return move_log[-1]
+
+
+class GameSession:
+    """This class represents one game hosted by the server, stored compactly between requests."""
+    def __init__(self, quoridor, bot_config, bot_player):
+        """Initializes the session from the given game, and the configuration and player number of its bot (both None
+        for a game without a bot)."""
+        self.position = quoridor.to_bytes()
+        self.history = array("Q")
+        self.bot_config = bot_config
+        self.bot_player = bot_player
+        self.move_count = 0
+        self.busy = False
+
+    def load(self):
+        """This method returns the session's game, rebuilt with its position history."""
+        return Quoridor.game_from_bytes(self.position, history=self.history)
+
+    def apply_move(self, quoridor, coord, alignment):
+        """This method makes the given move for the player to move on the session's rebuilt game, and stores the
+        resulting position. Returns True if the move was legal and made, and False otherwise."""
+        previous_key = quoridor.get_zobrist_key()
+        player_num = quoridor.get_turn()
+        if alignment is None:
+            moved = quoridor.move_pawn(player_num, coord)
+        else:
+            moved = quoridor.place_fence(player_num, alignment, coord)
+        if not moved:
+            return False
+
+        self.history.append(previous_key)
+        self.position = quoridor.to_bytes()
+        self.move_count += 1
+        return True
+
+
+def describe_game(game_id, session, quoridor):
+    """This function returns a dictionary describing the state of a game, for a response."""
+    return {"game": game_id, "state": quoridor.get_game_state(), "turn": quoridor.get_turn(),
+            "grid_size": quoridor.get_grid_size(),
+            "pawns": [QuoridorRecord.move_to_notation(quoridor.get_player_pawn(1)),
+                      QuoridorRecord.move_to_notation(quoridor.get_player_pawn(2))],
+            "fences": [quoridor.get_remaining_fences(1), quoridor.get_remaining_fences(2)],
+            "move_count": session.move_count, "bot_player": session.bot_player}
+
+
+class QuoridorServer:
+    """This class represents a server hosting many Quoridor games, with bot moves made in worker processes."""
+    def __init__(self, workers=None, max_sessions=None):
+        """Initializes the server with a pool of 'workers' processes for bot moves, hosting at most 'max_sessions'
+        games at once."""
+        if workers is None:
+            workers = 1
+        if max_sessions is None:
+            max_sessions = DEFAULT_MAX_SESSIONS
+        self._executor = ProcessPoolExecutor(workers)
+        self._max_sessions = max_sessions
+        self._sessions = {}
+        self._next_game_id = 1
+        self._stats = {"connections": 0, "requests": 0, "errors": 0, "moves": 0, "bot_moves": 0, "games": 0}
+
+    def close(self):
+        """This method shuts down the server's worker processes."""
+        self._executor.shutdown()
+
+    def get_session(self, request):
+        """This method returns the game id and session named by a request. Raises ValueError if there is no such
+        game."""
+        game_id = request.get("game")
+        if not isinstance(game_id, int) or isinstance(game_id, bool) or game_id not in self._sessions:
+            raise ValueError("Unknown game " + json.dumps(game_id))
+        return game_id, self._sessions[game_id]
+
+    async def handle_connection(self, reader, writer):
+        """This method answers the requests of one client connection until it is closed. Each request is handled in
+        its own task, so a slow bot move does not hold up the connection's other games."""
+        self._stats["connections"] += 1
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if line == b"":
+                    break
+                task = asyncio.create_task(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            #  Answer the requests still being handled before closing
+            if len(tasks) > 0:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line, writer):
+        """This method handles one request line and writes its response line. Every request is answered, even one
+        that fails unexpectedly, so that a client waiting on its response is not left hanging."""
+        self._stats["requests"] += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests must be JSON objects")
+            request_id = request.get("id")
+            response = await self.handle_request(request)
+            response["ok"] = True
+        except ValueError as error:
+            self._stats["errors"] += 1
+            response = {"ok": False, "error": str(error)}
+        except Exception as error:
+            self._stats["errors"] += 1
+            response = {"ok": False, "error": "Internal error: " + repr(error)}
+        if request_id is not None:
+            response["id"] = request_id
+
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode() + b"\n")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def handle_request(self, request):
+        """This method performs the operation of a request and returns its response as a dictionary. Raises
+        ValueError if the request is not valid."""
+        op = request.get("op")
+        if op == "new":
+            return await self.new_game(request)
+        if op == "move":
+            return await self.make_move(request)
+        if op == "bot_move":
+            game_id, session = self.get_session(request)
+            return await self.make_bot_moves(game_id, session, True)
+        if op == "state":
+            game_id, session = self.get_session(request)
+            return describe_game(game_id, session, session.load())
+        if op == "legal":
+            game_id, session = self.get_session(request)
+            q = session.load()
+            moves = []
+            for coord, alignment in q.legal_moves(q.get_turn()):
+                moves.append(QuoridorRecord.move_to_notation(coord, alignment))
+            return {"game": game_id, "moves": moves}
+        if op == "close":
+            game_id, session = self.get_session(request)
+            del self._sessions[game_id]
+            return {"game": game_id}
+        if op == "stats":
+            stats = dict(self._stats)
+            stats["sessions"] = len(self._sessions)
+            return stats
+        raise ValueError("Unknown operation " + json.dumps(op))
+
+    async def new_game(self, request):
+        """This method starts a game from a 'new' request, and makes the bot's first move if the bot is Player 1."""
+        if len(self._sessions) >= self._max_sessions:
+            raise ValueError("Too many games")
+        grid_size = request.get("grid_size", 9)
+        fence_count = request.get("fences", 10)
+        bot_config = request.get("bot")
+        bot_player = None
+        if not isinstance(grid_size, int) or not isinstance(fence_count, int) or not 3 <= grid_size <= 255 or \
+                not 0 <= fence_count <= 65535:
+            raise ValueError("Invalid grid size or fence count")
+        if bot_config is not None:
+            check_bot_config(bot_config)
+            bot_player = request.get("bot_player", 2)
+            if bot_player not in (1, 2):
+                raise ValueError("Invalid bot player " + json.dumps(bot_player))
+
+        game_id = self._next_game_id
+        self._next_game_id += 1
+        session = GameSession(Quoridor.QuoridorGame(grid_size, fence_count), bot_config, bot_player)
+        self._sessions[game_id] = session
+        self._stats["games"] += 1
+        try:
+            return await self.make_bot_moves(game_id, session, False)
+        except ValueError:
+            del self._sessions[game_id]
+            raise
+
+    async def make_move(self, request):
+        """This method makes the move of a 'move' request, followed by the bot's reply if the game has a bot."""
+        game_id, session = self.get_session(request)
+        if session.busy:
+            raise ValueError("The bot is still moving in game " + str(game_id))
+        notation = request.get("move")
+        if not isinstance(notation, str):
+            raise ValueError("Missing move")
+        coord, alignment = QuoridorRecord.notation_to_move(notation)
+
+        q = session.load()
+        if not session.apply_move(q, coord, alignment):
+            raise ValueError("Illegal move '" + notation + "'")
+        self._stats["moves"] += 1
+
+        response = await self.make_bot_moves(game_id, session, False)
+        response["moves"].insert(0, notation)
+        return response
+
+    async def make_bot_moves(self, game_id, session, force):
+        """This method has the game's bot move while it is the bot's turn (or for the player to move, once, if
+        'force' is True), with each move made in a worker process, and returns the game's state along with the
+        moves made."""
+        if session.busy:
+            raise ValueError("The bot is still moving in game " + str(game_id))
+        if force and session.bot_config is None:
+            raise ValueError("Game " + str(game_id) + " has no bot")
+
+        moves = []
+        loop = asyncio.get_running_loop()
+        q = session.load()
+        session.busy = True
+        try:
+            while q.is_ongoing() and (force or q.get_turn() == session.bot_player):
+                try:
+                    move = await loop.run_in_executor(self._executor, _bot_move_worker, session.position,
+                                                      session.history, session.bot_config, q.get_turn())
+                except Exception as error:
+                    raise ValueError("The bot failed: " + repr(error))
+                #  The game may have been closed while the bot was thinking
+                if game_id not in self._sessions or move is None or not session.apply_move(q, move[0], move[1]):
+                    break
+                moves.append(QuoridorRecord.move_to_notation(move[0], move[1]))
+                self._stats["bot_moves"] += 1
+                force = False
+        finally:
+            session.busy = False
+
+        response = describe_game(game_id, session, q)
+        response["moves"] = moves
+        return response
+
+
+async def serve(host=None, port=None, unix_path=None, workers=None, max_sessions=None):
+    """This function runs a server on the given TCP host and port, or on the given Unix socket path, until it is
+    cancelled."""
+    if host is None:
+        host = DEFAULT_HOST
+    if port is None:
+        port = DEFAULT_PORT
+
+    server = QuoridorServer(workers, max_sessions)
+    try:
+        if unix_path is not None:
+            listener = await asyncio.start_unix_server(server.handle_connection, unix_path)
+        else:
+            listener = await asyncio.start_server(server.handle_connection, host, port)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    """This function runs the server from the command line arguments."""
+    parser = argparse.ArgumentParser(description="Host Quoridor games over a local socket.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", help="Unix socket path to listen on, instead of TCP")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes for bot moves")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS, help="most games hosted at once")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
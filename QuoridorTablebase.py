@@ -0,0 +1,226 @@
+# Description: This module contains the endgame tablebase of the Quoridor bots. Once neither player has any fences
+#   left, the walls can no longer change, and the game is a race between the pawns whose outcome depends only on where
+#   the pawns are and whose turn it is. For a given set of walls, the tablebase solves every placement of the two pawns
+#   with either player to move, by working backwards from the finished positions ('retrograde analysis'), and stores
+#   whether the player to move wins, loses, or draws, and in how many moves.
+#
+#   Positions follow the rules of 'QuoridorGame': a pawn on its winning row has won, and a player left without a valid
+#   move has drawn by stalemate. Draws by repetition are not considered, so a drawn position is one that neither
+#   player can force a win from.
+#
+#   Solving a 9x9 board takes a fraction of a second, and its table is about 26 kilobytes. Tables are kept in a cache
+#   shared by every bot in the process, keyed by the walls they were solved for, and the least recently used table is
+#   discarded once the cache is full.
+#
+#   A board of n x n tiles has 2 * n^4 positions, and each is linked to the positions it leads to while it is solved,
+#   so the time and memory of a solve grow with the square of the number of tiles. Boards of more than
+#   'MAX_TILE_COUNT' tiles are never solved, and the bots play their pawn races without a tablebase.
+
+from collections import OrderedDict
+from array import array
+import Quoridor
+
+#  Results of a position for the player to move.
+RESULT_WIN = "WIN"
+RESULT_LOSS = "LOSS"
+RESULT_DRAW = "DRAW"
+
+#  The number of tables kept in the cache.
+CACHE_SIZE = 64
+
+#  The largest number of tiles of a board that is solved. A 15x15 board is solved in under a second.
+MAX_TILE_COUNT = 15 * 15
+
+#  The cache of solved tables, by wall key (see 'QuoridorGame.get_wall_key'), least recently used first.
+_tables = OrderedDict()
+
+
+class Tablebase:
+    """This class represents the solved pawn race of one set of walls, with every placement of the two pawns and
+    either player to move."""
+    def __init__(self, quoridor):
+        """Initializes the tablebase by solving every pawn race on the given game's walls. The game is not changed."""
+        self._grid_size = quoridor.get_grid_size()
+        self._wall_key = quoridor.get_wall_key()
+        tile_count = self._grid_size * self._grid_size
+
+        #  Each position's value is stored in one signed number: the number of moves left plus 1, positive if the
+        #  player to move wins and negative if they lose, or 0 for a draw.
+        self._values = array("h", bytes(2 * tile_count * tile_count * 2))
+        self.solve(quoridor)
+
+    def get_wall_key(self):
+        """This method returns the wall key of the game the tablebase was solved for."""
+        return self._wall_key
+
+    def get_size_bytes(self):
+        """This method returns the number of bytes used by the table."""
+        return len(self._values) * self._values.itemsize
+
+    def index(self, pawn_1, pawn_2, player_num):
+        """This method returns the position in the table of the given pawn coordinates with the given player to
+        move."""
+        tile_count = self._grid_size * self._grid_size
+        tile_1 = pawn_1[1] * self._grid_size + pawn_1[0]
+        tile_2 = pawn_2[1] * self._grid_size + pawn_2[0]
+        return (tile_1 * tile_count + tile_2) * 2 + player_num - 1
+
+    def solve(self, quoridor):
+        """This method fills the table for the given game's walls. Each position's moves are found with
+        'valid_tiles', then every finished position is marked, and the results are spread backwards from them one
+        move at a time: a position is won if any move leads to a position lost for the opponent, and lost once every
+        move leads to a position won for the opponent."""
+        scratch = Quoridor.game_from_bytes(quoridor.to_bytes())
+        tiles = []
+        for row in range(0, self._grid_size):
+            for column in range(0, self._grid_size):
+                tiles.append((column, row))
+
+        position_count = len(self._values)
+        children = []
+        for i in range(0, position_count):
+            children.append(None)
+        remaining = array("i", bytes(4 * position_count))
+        solved = bytearray(position_count)
+        queue = []
+
+        for player_num in (1, 2):
+            opponent_num = scratch.get_opposing_num(player_num)
+            for opponent_tile in tiles:
+                scratch.set_player_pawn(opponent_num, opponent_tile)
+                for tile in tiles:
+                    if tile == opponent_tile:
+                        continue
+                    if player_num == 1:
+                        i = self.index(tile, opponent_tile, 1)
+                    else:
+                        i = self.index(opponent_tile, tile, 2)
+
+                    moves = scratch.valid_tiles(player_num, tile)
+                    #  A player without a move has drawn, even if their opponent has just reached their goal
+                    if len(moves) == 0:
+                        solved[i] = 1
+                        queue.append(i)
+                    elif scratch.is_winning_tile(opponent_num, opponent_tile):
+                        self._values[i] = -1
+                        solved[i] = 1
+                        queue.append(i)
+                    elif scratch.is_winning_tile(player_num, tile):
+                        self._values[i] = 1
+                        solved[i] = 1
+                        queue.append(i)
+                    else:
+                        child_list = []
+                        for move in moves:
+                            if player_num == 1:
+                                child_list.append(self.index(move, opponent_tile, 2))
+                            else:
+                                child_list.append(self.index(opponent_tile, move, 1))
+                        children[i] = child_list
+                        remaining[i] = len(child_list)
+
+        parents = []
+        for i in range(0, position_count):
+            parents.append([])
+        for i in range(0, position_count):
+            if children[i] is not None:
+                for child in children[i]:
+                    parents[child].append(i)
+
+        #  The queue holds solved positions in the order of their number of moves left, so each position is given the
+        #  quickest win or the slowest loss
+        j = 0
+        while j < len(queue):
+            child = queue[j]
+            j += 1
+            value = self._values[child]
+            if value == 0:
+                continue
+            for parent in parents[child]:
+                if solved[parent]:
+                    continue
+                if value < 0:
+                    self._values[parent] = 1 - value
+                    solved[parent] = 1
+                    queue.append(parent)
+                else:
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0:
+                        self._values[parent] = -(value + 1)
+                        solved[parent] = 1
+                        queue.append(parent)
+
+    def probe(self, pawn_1, pawn_2, player_num):
+        """This method returns the result of the position with the pawns on the given coordinates and the given player
+        to move, as a tuple of the result for that player (RESULT_WIN, RESULT_LOSS, or RESULT_DRAW) and the number of
+        moves, by both players, until the game is won (0 for a draw)."""
+        value = self._values[self.index(pawn_1, pawn_2, player_num)]
+        if value > 0:
+            return RESULT_WIN, value - 1
+        if value < 0:
+            return RESULT_LOSS, -value - 1
+        return RESULT_DRAW, 0
+
+    def find_best_move(self, quoridor, player_num):
+        """This method returns the given player's best pawn move in the game's current position: the quickest win, a
+        draw if there is no win, or otherwise the slowest loss. Returns None if the player has no valid moves."""
+        opponent_num = quoridor.get_opposing_num(player_num)
+        opponent_pawn = quoridor.get_player_pawn(opponent_num)
+
+        best_move = None
+        best_value = None
+        for move in quoridor.valid_tiles(player_num, quoridor.get_player_pawn(player_num)):
+            if player_num == 1:
+                value = self._values[self.index(move, opponent_pawn, 2)]
+            else:
+                value = self._values[self.index(opponent_pawn, move, 1)]
+            #  The opponent's loss in fewer moves is better, then a draw, then the opponent's win in more moves
+            if value < 0:
+                rank = (2, value)
+            elif value == 0:
+                rank = (1, 0)
+            else:
+                rank = (0, value)
+            if best_value is None or rank > best_value:
+                best_move = move
+                best_value = rank
+        return best_move
+
+
+def find_tablebase(quoridor):
+    """This function returns the tablebase of the given game's walls if it is in the cache, or None otherwise. Unlike
+    'get_tablebase', it never solves a new table, so it is cheap enough to call on every position of a search."""
+    wall_key = quoridor.get_wall_key()
+    if wall_key not in _tables:
+        return None
+    _tables.move_to_end(wall_key)
+    return _tables[wall_key]
+
+
+def get_tablebase(quoridor):
+    """This function returns the tablebase of the given game's walls, from the cache if it has already been solved.
+    Raises ValueError if the board is too large to solve (see 'is_solvable')."""
+    if not is_solvable(quoridor):
+        raise ValueError("Boards of more than " + str(MAX_TILE_COUNT) + " tiles have no tablebase")
+    wall_key = quoridor.get_wall_key()
+    if wall_key in _tables:
+        _tables.move_to_end(wall_key)
+        return _tables[wall_key]
+
+    tablebase = Tablebase(quoridor)
+    _tables[wall_key] = tablebase
+    while len(_tables) > CACHE_SIZE:
+        _tables.popitem(last=False)
+    return tablebase
+
+
+def is_solvable(quoridor):
+    """This function returns True if the given game's board has at most 'MAX_TILE_COUNT' tiles, so that its tablebase
+    can be solved, and False otherwise."""
+    return quoridor.get_grid_size() * quoridor.get_grid_size() <= MAX_TILE_COUNT
+
+
+def is_pawn_race(quoridor):
+    """This function returns True if neither player has any fences left, so that the game can be looked up in a
+    tablebase, and False otherwise."""
+    return quoridor.get_remaining_fences(1) == 0 and quoridor.get_remaining_fences(2) == 0
@@ -0,0 +1,261 @@
+# Description: This program plays Quoridor bots against each other without the pygame window, to compare bot versions
+#   over many games. Two bot configurations are given on the command line, such as 'v2' (the 'Bot.make_move_v2' bot),
+#   'search:depth=2,time_limit=1', or 'mcts:playouts=200'. The bots play the requested number of games, alternating
+#   which of them is Player 1, and move as soon as they have decided (the thinking delay is only added by the GUI).
+#   Games are spread over a pool of worker processes.
+#
+#   A game that reaches the move cap without a winner is adjudicated: the player with the shorter path to their goal
+#   (ignoring the opposing pawn) is awarded the win, and equal paths are a draw. The report gives each bot's score
+#   with a 95% Wilson confidence interval, counting a draw as half a win, along with the number of games played per
+#   second and each bot's average time per move. Every game can also be appended to a record file (see
+#   'QuoridorRecord').
+#
+#   Example: python QuoridorTournament.py v2 search:depth=2 --games 200 --workers 8
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import Quoridor
+import QuoridorBot
+import QuoridorMCTS
+import QuoridorRecord
+import QuoridorSearch
+
+#  The bot classes that can be named in a configuration.
+BOT_TYPES = {"v2": QuoridorBot.Bot, "search": QuoridorSearch.SearchBot, "mcts": QuoridorMCTS.MCTSBot}
+
+#  Default tournament settings.
+DEFAULT_GAMES = 100
+DEFAULT_MOVE_CAP = 200
+
+#  The z-score of the 95% confidence intervals.
+CONFIDENCE_Z = 1.96
+
+
+def parse_bot_config(config):
+    """This function takes a bot configuration such as 'search:depth=2,book=opening_book.bin' and returns a tuple of
+    the bot type's name and a dictionary of its keyword arguments. Raises ValueError if the bot type is unknown."""
+    name, _, options = config.partition(":")
+    if name not in BOT_TYPES:
+        raise ValueError("Unknown bot type '" + name + "'; expected one of: " + ", ".join(BOT_TYPES))
+
+    kwargs = {}
+    for option in options.split(","):
+        if option == "":
+            continue
+        key, _, value = option.partition("=")
+        #  Options are numbers, except for names such as the path of an opening book
+        try:
+            kwargs[key] = int(value)
+        except ValueError:
+            try:
+                kwargs[key] = float(value)
+            except ValueError:
+                kwargs[key] = value
+    return name, kwargs
+
+
+def create_bot(config, quoridor, player_num, rng=None):
+    """This function returns a bot built from the given configuration to play as the given player, drawing its random
+    choices from 'rng' if it is given (see 'Bot')."""
+    name, kwargs = parse_bot_config(config)
+    if rng is not None:
+        kwargs["rng"] = rng
+    return BOT_TYPES[name](quoridor, player_num, **kwargs)
+
+
+def adjudicate(quoridor):
+    """This function returns the winner of an unfinished game by the players' shortest paths to their goals: the
+    player with the shorter path, or 0 if the paths are the same length."""
+    distance_1 = quoridor.goal_distance(1)
+    distance_2 = quoridor.goal_distance(2)
+    if distance_1 < distance_2:
+        return 1
+    if distance_2 < distance_1:
+        return 2
+    return 0
+
+
+def play_game(config_1, config_2, grid_size, fence_count, move_cap, seed):
+    """This function plays one game between bots of the given configurations, as Player 1 and Player 2, and returns a
+    dictionary of the result: the 'winner' (0 for a draw), the number of 'moves', whether the game was 'adjudicated',
+    each player's total 'move_time' in seconds and 'move_count', and the game's 'record' line. Each bot draws its
+    random choices from its own generator seeded from 'seed', so a game between bots limited by depth or playouts
+    rather than time is played the same way every time."""
+    rng = random.Random(seed)
+    q = Quoridor.QuoridorGame(grid_size, fence_count)
+    bots = {1: create_bot(config_1, q, 1, random.Random(rng.getrandbits(64))),
+            2: create_bot(config_2, q, 2, random.Random(rng.getrandbits(64)))}
+    move_time = {1: 0.0, 2: 0.0}
+    move_count = {1: 0, 2: 0}
+
+    moves = 0
+    try:
+        while q.is_ongoing() and moves < move_cap:
+            player_num = q.get_turn()
+            start = time.perf_counter()
+            bots[player_num].make_move(player_num)
+            move_time[player_num] += time.perf_counter() - start
+            move_count[player_num] += 1
+            moves += 1
+    finally:
+        bots[1].close()
+        bots[2].close()
+
+    adjudicated = False
+    if q.is_winner(1):
+        winner = 1
+    elif q.is_winner(2):
+        winner = 2
+    elif not q.is_ongoing():
+        winner = 0
+    else:
+        winner = adjudicate(q)
+        adjudicated = True
+    return {"winner": winner, "moves": moves, "adjudicated": adjudicated, "move_time": move_time,
+            "move_count": move_count, "record": QuoridorRecord.format_record(q, fence_count)}
+
+
+def _play_game_worker(game_num, config_a, config_b, grid_size, fence_count, move_cap, seed):
+    """This function runs in a worker process. It plays the tournament's game of the given number, in which bot A is
+    Player 1 in even-numbered games and Player 2 in odd-numbered ones, and returns the game number, bot A's player
+    number, and the result of 'play_game'."""
+    if game_num % 2 == 0:
+        player_a = 1
+        result = play_game(config_a, config_b, grid_size, fence_count, move_cap, seed + game_num)
+    else:
+        player_a = 2
+        result = play_game(config_b, config_a, grid_size, fence_count, move_cap, seed + game_num)
+    return game_num, player_a, result
+
+
+def wilson_interval(score, games):
+    """This function returns the 95% Wilson confidence interval of a win rate as a tuple (low, high), given the score
+    (wins plus half of the draws) over the given number of games."""
+    if games == 0:
+        return 0.0, 1.0
+    rate = score / games
+    z_squared = CONFIDENCE_Z * CONFIDENCE_Z
+    centre = rate + z_squared / (2 * games)
+    spread = CONFIDENCE_Z * math.sqrt(rate * (1 - rate) / games + z_squared / (4 * games * games))
+    denominator = 1 + z_squared / games
+    return max(0.0, (centre - spread) / denominator), min(1.0, (centre + spread) / denominator)
+
+
+def run_tournament(config_a, config_b, games=None, grid_size=None, fence_count=None, move_cap=None, workers=None,
+                   seed=None, record_path=None):
+    """This function plays the given number of games between bots A and B, alternating who is Player 1, over the
+    given number of worker processes, and returns a dictionary summarizing the results. If a record path is given,
+    every game is appended to that record file, in the order the games were numbered."""
+    if games is None:
+        games = DEFAULT_GAMES
+    if grid_size is None:
+        grid_size = 9
+    if fence_count is None:
+        fence_count = 10
+    if move_cap is None:
+        move_cap = DEFAULT_MOVE_CAP
+    if workers is None:
+        workers = 1
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    #  Check both configurations before starting any games
+    parse_bot_config(config_a)
+    parse_bot_config(config_b)
+
+    start = time.perf_counter()
+    results = []
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = []
+            for i in range(0, games):
+                futures.append(executor.submit(_play_game_worker, i, config_a, config_b, grid_size, fence_count,
+                                               move_cap, seed))
+            for future in futures:
+                results.append(future.result())
+    else:
+        for i in range(0, games):
+            results.append(_play_game_worker(i, config_a, config_b, grid_size, fence_count, move_cap, seed))
+    elapsed = time.perf_counter() - start
+
+    #  The records are written here rather than by the workers, so that no two processes append to the file at once
+    if record_path is not None:
+        with open(record_path, "a") as record_file:
+            for game_num, player_a, result in results:
+                record_file.write(result["record"] + "\n")
+
+    summary = {"bot_a": config_a, "bot_b": config_b, "games": games, "seed": seed, "wins_a": 0, "wins_b": 0,
+               "draws": 0, "adjudicated": 0, "total_moves": 0, "elapsed": elapsed}
+    move_time = {"a": 0.0, "b": 0.0}
+    move_count = {"a": 0, "b": 0}
+    for game_num, player_a, result in results:
+        player_b = 3 - player_a
+        if result["winner"] == player_a:
+            summary["wins_a"] += 1
+        elif result["winner"] == player_b:
+            summary["wins_b"] += 1
+        else:
+            summary["draws"] += 1
+        if result["adjudicated"]:
+            summary["adjudicated"] += 1
+        summary["total_moves"] += result["moves"]
+        move_time["a"] += result["move_time"][player_a]
+        move_time["b"] += result["move_time"][player_b]
+        move_count["a"] += result["move_count"][player_a]
+        move_count["b"] += result["move_count"][player_b]
+
+    summary["score_a"] = summary["wins_a"] + summary["draws"] / 2
+    summary["interval_a"] = wilson_interval(summary["score_a"], games)
+    summary["games_per_second"] = games / elapsed
+    summary["move_latency_a"] = move_time["a"] / max(1, move_count["a"])
+    summary["move_latency_b"] = move_time["b"] / max(1, move_count["b"])
+    return summary
+
+
+def print_summary(summary):
+    """This function prints a tournament summary from 'run_tournament'."""
+    games = summary["games"]
+    low, high = summary["interval_a"]
+    print("A:", summary["bot_a"])
+    print("B:", summary["bot_b"])
+    print("Games:", games, "(seed " + str(summary["seed"]) + ")")
+    print("A wins: %d  B wins: %d  Draws: %d  Adjudicated: %d" % (summary["wins_a"], summary["wins_b"],
+                                                                 summary["draws"], summary["adjudicated"]))
+    print("A score: %.1f%%  (95%% CI %.1f%% - %.1f%%)" % (100 * summary["score_a"] / games, 100 * low, 100 * high))
+    print("B score: %.1f%%  (95%% CI %.1f%% - %.1f%%)" % (100 - 100 * summary["score_a"] / games, 100 - 100 * high,
+                                                          100 - 100 * low))
+    print("Games/sec: %.2f  Average game length: %.1f moves" % (summary["games_per_second"],
+                                                                 summary["total_moves"] / games))
+    print("Average move latency: A %.1f ms  B %.1f ms" % (1000 * summary["move_latency_a"],
+                                                          1000 * summary["move_latency_b"]))
+
+
+def main():
+    """This function runs a tournament from the command line arguments."""
+    parser = argparse.ArgumentParser(description="Play two Quoridor bot configurations against each other.")
+    parser.add_argument("bot_a", help="first bot, e.g. 'v2', 'search:depth=2,time_limit=1', or 'mcts:playouts=200'")
+    parser.add_argument("bot_b", help="second bot")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="number of games to play")
+    parser.add_argument("--grid-size", type=int, default=9, help="size of the board")
+    parser.add_argument("--fences", type=int, default=10, help="fences per player")
+    parser.add_argument("--move-cap", type=int, default=DEFAULT_MOVE_CAP,
+                        help="moves after which a game is adjudicated")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed, for repeatable tournaments between bots not limited by time")
+    parser.add_argument("--record", help="record file to append every game to")
+    args = parser.parse_args()
+
+    try:
+        summary = run_tournament(args.bot_a, args.bot_b, args.games, args.grid_size, args.fences, args.move_cap,
+                                 args.workers, args.seed, args.record)
+    except ValueError as error:
+        parser.error(str(error))
+    print_summary(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Description: This module contains a transposition table for the Quoridor search bot. Fence placements commute, so
+#   a search reaches the same position through many different move orders; the table remembers the result of
+#   searching each position, keyed by the position's Zobrist hash, so that it is only searched once.
+#
+#   The table has a fixed number of slots, set from a memory limit in megabytes, and is stored in typed arrays so that
+#   its footprint does not grow however long it is used. Each slot holds the key, search depth, score, bound type, and
+#   best move of one position. When two positions share a slot, the deeper search is kept, unless the stored entry
+#   was written during an earlier search, in which case it is always replaced.
+
+from array import array
+
+#  Bound types of stored scores.
+BOUND_EXACT = 0
+BOUND_LOWER = 1
+BOUND_UPPER = 2
+
+#  Default memory limit of a table, in megabytes.
+DEFAULT_SIZE_MB = 16
+
+#  Bytes used by one slot: key (8), depth (1), score (4), bound (1), move (4), and age (1).
+SLOT_BYTES = 19
+
+#  Move alignment codes used by 'encode_move'.
+_ALIGNMENT_CODES = {None: 1, "v": 2, "h": 3}
+_CODE_ALIGNMENTS = {1: None, 2: "v", 3: "h"}
+
+
+def encode_move(move):
+    """This function takes a move as a tuple (coord, alignment), with an alignment of None for pawn moves, and returns
+    it packed into a single positive integer. No move (None) is encoded as 0."""
+    if move is None:
+        return 0
+    coord, alignment = move
+    return (coord[0] * 1024 + coord[1]) * 4 + _ALIGNMENT_CODES[alignment]
+
+
+def decode_move(value):
+    """This function takes an integer from 'encode_move' and returns the move as a tuple (coord, alignment), or None
+    if the value is 0."""
+    if value == 0:
+        return None
+    alignment = _CODE_ALIGNMENTS[value % 4]
+    value //= 4
+    return (value // 1024, value % 1024), alignment
+
+
+class TranspositionTable:
+    """This class represents a fixed-size transposition table of search results, keyed by Zobrist hash."""
+    def __init__(self, size_mb=None):
+        """Initializes an empty table using at most 'size_mb' megabytes for its slots."""
+        if size_mb is None:
+            size_mb = DEFAULT_SIZE_MB
+        self._slot_count = max(1, int(size_mb * 1024 * 1024) // SLOT_BYTES)
+
+        self._keys = array("Q", bytes(8 * self._slot_count))
+        self._depths = array("b", bytes(self._slot_count))
+        self._scores = array("i", bytes(4 * self._slot_count))
+        self._bounds = array("B", bytes(self._slot_count))
+        self._moves = array("i", bytes(4 * self._slot_count))
+        self._ages = array("B", bytes(self._slot_count))
+
+        #  Ages start at 1, so a slot of age 0 has never been written.
+        self._age = 1
+
+        self._hits = 0
+        self._misses = 0
+        self._collisions = 0
+        self._stores = 0
+        self._replacements = 0
+
+    def get_slot_count(self):
+        """This method returns the number of positions the table can hold."""
+        return self._slot_count
+
+    def get_size_bytes(self):
+        """This method returns the number of bytes used by the table's slots."""
+        return self._slot_count * SLOT_BYTES
+
+    def new_search(self):
+        """This method starts a new search. Entries written during earlier searches may then be replaced regardless
+        of their depth."""
+        self._age += 1
+        if self._age > 255:
+            self._age = 1
+
+    def clear(self):
+        """This method empties the table and resets its counters."""
+        self._ages = array("B", bytes(self._slot_count))
+        self._age = 1
+        self._hits = 0
+        self._misses = 0
+        self._collisions = 0
+        self._stores = 0
+        self._replacements = 0
+
+    def probe(self, key):
+        """This method takes a Zobrist hash and returns the stored entry for that position as a tuple
+        (depth, score, bound, move), or None if the position is not in the table."""
+        slot = key % self._slot_count
+        if self._ages[slot] == 0:
+            self._misses += 1
+            return None
+        if self._keys[slot] != key:
+            self._collisions += 1
+            return None
+        self._hits += 1
+        return self._depths[slot], self._scores[slot], self._bounds[slot], decode_move(self._moves[slot])
+
+    def store(self, key, depth, score, bound, move):
+        """This method stores the result of searching the position with the given Zobrist hash to the given depth.
+        An entry for another position from the current search is only replaced by a search at least as deep."""
+        slot = key % self._slot_count
+        stored_age = self._ages[slot]
+        if stored_age != 0 and self._keys[slot] != key:
+            if stored_age == self._age and self._depths[slot] > depth:
+                return
+            self._replacements += 1
+
+        #  Keep the best move of an earlier search of the same position if this search did not find one
+        if move is None and stored_age != 0 and self._keys[slot] == key:
+            move_value = self._moves[slot]
+        else:
+            move_value = encode_move(move)
+
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._scores[slot] = score
+        self._bounds[slot] = bound
+        self._moves[slot] = move_value
+        self._ages[slot] = self._age
+        self._stores += 1
+
+    def get_stats(self):
+        """This method returns a dictionary of the table's counters: 'hits', 'misses' (empty slots), 'collisions'
+        (slots holding another position), 'stores', and 'replacements' (entries for another position overwritten)."""
+        return {"hits": self._hits, "misses": self._misses, "collisions": self._collisions, "stores": self._stores,
+                "replacements": self._replacements}
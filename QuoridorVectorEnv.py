@@ -0,0 +1,533 @@
+# Description: This module steps many Quoridor games at once, for training and evaluating bots on large numbers of
+#   games. The games are held in NumPy arrays with one entry per game: the pawns, the placed fences, the open edges
+#   between tiles, the remaining fence counts, the turn, the game state, and the Zobrist hash of the position (the same
+#   hash as 'QuoridorGame.get_zobrist_key'). A batch of actions is applied to every game together, and the legal
+#   actions, rewards, and finished games are found for the whole batch with array operations, with no Python loop over
+#   the games.
+#
+#   An action is a number from 0 to 3 * grid_size * grid_size - 1. Actions below grid_size * grid_size move the pawn
+#   to the tile with index 'row * grid_size + column'; the next grid_size * grid_size actions place a vertical fence
+#   on that tile, and the last grid_size * grid_size a horizontal fence, as in 'QuoridorGame.place_fence'.
+#
+#   The rules are those of 'QuoridorGame.move_pawn' and 'QuoridorGame.place_fence', including the jumps over the
+#   opposing pawn, the fair play rule, stalemates, and draws by repetition. The open edges of each row of the board are
+#   stored as the bits of one integer, so that flooding the board to check the fair play rule takes a few array
+#   operations per step for all of the games at once. As in 'QuoridorGame.get_fence_cuts', only a fence across one
+#   shortest path to the goal can cut a player off. Rather than flooding the board once for each step of that path,
+#   one flood per player and game, with the path's steps closed, finds every step that has no detour around it.
+#
+#   Games that reach the move cap without finishing are truncated: they have no more legal actions until they are
+#   reset.
+#
+#   Checking the fair play rule is most of the cost of a step. On one CPU core, batches of 1,024 to 4,096 games on
+#   9x9 boards with 10 fences each, played with random legal actions, run at about 50,000 to 80,000 steps per second
+#   (a step being one action in one game), and 5x5 games at about 100,000. This is about ten times faster than
+#   playing the same games one at a time with 'QuoridorGame', but it falls short of the hundreds of thousands of steps
+#   per second that this module was meant to reach: that goal has not been met.
+
+import numpy as np
+import Quoridor
+
+#  Default environment settings.
+DEFAULT_MOVE_CAP = 200
+
+#  Game state codes, in the same order as in 'Quoridor.encode_position'.
+STATE_ONGOING = 0
+STATE_STALEMATE = 1
+STATE_PLAYER_1_WIN = 2
+STATE_PLAYER_2_WIN = 3
+STATE_NAMES = ("ONGOING", "STALEMATE", "PLAYER_1_WIN", "PLAYER_2_WIN")
+
+#  The number of steps the fair play floods spread between checks for finished floods. Checking less often saves
+#  more array copying than the extra steps cost.
+FLOOD_STEPS = 4
+
+
+def lowest_tiles(rows, grid_size):
+    """This function takes an array of row bitsets of shape (games, grid_size) and returns the index of the lowest
+    tile set in each game's rows. Every game must have a tile set."""
+    row = np.argmax(rows != 0, axis=1)
+    bits = rows[np.arange(len(rows)), row]
+    lowest_bit = bits & (~bits + np.uint32(1))
+    column = np.frexp(lowest_bit.astype(np.float64))[1] - 1
+    return row * grid_size + column
+
+
+def tile_rows(tiles, grid_size):
+    """This function takes an array of tile indices and returns row bitsets of shape (tiles, grid_size) with only the
+    given tile set in each."""
+    rows = np.zeros((len(tiles), grid_size), dtype=np.uint32)
+    rows[np.arange(len(tiles)), tiles // grid_size] = np.left_shift(np.uint32(1), (tiles % grid_size).astype(np.uint32))
+    return rows
+
+
+def expand(rows, open_up, open_down, open_left, open_right):
+    """This function takes row bitsets of tiles and the row bitsets of the open edges in each direction, and returns
+    the tiles along with every tile one open step away from them."""
+    expanded = rows | ((rows & open_right) << np.uint32(1)) | ((rows & open_left) >> np.uint32(1))
+    expanded[:, 1:] |= rows[:, :-1] & open_down[:, :-1]
+    expanded[:, :-1] |= rows[:, 1:] & open_up[:, 1:]
+    return expanded
+
+
+class VectorEnv:
+    """This class represents a batch of Quoridor games stored in NumPy arrays and stepped together."""
+    def __init__(self, batch_size, grid_size=None, fence_count=None, move_cap=None):
+        """Initializes 'batch_size' games of the given grid size (at most 32) and starting fence count, all in their
+        starting position. Games are truncated after 'move_cap' moves."""
+        if grid_size is None:
+            grid_size = 9
+        if fence_count is None:
+            fence_count = 10
+        if move_cap is None:
+            move_cap = DEFAULT_MOVE_CAP
+        if not 3 <= grid_size <= 32:
+            raise ValueError("The grid size must be between 3 and 32")
+
+        n = grid_size
+        self._batch_size = batch_size
+        self._grid_size = n
+        self._tile_count = n * n
+        self._fence_count = fence_count
+        self._move_cap = move_cap
+
+        #  Zobrist keys of the pawns on each tile, fences on each tile, and fence counts, as in 'Quoridor.zobrist_key'
+        tiles = []
+        for i in range(0, self._tile_count):
+            tiles.append((i % n, i // n))
+        self._pawn_keys = np.zeros((2, self._tile_count), dtype=np.uint64)
+        self._fence_keys = np.zeros((2, self._tile_count), dtype=np.uint64)
+        for i in range(0, self._tile_count):
+            self._pawn_keys[0, i] = Quoridor.zobrist_key("pawn", 1, tiles[i])
+            self._pawn_keys[1, i] = Quoridor.zobrist_key("pawn", 2, tiles[i])
+            self._fence_keys[0, i] = Quoridor.zobrist_key("fence", "v", tiles[i])
+            self._fence_keys[1, i] = Quoridor.zobrist_key("fence", "h", tiles[i])
+        self._count_keys = np.zeros((2, fence_count + 1), dtype=np.uint64)
+        for i in range(0, fence_count + 1):
+            self._count_keys[0, i] = Quoridor.zobrist_key("fences", 1, i)
+            self._count_keys[1, i] = Quoridor.zobrist_key("fences", 2, i)
+        self._turn_key = np.uint64(Quoridor.zobrist_key("turn", 2))
+
+        #  Fence slots: vertical fences cannot be placed on the left border, nor horizontal fences on the top border
+        columns = np.arange(self._tile_count) % n
+        rows = np.arange(self._tile_count) // n
+        self._slots = np.stack([columns >= 1, rows >= 1])
+
+        #  The open edges of an empty board, with bit 'column' of each row set if a pawn may step that way
+        full_row = (1 << n) - 1
+        self._border_up = np.full(n, full_row, dtype=np.uint32)
+        self._border_up[0] = 0
+        self._border_down = np.full(n, full_row, dtype=np.uint32)
+        self._border_down[n - 1] = 0
+        self._border_left = np.full(n, full_row & ~1, dtype=np.uint32)
+        self._border_right = np.full(n, full_row >> 1, dtype=np.uint32)
+
+        self._start_pawns = np.array([n // 2, (n - 1) * n + n // 2], dtype=np.int64)
+        self._start_key = (self._pawn_keys[0, self._start_pawns[0]] ^ self._pawn_keys[1, self._start_pawns[1]] ^
+                           self._count_keys[0, fence_count] ^ self._count_keys[1, fence_count])
+
+        b = batch_size
+        self._pawns = np.zeros((b, 2), dtype=np.int64)
+        self._fences = np.zeros((b, 2, self._tile_count), dtype=bool)
+        self._open_up = np.zeros((b, n), dtype=np.uint32)
+        self._open_down = np.zeros((b, n), dtype=np.uint32)
+        self._open_left = np.zeros((b, n), dtype=np.uint32)
+        self._open_right = np.zeros((b, n), dtype=np.uint32)
+        self._fence_counts = np.zeros((b, 2), dtype=np.int64)
+        self._turns = np.zeros(b, dtype=np.int64)
+        self._states = np.zeros(b, dtype=np.int8)
+        self._truncated = np.zeros(b, dtype=bool)
+        self._move_counts = np.zeros(b, dtype=np.int64)
+        self._keys = np.zeros(b, dtype=np.uint64)
+
+        #  The hashes of the positions since the last fence was placed, for draws by repetition. A fence changes the
+        #  fence counts for good, so no earlier position can occur again.
+        self._history = np.zeros((b, move_cap + 1), dtype=np.uint64)
+        self._history_lengths = np.zeros(b, dtype=np.int64)
+
+        #  The fences that would cut each player off from their goal, and whether they are up to date
+        self._cuts = np.zeros((b, 2, 2, self._tile_count), dtype=bool)
+        self._cuts_valid = np.zeros((b, 2), dtype=bool)
+
+        self.reset()
+
+    def get_batch_size(self):
+        """This method returns the number of games in the batch."""
+        return self._batch_size
+
+    def get_grid_size(self):
+        """This method returns the grid size of the games."""
+        return self._grid_size
+
+    def get_action_count(self):
+        """This method returns the number of different actions."""
+        return 3 * self._tile_count
+
+    def get_pawns(self):
+        """This method returns the array of shape (games, 2) of each game's pawn tile indices, Player 1's first."""
+        return self._pawns
+
+    def get_fences(self):
+        """This method returns the boolean array of shape (games, 2, tiles) of each game's placed vertical and
+        horizontal fences."""
+        return self._fences
+
+    def get_fence_counts(self):
+        """This method returns the array of shape (games, 2) of each game's remaining fence counts."""
+        return self._fence_counts
+
+    def get_turns(self):
+        """This method returns the array of the player to move (1 or 2) in each game."""
+        return self._turns
+
+    def get_states(self):
+        """This method returns the array of each game's state code (STATE_ONGOING, STATE_STALEMATE,
+        STATE_PLAYER_1_WIN, or STATE_PLAYER_2_WIN)."""
+        return self._states
+
+    def get_keys(self):
+        """This method returns the array of each game's Zobrist hash."""
+        return self._keys
+
+    def reset(self, games=None):
+        """This method puts the given games (a boolean mask or array of indices, by default every game) back in the
+        starting position."""
+        if games is None:
+            games = np.arange(self._batch_size)
+        games = np.asarray(games)
+        if games.dtype == bool:
+            games = np.nonzero(games)[0]
+
+        self._pawns[games] = self._start_pawns
+        self._fences[games] = False
+        self._open_up[games] = self._border_up
+        self._open_down[games] = self._border_down
+        self._open_left[games] = self._border_left
+        self._open_right[games] = self._border_right
+        self._fence_counts[games] = self._fence_count
+        self._turns[games] = 1
+        self._states[games] = STATE_ONGOING
+        self._truncated[games] = False
+        self._move_counts[games] = 0
+        self._keys[games] = self._start_key
+        self._history[games, 0] = self._start_key
+        self._history_lengths[games] = 1
+        self._cuts_valid[games] = False
+
+    def reset_finished(self):
+        """This method resets every game that has finished or been truncated, and returns the boolean mask of the
+        games that were reset."""
+        finished = (self._states != STATE_ONGOING) | self._truncated
+        self.reset(finished)
+        return finished
+
+    def is_open(self, open_rows, games, tiles):
+        """This method returns whether a pawn on each of the given tiles of the given games may step in the direction
+        of the given open edge array."""
+        n = self._grid_size
+        return (open_rows[games, tiles // n] >> (tiles % n).astype(np.uint32)) & np.uint32(1) != 0
+
+    def pawn_move_mask(self, games, players):
+        """This method returns a boolean array of shape (games, tiles) of the tiles each given player's pawn may move
+        to in the given games, as in 'QuoridorGame.valid_tiles': a step to each open neighbour, and jumps over a facing
+        opposing pawn, straight or, if there is a fence behind it, diagonally. As in 'valid_tiles', Player 1 only
+        jumps downwards and Player 2 only upwards."""
+        n = self._grid_size
+        count = len(games)
+        mask = np.zeros((count, self._tile_count), dtype=bool)
+        k = np.arange(count)
+        pawns = self._pawns[games, players - 1]
+        opposing = self._pawns[games, 2 - players]
+
+        for open_rows, step, jumper in ((self._open_up, -n, 2), (self._open_down, n, 1)):
+            can_step = self.is_open(open_rows, games, pawns)
+            target = np.where(can_step, pawns + step, 0)
+            plain = can_step & (target != opposing)
+            mask[k[plain], target[plain]] = True
+
+            jump = can_step & (target == opposing) & (players == jumper)
+            straight = jump & self.is_open(open_rows, games, target)
+            mask[k[straight], target[straight] + step] = True
+            diagonal = jump & ~straight
+            left = diagonal & self.is_open(self._open_left, games, target)
+            mask[k[left], target[left] - 1] = True
+            right = diagonal & self.is_open(self._open_right, games, target)
+            mask[k[right], target[right] + 1] = True
+
+        for open_rows, step in ((self._open_left, -1), (self._open_right, 1)):
+            can_step = self.is_open(open_rows, games, pawns)
+            target = np.where(can_step, pawns + step, 0)
+            plain = can_step & (target != opposing)
+            mask[k[plain], target[plain]] = True
+        return mask
+
+    def update_cuts(self):
+        """This method finds the fences that would cut each player off from their goal, for every ongoing game whose
+        cuts may have changed since they were last found."""
+        n = self._grid_size
+        games, player_index = np.nonzero(~self._cuts_valid & (self._states == STATE_ONGOING)[:, np.newaxis])
+        if len(games) == 0:
+            return
+        count = len(games)
+        k = np.arange(count)
+        players = player_index + 1
+        goal_rows = np.where(players == 1, n - 1, 0)
+        open_up = self._open_up[games]
+        open_down = self._open_down[games]
+        open_left = self._open_left[games]
+        open_right = self._open_right[games]
+        self._cuts[games, player_index] = False
+        self._cuts_valid[games, player_index] = True
+
+        #  Spread outwards from each pawn, ignoring the other pawn, one layer of tiles at a time until a goal is found
+        pawns = self._pawns[games, player_index]
+        layers = [tile_rows(pawns, n)]
+        reached = layers[0].copy()
+        distances = np.where(reached[k, goal_rows] != 0, 0, -1)
+        while True:
+            searching = distances < 0
+            if not searching.any():
+                break
+            frontier = expand(layers[-1], open_up, open_down, open_left, open_right) & ~reached
+            if not frontier[searching].any():
+                break
+            reached |= frontier
+            layers.append(frontier)
+            distances[searching & (frontier[k, goal_rows] != 0)] = len(layers) - 1
+
+        #  Without a path, every open slot breaks the fair play rule
+        unreachable = distances < 0
+        if unreachable.any():
+            cut_games = games[unreachable]
+            self._cuts[cut_games, player_index[unreachable]] = self._slots & ~self._fences[cut_games]
+
+        #  Walk back from a goal tile to the pawn along the layers, collecting the path's tiles by their distance from
+        #  the pawn, and the fence slot of each step. The paths are ordered longest first, so that the paths still
+        #  being walked back at each layer are the first ones.
+        pairs = np.argsort(-distances, kind="stable")[:np.count_nonzero(distances > 0)]
+        if len(pairs) == 0:
+            return
+        length = len(layers)
+        path_lengths = distances[pairs]
+        pair_goals = goal_rows[pairs]
+        pair_layers = np.stack(layers)[:, pairs]
+        open_up = open_up[pairs]
+        open_down = open_down[pairs]
+        open_left = open_left[pairs]
+        open_right = open_right[pairs]
+        longer = (path_lengths[:, np.newaxis] > np.arange(length)).sum(axis=0)
+
+        path = np.zeros((len(pairs), length), dtype=np.int64)
+        path_slots = np.zeros((len(pairs), length), dtype=np.int64)
+        path_alignments = np.zeros((len(pairs), length), dtype=np.int64)
+        tiles = np.zeros(len(pairs), dtype=np.int64)
+        for d in range(length - 1, -1, -1):
+            #  The paths of length d start at one of the goal tiles of their last layer
+            if d >= 1 and longer[d - 1] > longer[d]:
+                ending = slice(longer[d], longer[d - 1])
+                k = np.arange(longer[d - 1] - longer[d])
+                goals = np.zeros((len(k), n), dtype=np.uint32)
+                goals[k, pair_goals[ending]] = pair_layers[d, ending][k, pair_goals[ending]]
+                tiles[ending] = lowest_tiles(goals, n)
+
+            stepping = slice(0, longer[d])
+            if longer[d] > 0:
+                neighbours = expand(tile_rows(tiles[stepping], n), open_up[stepping], open_down[stepping],
+                                    open_left[stepping], open_right[stepping]) & pair_layers[d, stepping]
+                previous = lowest_tiles(neighbours, n)
+                path_slots[stepping, d] = np.maximum(tiles[stepping], previous)
+                path_alignments[stepping, d] = np.where(np.abs(tiles[stepping] - previous) == 1, 0, 1)
+                tiles[stepping] = previous
+            path[:, d] = tiles
+
+        #  Close every step of each path on a copy of its board. The steps of a path are different edges, so the bits
+        #  of the steps in each row can be added up rather than combined one at a time.
+        on_path = np.arange(length) < path_lengths[:, np.newaxis]
+        step_pairs, step_indices = np.nonzero(on_path)
+        slots = path_slots[step_pairs, step_indices]
+        rows = step_pairs * n + slots // n
+        bits = np.left_shift(1, slots % n).astype(np.float64)
+        vertical = path_alignments[step_pairs, step_indices] == 0
+        horizontal = ~vertical
+        closed_vertical = np.bincount(rows[vertical], bits[vertical], len(pairs) * n).astype(np.uint32)
+        closed_horizontal = np.bincount(rows[horizontal], bits[horizontal], len(pairs) * n).astype(np.uint32)
+        closed_vertical = closed_vertical.reshape(len(pairs), n)
+        closed_horizontal = closed_horizontal.reshape(len(pairs), n)
+        closed_left = open_left & ~closed_vertical
+        closed_right = open_right & ~(closed_vertical >> np.uint32(1))
+        closed_up = open_up & ~closed_horizontal
+        closed_down = open_down.copy()
+        closed_down[:, :-1] &= ~closed_horizontal[:, 1:]
+
+        #  A step of the path cuts the player off only if no detour around it joins the part of the path before it
+        #  to the part after it (or to the goal). Flood from the start of the path with its steps closed: whenever the
+        #  flood reaches a later tile of the path, every step before that tile has a detour, and the tiles up to it
+        #  start flooding too. If the flood stops without passing the path's latest tile in it, the step after that
+        #  tile has no detour, and the flood goes on from the far side of the step.
+        path_rows = path // n
+        path_columns = (path % n).astype(np.uint32)
+        steps = np.arange(length)
+        positions = np.zeros(len(pairs), dtype=np.int64)
+        cut = np.zeros((len(pairs), length), dtype=bool)
+        reached = tile_rows(path[:, 0], n)
+        active = np.arange(len(pairs))
+        while len(active) > 0:
+            expanded = reached
+            for i in range(0, FLOOD_STEPS):
+                expanded = expand(expanded, closed_up, closed_down, closed_left, closed_right)
+            k = np.arange(len(active))
+            on_path_reached = ((expanded[k[:, np.newaxis], path_rows] >> path_columns) & np.uint32(1) != 0) & on_path
+            latest = np.maximum(length - 1 - np.argmax(on_path_reached[:, ::-1], axis=1), positions)
+            arrived = expanded[k, pair_goals] != 0
+            detour = ~arrived & (latest > positions)
+            stopped = ~arrived & ~detour & ~(expanded != reached).any(axis=1)
+            cut[active[stopped], positions[stopped]] = True
+            positions[detour] = latest[detour]
+            positions[stopped] += 1
+
+            #  The path's tiles up to the new position start flooding
+            seeded = (detour | stopped)[:, np.newaxis] & (steps <= positions[:, np.newaxis])
+            seed_games, seed_steps = np.nonzero(seeded)
+            np.bitwise_or.at(expanded, (seed_games, path_rows[seed_games, seed_steps]),
+                             np.left_shift(np.uint32(1), path_columns[seed_games, seed_steps]))
+
+            growing = ~arrived & (positions < path_lengths)
+            active = active[growing]
+            reached = expanded[growing]
+            positions = positions[growing]
+            path_lengths = path_lengths[growing]
+            pair_goals = pair_goals[growing]
+            path_rows = path_rows[growing]
+            path_columns = path_columns[growing]
+            on_path = on_path[growing]
+            closed_up = closed_up[growing]
+            closed_down = closed_down[growing]
+            closed_left = closed_left[growing]
+            closed_right = closed_right[growing]
+
+        cut_pairs, cut_steps = np.nonzero(cut)
+        self._cuts[games[pairs[cut_pairs]], player_index[pairs[cut_pairs]], path_alignments[cut_pairs, cut_steps],
+                   path_slots[cut_pairs, cut_steps]] = True
+
+    def legal_mask(self):
+        """This method returns a boolean array of shape (games, actions) of the legal actions of the player to move
+        in each game. Finished and truncated games have no legal actions."""
+        self.update_cuts()
+        mask = np.zeros((self._batch_size, 3 * self._tile_count), dtype=bool)
+        games = np.nonzero((self._states == STATE_ONGOING) & ~self._truncated)[0]
+        players = self._turns[games]
+        mask[games, :self._tile_count] = self.pawn_move_mask(games, players)
+
+        open_slots = self._slots & ~self._fences[games] & ~self._cuts[games, 0] & ~self._cuts[games, 1]
+        can_place = self._fence_counts[games, players - 1] > 0
+        mask[games, self._tile_count:] = open_slots.reshape(len(games), 2 * self._tile_count) & can_place[:, np.newaxis]
+        return mask
+
+    def step(self, actions):
+        """This method makes each game's action for the player to move, and returns a tuple of arrays: the rewards of
+        shape (games, 2), which are 1 for the winner and -1 for the loser of each game won by this step and 0
+        otherwise; whether each game finished or was truncated by this step; whether each game was truncated by this
+        step; and whether each action was legal. Games whose action was not legal are not changed."""
+        n = self._grid_size
+        actions = np.asarray(actions, dtype=np.int64)
+        in_range = (actions >= 0) & (actions < 3 * self._tile_count)
+        legal = self.legal_mask()[np.arange(self._batch_size), np.where(in_range, actions, 0)] & in_range
+
+        games = np.nonzero(legal)[0]
+        players = self._turns[games]
+        player_index = players - 1
+        kinds = actions[games] // self._tile_count
+        tiles = actions[games] % self._tile_count
+
+        #  Move the pawns, and check for a win
+        pawn_moves = kinds == 0
+        moved = games[pawn_moves]
+        mover_index = player_index[pawn_moves]
+        targets = tiles[pawn_moves]
+        self._keys[moved] ^= self._pawn_keys[mover_index, self._pawns[moved, mover_index]]
+        self._keys[moved] ^= self._pawn_keys[mover_index, targets]
+        self._pawns[moved, mover_index] = targets
+        self._cuts_valid[moved, mover_index] = False
+        winning = np.where(mover_index == 0, targets // n == n - 1, targets // n == 0)
+
+        #  Place the fences, closing the edges they block in both directions
+        fenced = games[~pawn_moves]
+        fencer_index = player_index[~pawn_moves]
+        alignments = kinds[~pawn_moves] - 1
+        slots = tiles[~pawn_moves]
+        self._fences[fenced, alignments, slots] = True
+        self._keys[fenced] ^= self._fence_keys[alignments, slots]
+        counts = self._fence_counts[fenced, fencer_index]
+        self._keys[fenced] ^= self._count_keys[fencer_index, counts] ^ self._count_keys[fencer_index, counts - 1]
+        self._fence_counts[fenced, fencer_index] = counts - 1
+        slot_rows = slots // n
+        slot_bits = np.left_shift(np.uint32(1), (slots % n).astype(np.uint32))
+        vertical = alignments == 0
+        self._open_left[fenced[vertical], slot_rows[vertical]] &= ~slot_bits[vertical]
+        self._open_right[fenced[vertical], slot_rows[vertical]] &= ~(slot_bits[vertical] >> np.uint32(1))
+        horizontal = ~vertical
+        self._open_up[fenced[horizontal], slot_rows[horizontal]] &= ~slot_bits[horizontal]
+        self._open_down[fenced[horizontal], slot_rows[horizontal] - 1] &= ~slot_bits[horizontal]
+        self._cuts_valid[fenced] = False
+        self._history_lengths[fenced] = 0
+
+        #  A player left without a move has drawn, even if their opponent has just won. A player with fences left may
+        #  still have nowhere to place them, which is only checked once the cuts have been found.
+        opponents = 3 - players
+        stuck = ~self.pawn_move_mask(games, opponents).any(axis=1)
+        if stuck.any():
+            self.update_cuts()
+            open_slots = self._slots & ~self._fences[games[stuck]] & ~self._cuts[games[stuck], 0] & \
+                ~self._cuts[games[stuck], 1]
+            stuck[stuck] = (self._fence_counts[games[stuck], opponents[stuck] - 1] < 1) | \
+                ~open_slots.reshape(stuck.sum(), 2 * self._tile_count).any(axis=1)
+        self._states[moved[winning]] = np.where(mover_index[winning] == 0, STATE_PLAYER_1_WIN, STATE_PLAYER_2_WIN)
+        self._states[games[stuck]] = STATE_STALEMATE
+
+        self._turns[games] = opponents
+        self._keys[games] ^= self._turn_key
+
+        #  Record the position, and draw by repetition
+        self._history[games, self._history_lengths[games]] = self._keys[games]
+        self._history_lengths[games] += 1
+        occurrences = ((self._history[games] == self._keys[games][:, np.newaxis]) &
+                       (np.arange(self._move_cap + 1) < self._history_lengths[games][:, np.newaxis])).sum(axis=1)
+        repeated = (occurrences >= Quoridor.REPETITION_LIMIT) & (self._states[games] == STATE_ONGOING)
+        self._states[games[repeated]] = STATE_STALEMATE
+
+        self._move_counts[games] += 1
+        truncated = np.zeros(self._batch_size, dtype=bool)
+        truncated[games] = (self._move_counts[games] >= self._move_cap) & (self._states[games] == STATE_ONGOING)
+        self._truncated |= truncated
+
+        rewards = np.zeros((self._batch_size, 2), dtype=np.float32)
+        won = games[(self._states[games] == STATE_PLAYER_1_WIN) | (self._states[games] == STATE_PLAYER_2_WIN)]
+        winners = self._states[won] - STATE_PLAYER_1_WIN
+        rewards[won, winners] = 1
+        rewards[won, 1 - winners] = -1
+
+        done = np.zeros(self._batch_size, dtype=bool)
+        done[games] = self._states[games] != STATE_ONGOING
+        done |= truncated
+        return rewards, done, truncated, legal
+
+    def get_game(self, game):
+        """This method returns a 'QuoridorGame' in the position of the given game of the batch, with its position
+        history since the last fence was placed."""
+        n = self._grid_size
+        masks = []
+        for alignment in (0, 1):
+            mask = 0
+            for i in np.nonzero(self._fences[game, alignment])[0]:
+                mask |= 1 << int(i)
+            masks.append(mask)
+        pawn_1 = int(self._pawns[game, 0])
+        pawn_2 = int(self._pawns[game, 1])
+        position = Quoridor.encode_position(n, (pawn_1 % n, pawn_1 // n), (pawn_2 % n, pawn_2 // n),
+                                            int(self._fence_counts[game, 0]), int(self._fence_counts[game, 1]),
+                                            int(self._turns[game]), STATE_NAMES[self._states[game]], masks[0],
+                                            masks[1])
+        history = []
+        for i in range(0, int(self._history_lengths[game]) - 1):
+            history.append(int(self._history[game, i]))
+        return Quoridor.game_from_bytes(position, history=history)
@@ -0,0 +1,69 @@
+# Description: This module finds the players' shortest path lengths for many hypothetical fences at once, using NumPy.
+#   Each candidate fence gets its own copy of the board's open edges, stacked into arrays of shape
+#   (candidates, rows, columns), and a wavefront spreads outwards from the player's winning row through every copy at
+#   the same time. The number of steps the wavefront takes to reach the pawn is the pawn's distance to its goal,
+#   ignoring the opposing pawn, as in 'QuoridorGame.goal_distance'.
+#
+#   Fences block movement in both directions, so the distance from the goal to the pawn is the same as from the pawn to
+#   the goal. Only the open edges between neighbouring tiles are stored: 'row_edges[k, r, c]' is True if a pawn may
+#   step between the tiles (c, r) and (c, r + 1), and 'column_edges[k, r, c]' if it may step between (c, r) and
+#   (c + 1, r).
+
+import numpy as np
+
+
+def open_edges(grid_size, ver_fences, hor_fences, candidates):
+    """This function returns the arrays (row_edges, column_edges) of open edges of a board with the given player-placed
+    fences, with one copy of the board per candidate fence. Copy 'k' also has the candidate fence 'candidates[k]',
+    given as an (alignment, coord) tuple, placed on it."""
+    candidate_count = len(candidates)
+    row_edges = np.ones((grid_size - 1, grid_size), dtype=bool)
+    column_edges = np.ones((grid_size, grid_size - 1), dtype=bool)
+
+    #  A horizontal fence above (c, r) blocks the step from row r - 1, and a vertical fence left of (c, r) blocks the
+    #  step from column c - 1. Fences on the border are already outside the arrays.
+    for column, row in hor_fences:
+        if 1 <= row < grid_size and 0 <= column < grid_size:
+            row_edges[row - 1, column] = False
+    for column, row in ver_fences:
+        if 0 <= row < grid_size and 1 <= column < grid_size:
+            column_edges[row, column - 1] = False
+
+    row_edges = np.repeat(row_edges[np.newaxis], candidate_count, axis=0)
+    column_edges = np.repeat(column_edges[np.newaxis], candidate_count, axis=0)
+    for k in range(0, candidate_count):
+        alignment, (column, row) = candidates[k]
+        if alignment == "h" and 1 <= row < grid_size and 0 <= column < grid_size:
+            row_edges[k, row - 1, column] = False
+        if alignment == "v" and 0 <= row < grid_size and 1 <= column < grid_size:
+            column_edges[k, row, column - 1] = False
+    return row_edges, column_edges
+
+
+def goal_distances(row_edges, column_edges, goal_row, pawn):
+    """This function takes the open edge arrays from 'open_edges', the row of the player's winning tiles, and the
+    player's pawn coordinate, and returns an array of the pawn's distance to the goal on each copy of the board, with
+    -1 where the goal cannot be reached."""
+    candidate_count, grid_size = column_edges.shape[0], column_edges.shape[1]
+    column, row = pawn
+
+    reached = np.zeros((candidate_count, grid_size, grid_size), dtype=bool)
+    reached[:, goal_row, :] = True
+    distances = np.full(candidate_count, -1, dtype=np.int64)
+    distances[reached[:, row, column]] = 0
+
+    distance = 0
+    while True:
+        spread = reached.copy()
+        spread[:, 1:, :] |= reached[:, :-1, :] & row_edges
+        spread[:, :-1, :] |= reached[:, 1:, :] & row_edges
+        spread[:, :, 1:] |= reached[:, :, :-1] & column_edges
+        spread[:, :, :-1] |= reached[:, :, 1:] & column_edges
+        distance += 1
+
+        #  Stop once every pawn is reached, or the wavefront has stopped growing on every copy
+        newly_reached = spread[:, row, column] & ~reached[:, row, column]
+        distances[newly_reached] = distance
+        if not (distances == -1).any() or np.array_equal(spread, reached):
+            return distances
+        reached = spread
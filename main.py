@@ -1,13 +1,18 @@
 import math
+import os
+import time
 import pygame as pg
 import Quoridor
 import QuoridorBot
-pg.init()
 
 #  Game information
 GRID_SIZE = 9
 FENCE_COUNT = 10
 
+#  Bot information
+BOT_THINK_TIME = 1300  # The least time a bot's move takes, in milliseconds, so that it can be followed on screen
+BOT_BOOK_PATH = "opening_book.bin"  # The bot's opening book (see 'QuoridorBook'), used if the file exists
+
 #  Graphics information
 TILE_SIZE = 60
 TILE_COLOR_1 = (255, 205, 125)
@@ -55,10 +60,8 @@ MENU_PLAY_VS_BOT = "PLAY VERSUS BOT"  # Starts a game against an AI opponent
 #  Game Mode Options
 MENU_MODE_STANDARD = "STANDARD"
 
-#  Initialize display
-pg.display.set_caption("Quoridor")
-WIN = pg.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
-WIN.fill((0, 0, 0))
+#  The display window, which is opened when the game is run
+WIN = None
 
 #  Initialize game
 q = Quoridor.QuoridorGame(GRID_SIZE, FENCE_COUNT)
@@ -361,9 +364,8 @@ class GameDisplay:
                 ali = "h"
             else:
                 ali = "v"
-            opp = q.get_opposing_num(player_num)
             rect_coord = self.get_coord_from_fence_rect(rect)
-            fair_play = q.fair_play_checker(opp, ali, rect_coord) and q.fair_play_checker(player_num, ali, rect_coord)
+            fair_play = q.is_legal_fence(ali, rect_coord)
 
         if rect.width != rect.height and q.get_remaining_fences(player_num) < 1:
             draw_highlight_rect = False
@@ -376,14 +378,14 @@ class GameDisplay:
 
     def active_turn(self, player_num):
         valid_rects = []
-        for i in q.valid_tiles(player_num, q.get_player_pawn(player_num)):
-            valid_rects.append(self.get_rect_from_coord(i))
-
         fences = self.get_fences()
-        for i in fences["vertical"]:
-            valid_rects.append(fences["vertical"][i])
-        for i in fences["horizontal"]:
-            valid_rects.append(fences["horizontal"][i])
+        for coord, alignment in q.legal_moves(player_num):
+            if alignment is None:
+                valid_rects.append(self.get_rect_from_coord(coord))
+            elif alignment == "v":
+                valid_rects.append(fences["vertical"][coord])
+            elif alignment == "h":
+                valid_rects.append(fences["horizontal"][coord])
 
         gd.draw_entire_screen()
 
@@ -406,7 +408,22 @@ class GameDisplay:
                 gd.draw_entire_screen()
 
 
+def make_bot_move(bot, player_num):
+    """Makes the bot's move for the given player, waiting until at least 'BOT_THINK_TIME' has passed."""
+    start = time.perf_counter()
+    bot.make_move(player_num)
+    elapsed = int((time.perf_counter() - start) * 1000)
+    if elapsed < BOT_THINK_TIME:
+        pg.time.delay(BOT_THINK_TIME - elapsed)
+
+
 if __name__ == '__main__':
+    #  Initialize display
+    pg.init()
+    pg.display.set_caption("Quoridor")
+    WIN = pg.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+    WIN.fill((0, 0, 0))
+
     menu = MenuDisplay()
     start_game = False
     init_game = False
@@ -471,7 +488,10 @@ if __name__ == '__main__':
                     elif bot_player_2:
                         bot_player_num = 2
                     if not bot_none:
-                        bot = QuoridorBot.Bot(q, bot_player_num)
+                        book = None
+                        if os.path.exists(BOT_BOOK_PATH):
+                            book = BOT_BOOK_PATH
+                        bot = QuoridorBot.Bot(q, bot_player_num, book=book)
                     gd.draw_entire_screen()
                     pg.display.update()
                     bot_screen_draw = True
@@ -479,13 +499,13 @@ if __name__ == '__main__':
                     if not bot_player_1:
                         gd.active_turn(1)
                     else:
-                        bot.make_move_v2(1)
+                        make_bot_move(bot, 1)
                         gd.draw_entire_screen()
                 elif q.get_turn() == 2:
                     if not bot_player_2:
                         gd.active_turn(2)
                     else:
-                        bot.make_move_v2(2)
+                        make_bot_move(bot, 2)
                         gd.draw_entire_screen()
             else:
                 gd.draw_entire_screen()
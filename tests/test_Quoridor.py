@@ -0,0 +1,274 @@
+# Description: These tests check the rules of 'QuoridorGame' on seeded random games, against the slower checks and
+#   recomputations they are built to match.
+
+import random
+import unittest
+import Quoridor
+
+#  A game on a 3x3 board in which Player 1, with fences left, has no pawn move and no legal fence after the last move.
+BOXED_IN_MOVES = [((0, 2), "h"), ((2, 1), "h"), ((0, 1), "h"), ((1, 0), "v"), ((2, 2), "v"), ((1, 2), "v"),
+                  ((1, 1), None), ((2, 2), "h"), ((2, 1), None), ((1, 1), None), ((1, 1), "v"), ((2, 0), "v")]
+
+
+def random_move(q, rng):
+    """This function returns a random legal move of the player to move, as a (coord, alignment) tuple. Fences are
+    preferred, so that the board fills up."""
+    legal = list(q.legal_moves(q.get_turn()))
+    fences = [move for move in legal if move[1] is not None]
+    if len(fences) > 0 and rng.random() < 0.7:
+        return rng.choice(fences)
+    return rng.choice(legal)
+
+
+def random_game(grid_size, fence_count, rng):
+    """This function returns a game of the given size played with random legal moves until it ends, along with the
+    list of its moves as (coord, alignment) tuples."""
+    q = Quoridor.QuoridorGame(grid_size, fence_count)
+    moves = []
+    while q.get_game_state() == "ONGOING":
+        move = random_move(q, rng)
+        moves.append(move)
+        q.push_move(q.get_turn(), move[0], move[1])
+    return q, moves
+
+
+class StalemateTest(unittest.TestCase):
+    """This class tests that the player to move in an ongoing game always has a legal move."""
+    def test_no_legal_move_is_stalemate(self):
+        """A player with fences left but no pawn move and nowhere to place a fence has drawn by stalemate."""
+        q = Quoridor.QuoridorGame(3, 10)
+        for coord, alignment in BOXED_IN_MOVES:
+            self.assertEqual(q.get_game_state(), "ONGOING")
+            q.push_move(q.get_turn(), coord, alignment)
+
+        self.assertEqual(q.get_turn(), 1)
+        self.assertGreater(q.get_remaining_fences(1), 0)
+        self.assertEqual(q.valid_tiles(1, q.get_player_pawn(1)), [])
+        self.assertEqual(q.get_legal_fence_mask("v") | q.get_legal_fence_mask("h"), 0)
+        self.assertEqual(q.get_game_state(), "STALEMATE")
+
+    def test_ongoing_games_have_legal_moves(self):
+        """In seeded random games on small boards, the player to move always has a legal move while the game is
+        ongoing."""
+        rng = random.Random(0)
+        for grid_size in (3, 4, 5):
+            for i in range(0, 300):
+                q, moves = random_game(grid_size, 10, rng)
+                self.assertNotEqual(q.get_game_state(), "ONGOING")
+
+
+class LegalFenceTest(unittest.TestCase):
+    """This class tests the incrementally maintained legal fence masks against checking every slot with
+    'fair_play_checker'."""
+    def test_masks_match_fair_play_checker(self):
+        """In seeded random games on boards of several sizes, after every move each fence slot is in the legal fence
+        mask exactly when it is on the board, empty, and leaves both players a path to their goal."""
+        rng = random.Random(1)
+        for grid_size in (3, 5, 7, 9):
+            for i in range(0, 10):
+                q = Quoridor.QuoridorGame(grid_size, grid_size + 1)
+                while q.get_game_state() == "ONGOING":
+                    for alignment, placed in (("v", q.get_player_vertical_fences()),
+                                              ("h", q.get_player_horizontal_fences())):
+                        expected = 0
+                        for column in range(0, grid_size):
+                            for row in range(0, grid_size):
+                                coord = (column, row)
+                                if q.is_fence_slot(alignment, coord) and coord not in placed and \
+                                        q.fair_play_checker(1, alignment, coord) and \
+                                        q.fair_play_checker(2, alignment, coord):
+                                    expected |= 1 << (row * grid_size + column)
+                        self.assertEqual(q.get_legal_fence_mask(alignment), expected)
+                    coord, alignment = random_move(q, rng)
+                    q.push_move(q.get_turn(), coord, alignment)
+
+
+def snapshot(q):
+    """This function returns a tuple of everything about the game that 'pop_move' restores, along with what follows
+    from it: the encoded position, the placed fences in order, the Zobrist hash, the position history, the move log,
+    and the legal moves of both players."""
+    return (q.to_bytes(), list(q.get_player_vertical_fences()), list(q.get_player_horizontal_fences()),
+            q.get_zobrist_key(), dict(q._position_counts), q.get_move_log(), tuple(q.legal_moves(1)),
+            tuple(q.legal_moves(2)), q.get_legal_fence_mask("v"), q.get_legal_fence_mask("h"))
+
+
+class PushPopTest(unittest.TestCase):
+    """This class tests that 'pop_move' reverts 'push_move' exactly."""
+    def test_pop_restores_position(self):
+        """In seeded random games on boards of several sizes, popping every pushed move passes back through each
+        earlier position exactly, and every legal move pushed and popped leaves the position unchanged."""
+        rng = random.Random(2)
+        for grid_size in (3, 5, 9):
+            for i in range(0, 10):
+                q = Quoridor.QuoridorGame(grid_size, grid_size + 1)
+                snapshots = []
+                while q.get_game_state() == "ONGOING":
+                    snapshots.append(snapshot(q))
+                    player_num = q.get_turn()
+                    for coord, alignment in list(q.legal_moves(player_num))[:8]:
+                        q.push_move(player_num, coord, alignment)
+                        self.assertEqual(q.pop_move(), (player_num, coord, alignment))
+                        self.assertEqual(snapshot(q), snapshots[-1])
+                    coord, alignment = random_move(q, rng)
+                    q.push_move(player_num, coord, alignment)
+
+                while len(snapshots) > 0:
+                    q.pop_move()
+                    self.assertEqual(snapshot(q), snapshots.pop())
+                self.assertIsNone(q.pop_move())
+
+
+def recomputed_key(q):
+    """This function returns the Zobrist hash of the game's position computed from scratch, from its pawns, placed
+    fences, fence counts, and turn."""
+    key = 0
+    for player_num in (1, 2):
+        key ^= Quoridor.zobrist_key("pawn", player_num, q.get_player_pawn(player_num))
+        key ^= Quoridor.zobrist_key("fences", player_num, q.get_remaining_fences(player_num))
+    for coord in set(q.get_player_vertical_fences()):
+        key ^= Quoridor.zobrist_key("fence", "v", coord)
+    for coord in set(q.get_player_horizontal_fences()):
+        key ^= Quoridor.zobrist_key("fence", "h", coord)
+    if q.get_turn() == 2:
+        key ^= Quoridor.zobrist_key("turn", 2)
+    return key
+
+
+class ZobristTest(unittest.TestCase):
+    """This class tests the incrementally updated Zobrist hash and the draws by repetition it detects."""
+    def test_key_matches_recomputed_key(self):
+        """In seeded random games on boards of several sizes, the hash after every move and every undone move equals
+        the hash computed from scratch."""
+        rng = random.Random(3)
+        for grid_size in (3, 5, 9):
+            for i in range(0, 20):
+                q = Quoridor.QuoridorGame(grid_size, grid_size + 1)
+                while q.get_game_state() == "ONGOING":
+                    coord, alignment = random_move(q, rng)
+                    q.push_move(q.get_turn(), coord, alignment)
+                    self.assertEqual(q.get_zobrist_key(), recomputed_key(q))
+                    if rng.random() < 0.2:
+                        q.pop_move()
+                        self.assertEqual(q.get_zobrist_key(), recomputed_key(q))
+
+    def test_transpositions_share_key(self):
+        """The same position reached by different move orders has the same hash."""
+        q_1 = Quoridor.QuoridorGame(9, 10)
+        q_1.place_fence(1, "v", (2, 2))
+        q_1.move_pawn(2, (4, 7))
+        q_1.place_fence(1, "h", (6, 5))
+        q_2 = Quoridor.QuoridorGame(9, 10)
+        q_2.place_fence(1, "h", (6, 5))
+        q_2.move_pawn(2, (4, 7))
+        q_2.place_fence(1, "v", (2, 2))
+        self.assertEqual(q_1.get_zobrist_key(), q_2.get_zobrist_key())
+        self.assertEqual(q_1.get_zobrist_key(), recomputed_key(q_1))
+
+    def test_repetition_is_stalemate(self):
+        """A position that occurs 'REPETITION_LIMIT' times ends the game as a stalemate, and undoing the move that
+        repeated it resumes the game."""
+        q = Quoridor.QuoridorGame(9, 10)
+        start_key = q.get_zobrist_key()
+        moves = [(1, (4, 1)), (2, (4, 7)), (1, (4, 0)), (2, (4, 8))]
+        for i in range(1, Quoridor.REPETITION_LIMIT):
+            self.assertEqual(q.get_game_state(), "ONGOING")
+            for player_num, coord in moves[:-1]:
+                self.assertTrue(q.move_pawn(player_num, coord))
+            self.assertEqual(q.get_position_count(start_key), i)
+            q.push_move(*moves[-1])
+            self.assertEqual(q.get_zobrist_key(), start_key)
+            self.assertEqual(q.get_position_count(), i + 1)
+        self.assertEqual(q.get_game_state(), "STALEMATE")
+        self.assertFalse(q.move_pawn(1, (4, 1)))
+
+        q.pop_move()
+        self.assertEqual(q.get_game_state(), "ONGOING")
+        self.assertEqual(q.get_position_count(start_key), Quoridor.REPETITION_LIMIT - 1)
+
+
+class LegalMoveTest(unittest.TestCase):
+    """This class tests 'legal_moves' and 'perft' against the moves accepted by 'move_pawn' and 'place_fence'."""
+    def test_perft_counts(self):
+        """The counts of move sequences from the start of a 9x9 game with 10 fences each are the known ones."""
+        q = Quoridor.QuoridorGame(9, 10)
+        self.assertEqual(q.perft(1), 147)
+        self.assertEqual(q.perft(2), 21462)
+        self.assertEqual(q.get_move_log(), [])
+
+    def test_legal_moves_are_accepted_moves(self):
+        """In seeded random games on small boards, a pawn move or fence is in 'legal_moves' exactly when
+        'move_pawn' or 'place_fence' accepts it."""
+        rng = random.Random(4)
+        for grid_size in (3, 4, 5):
+            for i in range(0, 10):
+                q = Quoridor.QuoridorGame(grid_size, 4)
+                while q.get_game_state() == "ONGOING":
+                    player_num = q.get_turn()
+                    legal = set(q.legal_moves(player_num))
+                    accepted = set()
+                    #  A refused move leaves the game unchanged, so each copy is used until a move is accepted
+                    q_copy = Quoridor.game_from_bytes(q.to_bytes())
+                    for column in range(0, grid_size):
+                        for row in range(0, grid_size):
+                            coord = (column, row)
+                            for alignment in (None, "v", "h"):
+                                if alignment is None:
+                                    result = q_copy.move_pawn(player_num, coord)
+                                else:
+                                    result = q_copy.place_fence(player_num, alignment, coord)
+                                if result is True:
+                                    accepted.add((coord, alignment))
+                                    q_copy = Quoridor.game_from_bytes(q.to_bytes())
+                    self.assertEqual(accepted, legal)
+                    coord, alignment = random_move(q, rng)
+                    q.push_move(player_num, coord, alignment)
+
+
+class EncodingTest(unittest.TestCase):
+    """This class tests that 'game_from_bytes' rebuilds the position encoded by 'to_bytes'."""
+    def test_round_trip(self):
+        """In seeded random games on boards of several sizes, with and without the bitboard, every position decodes
+        to a game with the same pawns, fences, fence counts, turn, state, hash, and legal moves, read from any offset
+        of a larger buffer."""
+        rng = random.Random(5)
+        for grid_size in (3, 5, 9):
+            for use_bitboard in (True, False):
+                for i in range(0, 3):
+                    q = Quoridor.QuoridorGame(grid_size, grid_size + 1, use_bitboard)
+                    while True:
+                        data = q.to_bytes()
+                        self.assertEqual(len(data), Quoridor.position_size(grid_size))
+                        buffer = bytearray(b"prefix") + data + b"suffix"
+                        for decoded in (Quoridor.game_from_bytes(data),
+                                        Quoridor.game_from_bytes(memoryview(buffer), len(b"prefix"))):
+                            self.assertEqual(decoded.to_bytes(), data)
+                            self.assertEqual(decoded.get_bitboard() is not None, use_bitboard)
+                            self.assertEqual(sorted(decoded.get_player_vertical_fences()),
+                                             sorted(set(q.get_player_vertical_fences())))
+                            self.assertEqual(sorted(decoded.get_player_horizontal_fences()),
+                                             sorted(set(q.get_player_horizontal_fences())))
+                            self.assertEqual(decoded.get_zobrist_key(), q.get_zobrist_key())
+                            self.assertEqual(decoded.get_game_state(), q.get_game_state())
+                            for player_num in (1, 2):
+                                self.assertEqual(decoded.get_player_pawn(player_num), q.get_player_pawn(player_num))
+                                self.assertEqual(decoded.get_remaining_fences(player_num),
+                                                 q.get_remaining_fences(player_num))
+                                self.assertEqual(tuple(decoded.legal_moves(player_num)),
+                                                 tuple(q.legal_moves(player_num)))
+                        if q.get_game_state() != "ONGOING":
+                            break
+                        coord, alignment = random_move(q, rng)
+                        q.push_move(q.get_turn(), coord, alignment)
+
+    def test_history_counts_towards_repetition(self):
+        """Zobrist hashes given as the history of a decoded position count towards a draw by repetition."""
+        q = Quoridor.QuoridorGame(9, 10)
+        key = q.get_zobrist_key()
+        self.assertEqual(Quoridor.game_from_bytes(q.to_bytes(), history=[key]).get_position_count(), 2)
+        self.assertEqual(Quoridor.game_from_bytes(q.to_bytes()).get_game_state(), "ONGOING")
+        self.assertEqual(Quoridor.game_from_bytes(q.to_bytes(), history=[key] * (Quoridor.REPETITION_LIMIT - 1))
+                         .get_game_state(), "STALEMATE")
+
+
+if __name__ == '__main__':
+    unittest.main()
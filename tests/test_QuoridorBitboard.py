@@ -0,0 +1,72 @@
+# Description: These tests check the bitboard move engine against the list-based fence lookups it replaced, which are
+#   still used by games created with 'use_bitboard=False'.
+
+import random
+import unittest
+import Quoridor
+
+
+class BitboardTest(unittest.TestCase):
+    """This class tests games using the bitboard against the same games using the fence lists."""
+    def check_position(self, q_bitboard, q_lists, rng):
+        """This method checks that both games find the same pawn moves from every tile and the same legal fences, and
+        the same pawn moves, paths, and goal distances with a random sample of proposed fences."""
+        n = q_bitboard.get_grid_size()
+        slots = []
+        for alignment in ("v", "h"):
+            for column in range(0, n):
+                for row in range(0, n):
+                    if q_bitboard.is_fence_slot(alignment, (column, row)):
+                        slots.append((alignment, (column, row)))
+
+        for player_num in (1, 2):
+            for column in range(0, n):
+                for row in range(0, n):
+                    for account_pawn in (True, False):
+                        self.assertEqual(q_bitboard.valid_tiles(player_num, (column, row), account_pawn=account_pawn),
+                                         q_lists.valid_tiles(player_num, (column, row), account_pawn=account_pawn))
+
+            #  Each proposed fence is checked from both pawns, where it can block a jump as well as a step
+            for alignment, coord in rng.sample(slots, min(len(slots), 12)):
+                for pawn in (q_bitboard.get_player_pawn(1), q_bitboard.get_player_pawn(2)):
+                    self.assertEqual(q_bitboard.valid_tiles(player_num, pawn, alignment, coord),
+                                     q_lists.valid_tiles(player_num, pawn, alignment, coord))
+                self.assertEqual(q_bitboard.fair_play_checker(player_num, alignment, coord),
+                                 q_lists.fair_play_checker(player_num, alignment, coord))
+                self.assertEqual(q_bitboard.goal_distance(player_num, alignment, coord),
+                                 q_lists.goal_distance(player_num, alignment, coord))
+            self.assertEqual(tuple(q_bitboard.legal_moves(player_num)), tuple(q_lists.legal_moves(player_num)))
+
+        for alignment, coord in slots:
+            self.assertEqual(q_bitboard.is_legal_fence(alignment, coord), q_lists.is_legal_fence(alignment, coord))
+
+    def test_engines_agree(self):
+        """In seeded random games on boards of several sizes, both games agree after every move, and make every move
+        the same way."""
+        rng = random.Random(0)
+        for grid_size, games in ((3, 10), (4, 6), (5, 5), (7, 3), (9, 2)):
+            for i in range(0, games):
+                q_bitboard = Quoridor.QuoridorGame(grid_size, grid_size + 1)
+                q_lists = Quoridor.QuoridorGame(grid_size, grid_size + 1, use_bitboard=False)
+                self.assertIsNone(q_lists.get_bitboard())
+                while q_bitboard.get_game_state() == "ONGOING":
+                    self.check_position(q_bitboard, q_lists, rng)
+                    player_num = q_bitboard.get_turn()
+                    legal = list(q_bitboard.legal_moves(player_num))
+                    fences = [move for move in legal if move[1] is not None]
+                    if len(fences) > 0 and rng.random() < 0.6:
+                        coord, alignment = rng.choice(fences)
+                    else:
+                        coord, alignment = rng.choice(legal)
+                    if alignment is None:
+                        self.assertTrue(q_bitboard.move_pawn(player_num, coord))
+                        self.assertTrue(q_lists.move_pawn(player_num, coord))
+                    else:
+                        self.assertTrue(q_bitboard.place_fence(player_num, alignment, coord))
+                        self.assertTrue(q_lists.place_fence(player_num, alignment, coord))
+                    self.assertEqual(q_lists.get_game_state(), q_bitboard.get_game_state())
+                    self.assertEqual(q_lists.get_zobrist_key(), q_bitboard.get_zobrist_key())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# Description: These tests check that the bot's ways of evaluating candidate fences agree with each other.
+
+import random
+import sys
+import unittest
+from unittest import mock
+import Quoridor
+import QuoridorBenchmark
+import QuoridorBot
+import QuoridorDistance
+
+
+class FencePlacementTest(unittest.TestCase):
+    """This class tests 'Bot.get_optimal_fence_placement' with and without NumPy."""
+    def setUp(self):
+        """Empties the cache of distance fields, so that the path lengths are found afresh in each test."""
+        QuoridorDistance.clear_cache()
+
+    def positions(self):
+        """This method returns a list of seeded random games on boards of several sizes."""
+        rng = random.Random(0)
+        games = []
+        for grid_size in (5, 9, 13):
+            for placed_fences in (0, 5, 10):
+                games.append(QuoridorBenchmark.random_position(grid_size, placed_fences, rng))
+        return games
+
+    def test_batch_without_numpy_matches_serial(self):
+        """Without NumPy, the batch evaluation falls back to evaluating the candidates one at a time, giving the same
+        fences under the same indexes as the serial evaluation."""
+        for q in self.positions():
+            for player_num in (1, 2):
+                bot = QuoridorBot.Bot(q, player_num)
+                opponent_num = q.get_opposing_num(player_num)
+                opponent_min_moves = bot.find_min_moves(opponent_num, False)
+                self_min_moves = bot.find_min_moves(player_num, False)
+                candidates = []
+                for coord, align in q.legal_moves(player_num):
+                    if align is not None:
+                        candidates.append((align, coord))
+
+                serial = bot.serial_fence_move_changes(player_num, False, candidates, opponent_min_moves,
+                                                       self_min_moves)
+                with mock.patch.dict(sys.modules, {"numpy": None, "QuoridorWavefront": None}):
+                    batch = bot.batch_fence_move_changes(player_num, candidates, opponent_min_moves, self_min_moves)
+                    best_fences = bot.get_optimal_fence_placement(player_num, False)
+                self.assertEqual(batch, serial)
+
+                #  With NumPy, if it is installed, the batch evaluation gives the same fences
+                self.assertEqual(bot.get_optimal_fence_placement(player_num, False), best_fences)
+
+
+class BoxedInTest(unittest.TestCase):
+    """This class tests 'Bot.make_move_v2' when a pawn has nowhere to move."""
+    #  A game on a 3x3 board after which Player 1's pawn is boxed in by fences and Player 2's pawn, with legal fences
+    #  left to place, on Player 1's turn.
+    MOVES = [((0, 2), "h"), ((2, 1), "h"), ((0, 1), "h"), ((1, 0), "v"), ((2, 2), "v"), ((1, 2), "v"), ((1, 1), None),
+             ((2, 2), "h"), ((2, 1), None), ((1, 1), None)]
+
+    def boxed_in_game(self):
+        """This method returns the game after 'MOVES'."""
+        q = Quoridor.QuoridorGame(3, 10)
+        for coord, alignment in self.MOVES:
+            q.push_move(q.get_turn(), coord, alignment)
+        return q
+
+    def test_boxed_in_pawn_places_fence(self):
+        """A bot whose pawn cannot move places one of its fences."""
+        for seed in range(0, 10):
+            q = self.boxed_in_game()
+            self.assertEqual(q.valid_tiles(1, q.get_player_pawn(1)), [])
+            fence_count = q.get_remaining_fences(1)
+            QuoridorBot.Bot(q, 1, rng=random.Random(seed)).make_move_v2(1)
+            self.assertEqual(q.get_turn(), 2)
+            self.assertEqual(q.get_remaining_fences(1), fence_count - 1)
+
+    def test_boxed_in_opponent(self):
+        """A bot whose opponent's pawn cannot move still makes a move."""
+        for seed in range(0, 10):
+            q = self.boxed_in_game()
+            q.push_move(1, (2, 0), "v")
+            self.assertEqual(q.valid_tiles(1, q.get_player_pawn(1)), [])
+            QuoridorBot.Bot(q, 2, rng=random.Random(seed)).make_move_v2(2)
+            self.assertEqual(q.get_turn(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# Description: These tests check the distance fields and their cache against the breadth-first search of
+#   'QuoridorGame.goal_distance'.
+
+import random
+import unittest
+import QuoridorBenchmark
+import QuoridorDistance
+
+
+class DistanceFieldTest(unittest.TestCase):
+    """This class tests 'QuoridorDistance.get_distance_field' starting from an empty cache."""
+    def setUp(self):
+        """Empties the cache of distance fields, so that each test starts without any fields found."""
+        QuoridorDistance.clear_cache()
+
+    def tearDown(self):
+        """Empties the cache of distance fields, so that other tests do not see the fields found here."""
+        QuoridorDistance.clear_cache()
+
+    def test_fields_match_goal_distance(self):
+        """Every tile's distance in a field found from an empty cache is the length of the breadth-first search."""
+        rng = random.Random(0)
+        for grid_size in (5, 9):
+            q = QuoridorBenchmark.random_position(grid_size, 8, rng)
+            for player_num in (1, 2):
+                field = QuoridorDistance.get_distance_field(q, player_num)
+                for column in range(0, grid_size):
+                    for row in range(0, grid_size):
+                        self.assertEqual(field.get_distance((column, row)),
+                                         q.goal_distance(player_num, start_tile=(column, row)))
+
+    def test_clear_cache(self):
+        """A field is found once and then returned from the cache, until the cache is cleared."""
+        q = QuoridorBenchmark.random_position(9, 5, random.Random(1))
+        self.assertEqual(len(QuoridorDistance._fields), 0)
+        field = QuoridorDistance.get_distance_field(q, 1)
+        self.assertIs(QuoridorDistance.get_distance_field(q, 1), field)
+        self.assertEqual(len(QuoridorDistance._fields), 1)
+
+        QuoridorDistance.clear_cache()
+        self.assertEqual(len(QuoridorDistance._fields), 0)
+        self.assertIsNot(QuoridorDistance.get_distance_field(q, 1), field)
+
+
+if __name__ == '__main__':
+    unittest.main()
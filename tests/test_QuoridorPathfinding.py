@@ -0,0 +1,67 @@
+# Description: These tests check the A* and bidirectional searches against the breadth-first searches they replace.
+
+import random
+import unittest
+import QuoridorBenchmark
+import QuoridorBot
+import QuoridorDistance
+import QuoridorPathfinding
+
+
+class ShortestPathTest(unittest.TestCase):
+    """This class tests the searches of 'QuoridorPathfinding' on seeded random walls."""
+    def setUp(self):
+        """Empties the cache of distance fields, so that 'find_min_moves' finds its fields afresh."""
+        QuoridorDistance.clear_cache()
+
+    def positions(self):
+        """This method returns a list of seeded random games on boards of several sizes, with pawns moved and fences
+        placed."""
+        rng = random.Random(0)
+        games = []
+        for grid_size in (3, 5, 9, 13):
+            for placed_fences in (0, 4, 12, 30):
+                games.append(QuoridorBenchmark.random_position(grid_size, placed_fences, rng))
+        return games
+
+    def test_searches_ignoring_pawn(self):
+        """Ignoring the opposing pawn, both searches match 'goal_distance' and 'breadth_first_min_moves', from the
+        pawn and from other tiles, with and without a proposed fence."""
+        rng = random.Random(1)
+        for q in self.positions():
+            n = q.get_grid_size()
+            fences = [(None, None)]
+            for alignment in ("v", "h"):
+                for coord in q.get_legal_fences(alignment)[:4]:
+                    fences.append((alignment, coord))
+            for player_num in (1, 2):
+                bot = QuoridorBot.Bot(q, player_num)
+                for alignment, coord in fences:
+                    tiles = [None, (rng.randrange(n), rng.randrange(n))]
+                    for tile in tiles:
+                        expected = q.goal_distance(player_num, alignment, coord, tile)
+                        if tile is None:
+                            self.assertEqual(bot.breadth_first_min_moves(player_num, False, alignment, coord),
+                                             expected)
+                        else:
+                            self.assertEqual(bot.breadth_first_min_moves(player_num, False, alignment, coord, tile),
+                                             expected)
+                        self.assertEqual(QuoridorPathfinding.astar_distance(q, player_num, tile, alignment, coord),
+                                         expected)
+                        self.assertEqual(QuoridorPathfinding.bidirectional_distance(q, player_num, tile, alignment,
+                                                                                    coord), expected)
+
+    def test_searches_with_pawn(self):
+        """Taking the opposing pawn into account, the A* search and 'find_min_moves' match
+        'breadth_first_min_moves'."""
+        for q in self.positions():
+            for player_num in (1, 2):
+                bot = QuoridorBot.Bot(q, player_num)
+                expected = bot.breadth_first_min_moves(player_num, True)
+                self.assertEqual(QuoridorPathfinding.astar_distance(q, player_num, account_pawn=True), expected)
+                self.assertEqual(bot.find_min_moves(player_num, True), expected)
+                self.assertEqual(bot.find_min_moves(player_num, False), q.goal_distance(player_num))
+
+
+if __name__ == '__main__':
+    unittest.main()
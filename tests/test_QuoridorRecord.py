@@ -0,0 +1,82 @@
+# Description: These tests check that games written in the record notation replay to the same games.
+
+import os
+import random
+import tempfile
+import unittest
+import Quoridor
+import QuoridorRecord
+
+
+def random_game(grid_size, fence_count, rng, move_cap):
+    """This function returns a game of the given size played with random legal moves until it ends or 'move_cap'
+    moves have been made."""
+    q = Quoridor.QuoridorGame(grid_size, fence_count)
+    while q.get_game_state() == "ONGOING" and len(q.get_move_log()) < move_cap:
+        q.push_move(q.get_turn(), *rng.choice(list(q.legal_moves(q.get_turn()))))
+    return q
+
+
+class RecordTest(unittest.TestCase):
+    """This class tests writing games with 'append_record' and reading them back with 'replay_records'."""
+    def setUp(self):
+        """Creates an empty record file."""
+        record_file, self.path = tempfile.mkstemp(suffix=".txt")
+        os.close(record_file)
+
+    def tearDown(self):
+        """Deletes the record file."""
+        os.remove(self.path)
+
+    def test_notation_round_trip(self):
+        """Every tile of a board with more than 26 columns, and every fence on it, reads back from its notation."""
+        for column in range(0, 60):
+            self.assertEqual(QuoridorRecord.column_number(QuoridorRecord.column_name(column)), column)
+        self.assertEqual(QuoridorRecord.column_name(26), "aa")
+        self.assertEqual(QuoridorRecord.move_to_notation((4, 1)), "e2")
+        self.assertEqual(QuoridorRecord.move_to_notation((3, 3), "h"), "d4h")
+        for coord in ((0, 0), (25, 40), (26, 9), (51, 51)):
+            for alignment in (None, "v", "h"):
+                notation = QuoridorRecord.move_to_notation(coord, alignment)
+                self.assertEqual(QuoridorRecord.notation_to_move(notation), (coord, alignment))
+        for notation in ("", "e", "4e", "e0", "E2", "e2x", "e2 "):
+            self.assertRaises(ValueError, QuoridorRecord.notation_to_move, notation)
+
+    def test_replay_matches_games(self):
+        """Seeded random games on boards of several sizes, finished or not, are replayed from a record file to games
+        with the same moves, position, and result."""
+        rng = random.Random(0)
+        games = []
+        with open(self.path, "w") as record_file:
+            record_file.write("# Seeded random games\n\n")
+        for grid_size, fence_count in ((3, 4), (5, 6), (9, 10), (29, 4)):
+            for i in range(0, 5):
+                q = random_game(grid_size, fence_count, rng, 200)
+                QuoridorRecord.append_record(self.path, q, fence_count)
+                games.append(q)
+
+        replayed = list(QuoridorRecord.replay_records(self.path))
+        self.assertEqual(len(replayed), len(games))
+        for q, replay in zip(games, replayed):
+            self.assertEqual(replay.get_move_log(), q.get_move_log())
+            self.assertEqual(replay.to_bytes(), q.to_bytes())
+            self.assertEqual(replay.get_zobrist_key(), q.get_zobrist_key())
+
+    def test_bad_records_name_their_line(self):
+        """An illegal move or a result that does not match the replayed game raises ValueError naming the line."""
+        q = random_game(5, 3, random.Random(1), 200)
+        line = QuoridorRecord.format_record(q, 3)
+        parts = line.split()
+        wrong_result = " ".join(parts[:2] + ["*"] + parts[3:])
+        illegal_move = " ".join(parts[:3] + ["a1v"] + parts[3:])
+        for bad_line, message in ((wrong_result, "Line 2: recorded result"), (illegal_move, "Line 2: illegal move 1")):
+            with open(self.path, "w") as record_file:
+                record_file.write(line + "\n" + bad_line + "\n")
+            replay = QuoridorRecord.replay_records(self.path)
+            self.assertEqual(next(replay).to_bytes(), q.to_bytes())
+            with self.assertRaisesRegex(ValueError, message):
+                next(replay)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# Description: These tests check that the game server answers every request, including malformed ones, over a real
+#   TCP connection.
+
+import asyncio
+import json
+import unittest
+import QuoridorServer
+
+
+class MalformedRequestTest(unittest.IsolatedAsyncioTestCase):
+    """This class tests the server's responses to requests it cannot perform."""
+    async def asyncSetUp(self):
+        """Starts a server on a free local port and connects to it."""
+        self.server = QuoridorServer.QuoridorServer(workers=1)
+        self.listener = await asyncio.start_server(self.server.handle_connection, "127.0.0.1", 0)
+        port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self):
+        """Closes the connection and shuts the server down."""
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.server.close()
+
+    async def exchange(self, requests):
+        """This method sends the given request lines without waiting for any answers, and returns the responses by
+        their ids."""
+        for line in requests:
+            self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+
+        responses = {}
+        for i in range(0, len(requests)):
+            response = json.loads(await asyncio.wait_for(self.reader.readline(), 10))
+            responses[response.get("id")] = response
+        return responses
+
+    async def test_malformed_requests_are_answered(self):
+        """Each malformed request gets an error response carrying its id, and the connection keeps working."""
+        requests = ['{"op": "state", "game": [1], "id": 1}',
+                    '{"op": "state", "game": {"a": 1}, "id": 2}',
+                    '{"op": "state", "game": "1", "id": 3}',
+                    '{"op": "state", "game": true, "id": 4}',
+                    '{"op": "new", "bot": 5, "id": 5}',
+                    '{"op": "new", "bot": ["v2"], "id": 6}',
+                    '{"op": "new", "bot": "nobot", "id": 7}',
+                    '{"op": "move", "game": 1, "move": 5, "id": 8}',
+                    '{"op": "teleport", "id": 9}']
+        responses = await self.exchange(requests)
+        self.assertEqual(sorted(responses), list(range(1, len(requests) + 1)))
+        for response in responses.values():
+            self.assertFalse(response["ok"])
+            self.assertIn("error", response)
+
+        responses = await self.exchange(['{"op": "new", "grid_size": 5, "fences": 2, "id": 10}'])
+        self.assertTrue(responses[10]["ok"])
+        game_id = responses[10]["game"]
+        responses = await self.exchange(['{"op": "state", "game": %d, "id": 11}' % game_id,
+                                         '{"op": "stats", "id": 12}'])
+        self.assertTrue(responses[11]["ok"])
+        self.assertEqual(responses[12]["errors"], len(requests))
+
+    async def test_bot_options_are_limited(self):
+        """A bot configuration with an option clients may not set, or a value beyond its limit, is refused with an
+        error naming the option, and an allowed configuration starts a game."""
+        refused = {"v2:workers=4": "workers", "search:book=opening_book.bin": "book", "mcts:workers=2": "workers",
+                   "search:depth=100": "depth", "search:depth=2.5": "depth", "search:time_limit=0": "time_limit",
+                   "mcts:playouts=100000000": "playouts", "mcts:time_limit=1e9": "time_limit",
+                   "search:speed=1": "speed"}
+        requests = []
+        for config in refused:
+            requests.append(json.dumps({"op": "new", "bot": config, "id": config}))
+        requests.append(json.dumps({"op": "new", "bot": "search:depth=1,time_limit=1", "id": "allowed"}))
+        responses = await self.exchange(requests)
+
+        for config, option in refused.items():
+            self.assertFalse(responses[config]["ok"])
+            self.assertIn("'" + option + "'", responses[config]["error"])
+        self.assertTrue(responses["allowed"]["ok"])
+
+    async def test_unexpected_failures_are_answered(self):
+        """A request that fails with an error other than ValueError still gets an error response with its id."""
+        def fail(request):
+            raise TypeError("unexpected")
+        self.server.handle_request = fail
+
+        responses = await self.exchange(['{"op": "stats", "id": "x"}'])
+        self.assertFalse(responses["x"]["ok"])
+        self.assertIn("unexpected", responses["x"]["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
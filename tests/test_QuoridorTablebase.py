@@ -0,0 +1,47 @@
+# Description: These tests check when the bots use the endgame tablebase.
+
+import unittest
+from unittest import mock
+import Quoridor
+import QuoridorBot
+import QuoridorTablebase
+
+
+class TablebaseLimitTest(unittest.TestCase):
+    """This class tests that pawn races are only solved on boards of at most 'MAX_TILE_COUNT' tiles."""
+    def setUp(self):
+        """Empties the cache of solved tables."""
+        QuoridorTablebase._tables.clear()
+
+    def tearDown(self):
+        """Empties the cache of solved tables, so that other tests do not see the tables solved here."""
+        QuoridorTablebase._tables.clear()
+
+    def test_small_board_uses_tablebase(self):
+        """A pawn race on a 9x9 board is played from its solved tablebase."""
+        q = Quoridor.QuoridorGame(9, 0)
+        bot = QuoridorBot.Bot(q, 1)
+        self.assertTrue(QuoridorTablebase.is_solvable(q))
+        self.assertTrue(bot.make_tablebase_move(1))
+        self.assertEqual(len(QuoridorTablebase._tables), 1)
+
+    def test_large_board_skips_tablebase(self):
+        """A pawn race on a board of more than 'MAX_TILE_COUNT' tiles is played by 'make_move_v2', without solving a
+        tablebase."""
+        grid_size = 1
+        while grid_size * grid_size <= QuoridorTablebase.MAX_TILE_COUNT:
+            grid_size += 2
+        q = Quoridor.QuoridorGame(grid_size, 0)
+        bot = QuoridorBot.Bot(q, 1)
+        self.assertFalse(QuoridorTablebase.is_solvable(q))
+        self.assertRaises(ValueError, QuoridorTablebase.get_tablebase, q)
+
+        with mock.patch.object(QuoridorTablebase, "Tablebase", side_effect=AssertionError("solved a tablebase")):
+            self.assertFalse(bot.make_tablebase_move(1))
+            bot.make_move(1)
+        self.assertEqual(q.get_turn(), 2)
+        self.assertEqual(len(QuoridorTablebase._tables), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# Description: These tests check the batched games of 'QuoridorVectorEnv' against the same games played one at a time
+#   with 'QuoridorGame'.
+
+import random
+import unittest
+import Quoridor
+
+try:
+    import numpy as np
+    import QuoridorVectorEnv
+except ImportError:
+    np = None
+
+
+def action_number(grid_size, coord, alignment):
+    """This function returns the action number of the move to the given coordinate, which is a fence move if an
+    alignment ('v' or 'h') is given and a pawn move otherwise."""
+    kind = {None: 0, "v": 1, "h": 2}[alignment]
+    return kind * grid_size * grid_size + coord[1] * grid_size + coord[0]
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class VectorEnvTest(unittest.TestCase):
+    """This class tests 'VectorEnv' on seeded random games."""
+    def check_games(self, grid_size, fence_count, batch_size, steps, move_cap, seed):
+        """This method steps a batch of games with random actions, mostly legal, alongside the same games played with
+        'QuoridorGame', and checks after every step that the legal actions, Zobrist hashes, states, rewards, and
+        finished games agree. Finished games are reset, so that new games keep starting."""
+        rng = random.Random(seed)
+        n = grid_size
+        env = QuoridorVectorEnv.VectorEnv(batch_size, grid_size, fence_count, move_cap)
+        games = []
+        for i in range(0, batch_size):
+            games.append(Quoridor.QuoridorGame(grid_size, fence_count))
+
+        for step in range(0, steps):
+            mask = env.legal_mask()
+            actions = []
+            for i in range(0, batch_size):
+                q = games[i]
+                expected = np.zeros(env.get_action_count(), dtype=bool)
+                if q.is_ongoing() and len(q.get_move_log()) < move_cap:
+                    for coord, alignment in q.legal_moves(q.get_turn()):
+                        expected[action_number(n, coord, alignment)] = True
+                self.assertTrue((mask[i] == expected).all())
+                self.assertEqual(int(env.get_keys()[i]), q.get_zobrist_key())
+
+                legal = np.nonzero(expected)[0]
+                if len(legal) > 0 and rng.random() < 0.95:
+                    actions.append(int(rng.choice(legal)))
+                else:
+                    actions.append(rng.randrange(env.get_action_count()))
+            rewards, done, truncated, legal = env.step(actions)
+
+            for i in range(0, batch_size):
+                q = games[i]
+                tile = actions[i] % (n * n)
+                kind = actions[i] // (n * n)
+                made = False
+                if q.is_ongoing() and len(q.get_move_log()) < move_cap:
+                    if kind == 0:
+                        made = q.move_pawn(q.get_turn(), (tile % n, tile // n)) is True
+                    else:
+                        made = q.place_fence(q.get_turn(), "vh"[kind - 1], (tile % n, tile // n)) is True
+                self.assertEqual(bool(legal[i]), made)
+                self.assertEqual(int(env.get_keys()[i]), q.get_zobrist_key())
+                self.assertEqual(QuoridorVectorEnv.STATE_NAMES[env.get_states()[i]], q.get_game_state())
+
+                winner = q.get_game_state().endswith("WIN") and made
+                if winner:
+                    self.assertEqual(rewards[i, int(q.get_game_state()[7]) - 1], 1)
+                    self.assertEqual(rewards[i].sum(), 0)
+                else:
+                    self.assertTrue((rewards[i] == 0).all())
+                self.assertEqual(bool(done[i]), made and (not q.is_ongoing() or len(q.get_move_log()) >= move_cap))
+                self.assertEqual(bool(truncated[i]), made and q.is_ongoing() and len(q.get_move_log()) >= move_cap)
+
+            #  A game rebuilt from the batch is in the same position
+            i = rng.randrange(batch_size)
+            self.assertEqual(env.get_game(i).to_bytes(), games[i].to_bytes())
+
+            for i in np.nonzero(env.reset_finished())[0]:
+                games[i] = Quoridor.QuoridorGame(grid_size, fence_count)
+
+    def test_matches_games(self):
+        """Batches on boards of several sizes, with and without fences, match 'QuoridorGame' step for step."""
+        self.check_games(3, 2, 16, 150, 40, 1)
+        self.check_games(5, 0, 16, 100, 30, 2)
+        self.check_games(5, 3, 32, 150, 60, 3)
+        self.check_games(7, 20, 16, 150, 200, 4)
+        self.check_games(9, 10, 16, 150, 200, 5)
+
+    def test_no_legal_move_is_stalemate(self):
+        """A player with fences left but no pawn move and nowhere to place a fence has drawn by stalemate, as in
+        'QuoridorGame'."""
+        moves = [((0, 2), "h"), ((2, 1), "h"), ((0, 1), "h"), ((1, 0), "v"), ((2, 2), "v"), ((1, 2), "v"),
+                 ((1, 1), None), ((2, 2), "h"), ((2, 1), None), ((1, 1), None), ((1, 1), "v"), ((2, 0), "v")]
+        env = QuoridorVectorEnv.VectorEnv(1, 3, 10)
+        for coord, alignment in moves:
+            self.assertEqual(env.get_states()[0], QuoridorVectorEnv.STATE_ONGOING)
+            env.step([action_number(3, coord, alignment)])
+        self.assertGreater(env.get_fence_counts()[0, 0], 0)
+        self.assertFalse(env.legal_mask()[0].any())
+        self.assertEqual(env.get_states()[0], QuoridorVectorEnv.STATE_STALEMATE)
+
+
+if __name__ == '__main__':
+    unittest.main()